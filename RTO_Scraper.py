@@ -4,10 +4,11 @@ from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from webdriver_manager.chrome import ChromeDriverManager
-import json, os, time, shutil, logging, uuid
+import argparse, io, json, os, queue, time, shutil, logging, uuid
+from dataclasses import dataclass, replace
+from functools import partial
 from datetime import datetime, timedelta
-from multiprocessing import Process, Manager
+from multiprocessing import Process, Manager, Queue, Value
 
 URL = "https://vahan.parivahan.gov.in/vahan4dashboard/vahan/view/reportview.xhtml"
 Today = datetime.now().date()
@@ -49,6 +50,39 @@ OPTIONS = {
     "motor_cab": '//*[@id="VhClass"]/tbody/tr[52]/td/label'
 }
 
+# Browser workers pulling (state, RTO, vehicle class) tasks from the shared queue.
+# Not tied to len(STATES): every worker can serve any state.
+DEFAULT_WORKERS = 4
+MAX_TASK_ATTEMPTS = 5
+
+
+@dataclass(frozen=True)
+class ScrapeSettings:
+    workers: int = DEFAULT_WORKERS
+    scheduler: str = "queue"
+    fresh: bool = False
+    wait_mode: str = "ajax"
+    engine: str = "browser"
+    sticky_filters: bool = False
+    capture: str = "folder"
+    action_script: bool = False
+    tabs: int = 1
+    chromedriver: str | None = None  # resolved once in main() and handed to every worker
+    warm_spares: int = 0
+    lean_browser: bool = False
+    adaptive: bool = False
+    max_rto_per_min: float = 0.0  # 0 = no global rate limit
+    recycle_rss_mb: float = 0.0  # 0 = never recycle on memory
+    recycle_exports: int = 0  # 0 = never recycle on export count
+    changed_only: bool = False
+    wait_for_publication: bool = False
+    probe_deadline: str = "14:00"  # HH:MM after which the run starts even on unchanged data
+    backfill: tuple = ()  # (year, month) pairs; empty = the normal daily run
+    stream_ingest: bool = False
+    post_workers: int = 0  # processes for validate_folder, which also parses the files; 0 = one per CPU
+
+
+DEFAULT_SETTINGS = ScrapeSettings()
 
 
 # -------- Helper Functions --------
@@ -75,19 +109,69 @@ def get_logger(name: str, filename: str):
     return logger
 
 
-def restart_driver(state_name, download_dir, logger, headless=False):
+def restart_driver(state_name, download_dir, logger, headless=False, settings=DEFAULT_SETTINGS):
     logger.warning("🔄 Restarting browser due to crash / 503...")
+    return acquire_driver(download_dir, settings, logger)
 
+
+# Per-process warm pools keyed by download folder (each worker has its own folder)
+_warm_pools: dict[str, "WarmDriverPool"] = {}
+
+
+def acquire_driver(download_dir, settings=DEFAULT_SETTINGS, logger=None):
+    """A browser on the dashboard for download_dir: a parked spare with --warm-spares, else a cold start."""
+    launch = partial(launch_driver, download_dir, driver_path=settings.chromedriver, lean=settings.lean_browser)
+    if settings.warm_spares <= 0:
+        driver, wait = launch()
+    else:
+        pool = _warm_pools.get(download_dir)
+        if pool is None:
+            pool = _warm_pools[download_dir] = WarmDriverPool(launch, settings.warm_spares)
+        driver, wait = pool.take()
+        # A spare may have been parked for a while; start from a fresh view
+        driver.get(URL)
+    if logger is not None:
+        logger.info(f"⏱️ {format_page_load(page_load_stats(driver))}")
+    return driver, wait
+
+
+def prepared_browser(download_dir, state_name, settings, logger, state_xpath=None):
+    """A fresh browser with state_name already selected: (driver, wait, state_name, labels)."""
+    driver, wait = acquire_driver(download_dir, settings, logger)
+    labels = load_state_rtos(driver, wait, state_name, state_xpath) if state_name else []
+    return driver, wait, state_name, labels
+
+
+def recycle_policy(settings):
+    return RecyclePolicy(settings.recycle_rss_mb, settings.recycle_exports)
+
+
+def release_warm_browsers():
+    while _warm_pools:
+        _, pool = _warm_pools.popitem()
+        pool.close()
+
+
+def launch_driver(download_dir, extra_args=(), driver_path=None, lean=False):
+    """Start Chrome on the dashboard with downloads routed to download_dir (lean: see lean_browser)."""
     chrome_options = Options()
-    chrome_options.add_argument("--start-maximized")
     chrome_options.add_argument("--disable-notifications")
-    #chrome_options.add_argument("--headless=new")
-    chrome_options.add_argument("--window-size=1920,1080")
+    if lean:
+        for arg in LEAN_ARGS:
+            chrome_options.add_argument(arg)
+    else:
+        chrome_options.add_argument("--start-maximized")
+        #chrome_options.add_argument("--headless=new")
+        chrome_options.add_argument("--window-size=1920,1080")
+    for arg in extra_args:
+        chrome_options.add_argument(arg)
     prefs = {"download.default_directory": download_dir}
     chrome_options.add_experimental_option("prefs", prefs)
 
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=chrome_options)
+    driver = webdriver.Chrome(service=Service(driver_path or resolve_chromedriver()), options=chrome_options)
     wait = WebDriverWait(driver, 25)
+    if lean:
+        apply_lean_profile(driver)
     driver.get(URL)
     time.sleep(2)
 
@@ -95,8 +179,9 @@ def restart_driver(state_name, download_dir, logger, headless=False):
 
 
 
-def download_rename(rto_name, vehicle_type, download_dir, logger):
+def download_rename(rto_name, vehicle_type, download_dir, logger, final_dir=None):
     """Download and rename the Excel file"""
+    final_dir = final_dir or FINAL_DIR
     logger.info(f"Looking for Excel files in: {download_dir}")
     try:
         files = [os.path.join(download_dir, f) for f in os.listdir(download_dir)
@@ -111,8 +196,8 @@ def download_rename(rto_name, vehicle_type, download_dir, logger):
     latest_file = max(files, key=os.path.getctime)
 
     base_name = f"{uuid.uuid4()}_{vehicle_type}.xlsx"
-    os.makedirs(FINAL_DIR, exist_ok=True)
-    final_path = os.path.join(FINAL_DIR, base_name)
+    os.makedirs(final_dir, exist_ok=True)
+    final_path = os.path.join(final_dir, base_name)
 
     if os.path.exists(final_path):
         logger.warning(f"{final_path} exists, overwriting")
@@ -120,18 +205,60 @@ def download_rename(rto_name, vehicle_type, download_dir, logger):
 
     shutil.move(latest_file, final_path)
     logger.info(f"Moved and renamed file to: {final_path}")
-    return True
+    return final_path
 
-from selenium.common.exceptions import NoSuchElementException
+from selenium.common.exceptions import WebDriverException
 import re
 
 from fix.file_check import (
+    RTO_CODE_PATTERN,
+    MissingRtoFilesError,
     group_targets_by_state,
     missing_to_rescrape_targets,
-    run_file_check,
 )
+from folder_validation import validate_folder
+from scrape_ledger import ScrapeLedger, ledger_path
+from page_waits import WAIT_MODES, PageWaiter, format_wait_summary, merge_wait_summaries
+from jsf_http_engine import JsfExportSession
+from cdp_capture import CdpExportCapture, ExportCaptureError, export_capture_for
+from table_extract import read_grouping_table, save_grid
+from pf_actions import EXPORT_XPATH, poll_steps, rto_steps, run_steps, start_steps, table_steps
+from rto_list_cache import RtoListCache, options_from_labels, rto_list_dir
+from tab_sessions import BACKGROUND_TAB_ARGS, close_tabs, open_tabs, step_tab, wait_for_export
+from driver_provision import WarmDriverPool, resolve_chromedriver
+from lean_browser import LEAN_ARGS, apply_lean_profile, format_page_load, page_load_stats
+from concurrency_control import ConcurrencyController, PoolControl
+from browser_recycle import BrowserRecycler, RecyclePolicy
+from change_detection import (TotalsSnapshot, carry_forward_grid, class_totals_from_export, class_totals_from_grid,
+                              latest_cumulative, totals_from_export, totals_from_grid, unchanged_rtos)
+from run_targets import RunTarget, backfill_target, parse_months
+from rto_ingest import FrameCache
+from streaming_ingest import StreamingIngest
+from page_health import (HEALTHY, RELOADED, RESTART, UNAVAILABLE, PageHealth, StateBreakers, check_and_recover)
+from freshness_probe import (ProbeBaseline, load_baseline, publication_summary, record_publication, save_baseline,
+                             wait_for_change)
+from renameCheck import extract_rto_from_header
+from xlsx_header import read_header_text
+import pandas as pd
 
 MAX_MISSING_RESCRAPE_PASSES = 1
+RTO_LISTS = RtoListCache(rto_list_dir(FINAL_DIR))
+# The normal daily run, from the import-time month / new_year / FINAL_DIR above
+DAILY_TARGET = RunTarget(Today.year - 1 if new_year else Today.year, month, Today.isoformat(), FINAL_DIR,
+                         Today - timedelta(days=1))
+
+
+def li_text(li):
+    if isinstance(li, str):
+        # RTO lists are plain labels (script read / RTO list cache / HTTP engine)
+        return li.strip()
+    return (li.text or li.get_attribute("textContent") or "").strip()
+
+
+def rto_code_from_label(label: str) -> str:
+    """RTO code from a dropdown label such as 'ADOOR SRTO - KL26'."""
+    match = RTO_CODE_PATTERN.search(label.upper())
+    return match.group(1) if match else ""
 
 
 def find_rto_index(visible_li, rto_code: str) -> int | None:
@@ -140,15 +267,18 @@ def find_rto_index(visible_li, rto_code: str) -> int | None:
     pattern = re.compile(re.escape(code) + r"(?!\d)", re.IGNORECASE)
 
     for i, li in enumerate(visible_li):
-        text = (li.text or li.get_attribute("textContent") or "")
-        if pattern.search(text):
+        if pattern.search(li_text(li)):
             return i
     return None
 
 
-def rescrape_targets_for_state(state_name, state_xpath, targets, logger):
+def rescrape_targets_for_state(state_name, state_xpath, targets, logger, settings=DEFAULT_SETTINGS):
     """Re-download only the listed RTO / vehicle-type pairs for one state."""
+    ledger = ScrapeLedger(ledger_path(FINAL_DIR))
+    waiter = PageWaiter(settings.wait_mode)
+    targets = [t for t in targets if not ledger.is_complete(t.rto_code, t.vehicle_type)]
     if not targets:
+        ledger.close()
         return
 
     logger.info(
@@ -162,57 +292,10 @@ def rescrape_targets_for_state(state_name, state_xpath, targets, logger):
     )
     os.makedirs(download_dir, exist_ok=True)
 
-    chrome_options = Options()
-    chrome_options.add_argument("--start-maximized")
-    chrome_options.add_argument("--disable-notifications")
-    chrome_options.add_experimental_option("detach", False)
-    prefs = {"download.default_directory": download_dir}
-    chrome_options.add_experimental_option("prefs", prefs)
-
-    driver = webdriver.Chrome(
-        service=Service(ChromeDriverManager().install()), options=chrome_options
-    )
-    wait = WebDriverWait(driver, 25)
+    driver, wait = open_session(download_dir, settings, logger)
 
     try:
-        driver.get(URL)
-        time.sleep(4)
-
-        wait.until(
-            EC.element_to_be_clickable(
-                (By.XPATH, '//*[@id="filterLayout-toggler"]/span/a')
-            )
-        ).click()
-        time.sleep(1)
-
-        wait.until(
-            EC.element_to_be_clickable(
-                (
-                    By.XPATH,
-                    '//*[@id="masterLayout_formlogin"]/div[2]/div/div/div[1]/div[2]/div[3]',
-                )
-            )
-        ).click()
-        time.sleep(1)
-        wait.until(EC.element_to_be_clickable((By.XPATH, state_xpath))).click()
-        time.sleep(3)
-
-        rto_dropdown = wait.until(
-            EC.element_to_be_clickable((By.XPATH, '//*[@id="selectedRto"]/div[3]'))
-        )
-        rto_dropdown.click()
-        time.sleep(1)
-        wait.until(
-            EC.visibility_of_element_located((By.XPATH, '//*[@id="selectedRto_items"]'))
-        )
-        time.sleep(1)
-        all_li = driver.find_elements(
-            By.XPATH,
-            '//*[@id="selectedRto_items"]//li[contains(@class,"ui-selectonemenu-item") and not(contains(@class,"ui-state-disabled"))]',
-        )
-        visible_li = [li for li in all_li if li.is_displayed()]
-        rto_dropdown.click()
-        time.sleep(2)
+        visible_li = select_state_rtos(driver, wait, state_name, settings)
 
         for target in targets:
             n = find_rto_index(visible_li, target.rto_code)
@@ -225,7 +308,6 @@ def rescrape_targets_for_state(state_name, state_xpath, targets, logger):
                 )
                 continue
 
-            xpath = OPTIONS[target.vehicle_type]
             logger.info(
                 "Rescrape %s [%s] index=%s (%s)",
                 target.rto_code,
@@ -233,15 +315,17 @@ def rescrape_targets_for_state(state_name, state_xpath, targets, logger):
                 n,
                 target.expected_filename,
             )
-            success = process_rto(
+            success = run_rto(
                 driver,
                 wait,
                 visible_li,
                 n,
-                xpath,
                 target.vehicle_type,
                 download_dir,
                 logger,
+                settings,
+                ledger=ledger,
+                waiter=waiter,
             )
             if not success:
                 logger.error(
@@ -254,6 +338,8 @@ def rescrape_targets_for_state(state_name, state_xpath, targets, logger):
     except Exception as e:
         logger.error("Rescrape session error for %s: %s", state_name, e)
     finally:
+        ledger.close()
+        release_warm_browsers()
         try:
             driver.quit()
         except Exception:
@@ -272,8 +358,42 @@ def rescrape_targets_for_state(state_name, state_xpath, targets, logger):
             logger.warning("Rescrape temp cleanup failed for %s: %s", state_name, e)
 
 
-def rescrape_missing_files(missing_filenames, logger):
-    """One pass: re-download only missing RTO files, grouped by state."""
+def plan_rescrape_tasks(targets):
+    """Pool tasks for rescrape targets, indexed from the cached RTO lists."""
+    tasks = []
+    for target in targets:
+        cached = RTO_LISTS.load(target.state)
+        n = find_rto_index([o.label for o in cached], target.rto_code) if cached else None
+        # Without a cached index, 0 (the dropdown placeholder) makes the worker look the code up itself
+        tasks.append(ScrapeTask(target.state, n or 0, target.vehicle_type, rto_code=target.rto_code))
+    return tasks
+
+
+def report_rescrape(targets, started, logger):
+    """Log whether each target made it into the ledger during this pass, and when."""
+    ledger = ScrapeLedger(ledger_path(FINAL_DIR))
+    recovered = 0
+    try:
+        for target in targets:
+            done_at = ledger.completed_at(target.rto_code, target.vehicle_type)
+            if done_at is not None and done_at >= started:
+                recovered += 1
+                logger.info("✅ Rescraped %s [%s] after %.1fs", target.rto_code, target.vehicle_type,
+                            done_at - started)
+            else:
+                logger.error("❌ Rescrape failed: %s %s (%s)", target.rto_code, target.vehicle_type,
+                             target.expected_filename)
+    finally:
+        ledger.close()
+    logger.info("Missing-file rescrape: %s/%s recovered in %.1fs", recovered, len(targets), time.time() - started)
+
+
+def rescrape_missing_files(missing_filenames, logger, settings=DEFAULT_SETTINGS, ingest=None):
+    """
+    One pass: re-download only missing RTO files. With the queue scheduler
+    they go through run_task_pool, so states (and the RTOs of one state) are
+    spread over the workers; otherwise one state after another.
+    """
     targets = missing_to_rescrape_targets(missing_filenames)
     if not targets:
         logger.warning("No rescrape targets parsed from missing file list")
@@ -286,32 +406,206 @@ def rescrape_missing_files(missing_filenames, logger):
         len(by_state),
     )
 
+    started = time.time()
+    if settings.scheduler == "queue":
+        ledger = ScrapeLedger(ledger_path(FINAL_DIR))
+        targets = [t for t in targets if not ledger.is_complete(t.rto_code, t.vehicle_type)]
+        ledger.close()
+        unknown = {t.state for t in targets} - set(STATES)
+        for state_name in unknown:
+            logger.error("Unknown state for rescrape targets: %s", state_name)
+        targets = [t for t in targets if t.state not in unknown]
+        if targets:
+            # Short pass: every worker that has a task starts at once, no controller ramp-up
+            pool_settings = replace(settings, workers=min(settings.workers, len(targets)), adaptive=False)
+            run_task_pool(STATES, pool_settings, logger, ingest=ingest, tasks=plan_rescrape_tasks(targets))
+        report_rescrape(targets, started, logger)
+        return
+
     for state_name, state_targets in by_state.items():
         state_xpath = STATES.get(state_name)
         if not state_xpath:
             logger.error("Unknown state for rescrape targets: %s", state_name)
             continue
-        rescrape_targets_for_state(state_name, state_xpath, state_targets, logger)
+        rescrape_targets_for_state(state_name, state_xpath, state_targets, logger, settings)
+    report_rescrape(targets, started, logger)
 
 
-def is_crashed(driver):
-    try:
-        driver.find_element(By.XPATH, "/html/body/form/div[1]/div/nav/div[1]/a[2]/img")
-        return False
-    except NoSuchElementException:
-        return True
-    except Exception:
-        return True
+def apply_all_filters(driver, wait, n, options_name, vehicle_type, waiter, logger, target=DAILY_TARGET):
+    """Select RTO n and re-apply axis, year, month and vehicle class from scratch."""
+    # Select RTO
+    rto_dropdown = wait.until(EC.element_to_be_clickable((By.XPATH, '//*[@id="selectedRto"]/div[3]')))
+    rto_dropdown.click()
+    waiter.settle(driver, 3)
+    
+    rto_option = wait.until(EC.element_to_be_clickable((By.XPATH, f'//*[@id="selectedRto_{n}"]')))
+    rto_option.click()
+    logger.info(f"✅ Selected RTO {n}")
+    waiter.settle(driver, 3)
+
+    # y-axis → Maker
+    wait.until(EC.element_to_be_clickable((By.XPATH, '//*[@id="yaxisVar"]/div[3]'))).click()
+    waiter.settle(driver, 1)
+    wait.until(EC.element_to_be_clickable((By.XPATH, '//*[@id="yaxisVar_4"]'))).click()
+    waiter.settle(driver, 1)
+
+    # x-axis → Fuel
+    wait.until(EC.element_to_be_clickable((By.XPATH, '//*[@id="xaxisVar"]/div[3]'))).click()
+    waiter.settle(driver, 1)
+    wait.until(EC.element_to_be_clickable((By.XPATH, '//*[@id="xaxisVar_3"]'))).click()
+    waiter.settle(driver, 1)
+    # Year dropdown - only if the data year is not the current one
+    year_option = year_option_for(target)
+    if year_option is not None:
+        wait.until(EC.element_to_be_clickable((By.XPATH, '//*[@id="selectedYear"]/div[3]/span'))).click()
+        waiter.settle(driver, 1)
+        wait.until(EC.element_to_be_clickable((By.XPATH, f'//*[@id="selectedYear_{year_option}"]'))).click()
+        waiter.settle(driver, 1)
+
+    # Refresh chart
+    wait.until(EC.element_to_be_clickable((By.XPATH, '/html/body/form/div[2]/div/div/div[1]/div[3]/div[3]/div/button'))).click()
+    logger.info(f"⏱️ Main refresh: {waiter.settle(driver, 3):.2f} s")
+
+    m = target.month
+    print(f"Current month: {m}")
+    wait.until(EC.element_to_be_clickable((By.XPATH, '//*[@id="groupingTable:selectMonth"]/div[3]'))).click()
+    waiter.settle(driver, 1)
+    wait.until(EC.element_to_be_clickable((By.XPATH, f'//*[@id="groupingTable:selectMonth_{m}"]'))).click()
+    waiter.settle(driver, 1)
+
+    if vehicle_type=="motor_cab":
+        wait.until(EC.element_to_be_clickable((By.XPATH, '//*[@id="VhClass"]/tbody/tr[39]/td/label'))).click()
+        waiter.settle(driver, 1)
+        wait.until(EC.element_to_be_clickable((By.XPATH, '//*[@id="VhClass"]/tbody/tr[51]/td/label'))).click()
+        waiter.settle(driver, 1)
+        logger.info(f"selecting Luxury Cab & Maxi Cab")
+
+    # Select vehicle class
+    logger.info(f"Selecting vehicle class: {vehicle_type}")
+    wait.until(EC.element_to_be_clickable((By.XPATH, options_name))).click()
+    waiter.settle(driver, 1)
+
+    # Filter apply / refresh
+    wait.until(EC.element_to_be_clickable((By.XPATH, '/html/body/form/div[2]/div/div/div[3]/div/div[1]/div[1]/span/button'))).click()
+    logger.info(f"⏱️ Table refresh: {waiter.settle(driver, 3):.2f} s")
+
+
+# Widget state read in one round trip: selected option index of each
+# SelectOneMenu and the 1-based VhClass rows whose checkbox is ticked.
+FILTER_STATE_JS = """
+function idx(id) { var s = document.getElementById(id + '_input'); return s ? s.selectedIndex : -1; }
+var rows = document.querySelectorAll('#VhClass > tbody > tr');
+var classRows = [];
+for (var i = 0; i < rows.length; i++) {
+    var cb = rows[i].querySelector('input[type=checkbox]');
+    if (cb && cb.checked) { classRows.push(i + 1); }
+}
+return {y: idx('yaxisVar'), x: idx('xaxisVar'), year: idx('selectedYear'),
+        month: idx('groupingTable:selectMonth'), classRows: classRows};
+"""
+MARK_TABLE_JS = "var t = document.getElementById('groupingTable'); if (t) { t.setAttribute('data-sticky', '1'); }"
+TABLE_RERENDERED_JS = "var t = document.getElementById('groupingTable'); return !t || !t.hasAttribute('data-sticky');"
+
+Y_AXIS_VEHICLE_CLASS = 1  # one row per ticked class: the cheap per-RTO totals query
+Y_AXIS_MAKER = 4
+Y_AXIS_STATE = 5  # one row for the selected state; the dashboard has no RTO y-axis
+X_AXIS_FUEL = 3
+NEW_YEAR_OPTION = 3  # last year's item; the year dropdown lists years newest first
+# VhClass rows (tr index) ticked per vehicle type; motor_cab also takes Luxury Cab & Maxi Cab
+VEHICLE_CLASS_ROWS = {"motor_car": (7,), "motor_cab": (39, 51, 52)}
+ALL_VEHICLE_CLASS_ROWS = tuple(sorted({row for rows in VEHICLE_CLASS_ROWS.values() for row in rows}))
+
+
+def year_option_for(target):
+    """selectedYear item for the target's data year; None keeps the page default (the current year)."""
+    if target.year == Today.year:
+        return None
+    return NEW_YEAR_OPTION + (Today.year - 1 - target.year)
+
+
+def read_filter_state(driver):
+    return driver.execute_script(FILTER_STATE_JS)
+
+
+def apply_sticky_filters(driver, wait, n, vehicle_type, waiter, logger, target=DAILY_TARGET):
+    """
+    Select RTO n, touching the other filters only if the page no longer has them.
+
+    Axis / year are set once per session; the main refresh is only clicked if
+    selecting the RTO did not already re-render the table; month and vehicle
+    classes are only re-applied (and the table refreshed) when they drifted.
+    """
+    state = read_filter_state(driver)
+    axis_changed = False
+    if state["y"] != Y_AXIS_MAKER:
+        wait.until(EC.element_to_be_clickable((By.XPATH, '//*[@id="yaxisVar"]/div[3]'))).click()
+        waiter.settle(driver, 1)
+        wait.until(EC.element_to_be_clickable((By.XPATH, f'//*[@id="yaxisVar_{Y_AXIS_MAKER}"]'))).click()
+        waiter.settle(driver, 1)
+        axis_changed = True
+    if state["x"] != X_AXIS_FUEL:
+        wait.until(EC.element_to_be_clickable((By.XPATH, '//*[@id="xaxisVar"]/div[3]'))).click()
+        waiter.settle(driver, 1)
+        wait.until(EC.element_to_be_clickable((By.XPATH, f'//*[@id="xaxisVar_{X_AXIS_FUEL}"]'))).click()
+        waiter.settle(driver, 1)
+        axis_changed = True
+    year_option = year_option_for(target)
+    if year_option is not None and state["year"] != year_option:
+        wait.until(EC.element_to_be_clickable((By.XPATH, '//*[@id="selectedYear"]/div[3]/span'))).click()
+        waiter.settle(driver, 1)
+        wait.until(EC.element_to_be_clickable((By.XPATH, f'//*[@id="selectedYear_{year_option}"]'))).click()
+        waiter.settle(driver, 1)
+        axis_changed = True
+
+    driver.execute_script(MARK_TABLE_JS)
+    wait.until(EC.element_to_be_clickable((By.XPATH, '//*[@id="selectedRto"]/div[3]'))).click()
+    waiter.settle(driver, 3)
+    wait.until(EC.element_to_be_clickable((By.XPATH, f'//*[@id="selectedRto_{n}"]'))).click()
+    logger.info(f"✅ Selected RTO {n}")
+    waiter.settle(driver, 3)
+
+    if axis_changed or not driver.execute_script(TABLE_RERENDERED_JS):
+        wait.until(EC.element_to_be_clickable((By.XPATH, '/html/body/form/div[2]/div/div/div[1]/div[3]/div[3]/div/button'))).click()
+        logger.info(f"⏱️ Main refresh: {waiter.settle(driver, 3):.2f} s")
+
+    state = read_filter_state(driver)
+    table_changed = False
+    if state["month"] != target.month:
+        wait.until(EC.element_to_be_clickable((By.XPATH, '//*[@id="groupingTable:selectMonth"]/div[3]'))).click()
+        waiter.settle(driver, 1)
+        wait.until(EC.element_to_be_clickable((By.XPATH, f'//*[@id="groupingTable:selectMonth_{target.month}"]'))).click()
+        waiter.settle(driver, 1)
+        table_changed = True
+
+    # Labels toggle their checkbox, so only click rows whose state is wrong
+    for row in sorted(set(VEHICLE_CLASS_ROWS[vehicle_type]) ^ set(state["classRows"])):
+        wait.until(EC.element_to_be_clickable((By.XPATH, f'//*[@id="VhClass"]/tbody/tr[{row}]/td/label'))).click()
+        waiter.settle(driver, 1)
+        table_changed = True
+
+    if table_changed:
+        wait.until(EC.element_to_be_clickable((By.XPATH, '/html/body/form/div[2]/div/div/div[3]/div/div[1]/div[1]/span/button'))).click()
+        logger.info(f"⏱️ Table refresh: {waiter.settle(driver, 3):.2f} s")
+    logger.info(f"📌 Sticky filters: axis {'set' if axis_changed else 'kept'}, "
+                f"month/class {'re-applied' if table_changed else 'kept'}")
 
 
+def apply_scripted_filters(driver, n, vehicle_type, logger, target=DAILY_TARGET):
+    """apply_all_filters as two in-page action scripts (pf_actions) instead of ~20 WebDriver clicks."""
+    rto = run_steps(driver, rto_steps(n, Y_AXIS_MAKER, X_AXIS_FUEL, year_option_for(target)))
+    logger.info(f"✅ Selected RTO {n}")
+    table = run_steps(driver, table_steps(target.month, VEHICLE_CLASS_ROWS[vehicle_type], ALL_VEHICLE_CLASS_ROWS))
+    logger.info(f"⚡ Filters applied in-page in {(rto['round_trip_s'] + table['round_trip_s']):.2f} s "
+                f"({rto['ms'] + table['ms']} ms spent waiting on the page)")
 
 
-def process_rto(driver, wait, visible_li, n, options_name, vehicle_type, download_dir, logger):
+def process_rto(driver, wait, visible_li, n, options_name, vehicle_type, download_dir, logger, ledger=None,
+                waiter=None, settings=DEFAULT_SETTINGS, target=DAILY_TARGET):
     """Process a single RTO"""
+    if waiter is None:
+        waiter = PageWaiter("fixed")
+    waiter.start_rto()
     try:
-        def li_text(li):
-            return (li.text or li.get_attribute("textContent") or "").strip()
-
         if n >= len(visible_li):
             logger.error(f"Index {n} out of range for visible_li (len={len(visible_li)})")
             return False
@@ -319,87 +613,207 @@ def process_rto(driver, wait, visible_li, n, options_name, vehicle_type, downloa
         rto_name = li_text(visible_li[n])
         logger.info(f"================= RTO option {n}: {rto_name} =================")
 
-        # Select RTO
-        rto_dropdown = wait.until(EC.element_to_be_clickable((By.XPATH, '//*[@id="selectedRto"]/div[3]')))
-        rto_dropdown.click()
-        time.sleep(3)
-        
-        rto_option = wait.until(EC.element_to_be_clickable((By.XPATH, f'//*[@id="selectedRto_{n}"]')))
-        rto_option.click()
-        logger.info(f"✅ Selected RTO {n}")
-        time.sleep(3)
+        if settings.action_script:
+            apply_scripted_filters(driver, n, vehicle_type, logger, target)
+        elif settings.sticky_filters:
+            apply_sticky_filters(driver, wait, n, vehicle_type, waiter, logger, target)
+        else:
+            apply_all_filters(driver, wait, n, options_name, vehicle_type, waiter, logger, target)
+
+        if settings.capture == "table":
+            final_path = save_grid(read_grouping_table(driver), safe_file_stem(rto_name, vehicle_type), target.folder)
+            logger.info(f"📋 Read grouping table into: {final_path}")
+        elif settings.capture == "cdp":
+            final_path = download_via_capture(driver, wait, rto_name, vehicle_type, logger, final_dir=target.folder)
+            if not final_path:
+                driver.quit()
+                return False
+        else:
+            retry_count = 0
+            while True:
+                retry_count += 1
+                wait.until(EC.element_to_be_clickable((By.XPATH, '/html/body/form/div[2]/div/div/div[3]/div/div[2]/div/div/div[1]/div[1]/a/img'))).click()
+                logger.info(f"📥 Download triggered (attempt {retry_count})")
+                waiter.settle_download(download_dir, 2)
+                if retry_count > 10:
+                    logger.error(f"❌ Failed to download Excel file after {retry_count} attempts")
+                    driver.quit()
+                    return False
+                final_path = download_rename(rto_name, vehicle_type, download_dir, logger, final_dir=target.folder)
+                if final_path:
+                    break
+                logger.info("🔁 No Excel file found, retrying download...")
+
+        rto_code = rto_code_from_label(rto_name)
+        if ledger is not None and rto_code:
+            ledger.record(rto_code, vehicle_type, final_path)
+        waiter.finish_rto()
+        return True
 
-        # y-axis → Maker
-        wait.until(EC.element_to_be_clickable((By.XPATH, '//*[@id="yaxisVar"]/div[3]'))).click()
-        time.sleep(1)
-        wait.until(EC.element_to_be_clickable((By.XPATH, '//*[@id="yaxisVar_4"]'))).click()
-        time.sleep(1)
+    except Exception as e:
+        logger.error(f"❌ Error at RTO {n}: {e}")
+        driver.quit()
+        return False
 
-        # x-axis → Fuel
-        wait.until(EC.element_to_be_clickable((By.XPATH, '//*[@id="xaxisVar"]/div[3]'))).click()
-        time.sleep(1)
-        wait.until(EC.element_to_be_clickable((By.XPATH, '//*[@id="xaxisVar_3"]'))).click()
-        time.sleep(1)
-        # Year dropdown - only if new year
-        if new_year:
-            wait.until(EC.element_to_be_clickable((By.XPATH, '//*[@id="selectedYear"]/div[3]/span'))).click()
-            time.sleep(1)
-            wait.until(EC.element_to_be_clickable((By.XPATH, '//*[@id="selectedYear_3"]'))).click()
-            time.sleep(1)
 
-        # Refresh chart
-        wait.until(EC.element_to_be_clickable((By.XPATH, '/html/body/form/div[2]/div/div/div[1]/div[3]/div[3]/div/button'))).click()
-        time.sleep(3)
+def safe_file_stem(rto_name, vehicle_type):
+    """{rto_name}_{vehicle_type} with characters Windows forbids in file names blanked out."""
+    rto_name = re.sub(r'[\\/:*?"<>|]', " ", rto_name).strip()
+    return f"{rto_name}_{vehicle_type}"
 
-        m = month
-        print(f"Current month: {m}")
-        wait.until(EC.element_to_be_clickable((By.XPATH, '//*[@id="groupingTable:selectMonth"]/div[3]'))).click()
-        time.sleep(1)
-        wait.until(EC.element_to_be_clickable((By.XPATH, f'//*[@id="groupingTable:selectMonth_{m}"]'))).click()
-        time.sleep(1)
 
+def export_file_name(body, vehicle_type):
+    """renameCheck's final name ({rto from header}_{vehicle_type}.xlsx) read from the export bytes; None without a header."""
+    rto_from_header = extract_rto_from_header(read_header_text(io.BytesIO(body)))
+    return f"{safe_file_stem(rto_from_header, vehicle_type)}.xlsx" if rto_from_header else None
 
 
-        if vehicle_type=="motor_cab":
-            wait.until(EC.element_to_be_clickable((By.XPATH, '//*[@id="VhClass"]/tbody/tr[39]/td/label'))).click()
-            time.sleep(1)
-            wait.until(EC.element_to_be_clickable((By.XPATH, '//*[@id="VhClass"]/tbody/tr[51]/td/label'))).click()
-            time.sleep(1)
-            logger.info(f"selecting Luxury Cab & Maxi Cab")
+def save_export(body, vehicle_type, logger, name_from_header=False, final_dir=None):
+    """Write exported xlsx bytes into final_dir (FINAL_DIR) under the same name download_rename uses,
+    or straight under the header-derived final name when name_from_header is set."""
+    final_dir = final_dir or FINAL_DIR
+    os.makedirs(final_dir, exist_ok=True)
+    base_name = export_file_name(body, vehicle_type) if name_from_header else None
+    final_path = os.path.join(final_dir, base_name or f"{uuid.uuid4()}_{vehicle_type}.xlsx")
+    with open(final_path, "wb") as f:
+        f.write(body)
+    logger.info(f"Saved export to: {final_path}")
+    return final_path
 
-        # Select vehicle class
-        logger.info(f"Selecting vehicle class: {vehicle_type}")
-        wait.until(EC.element_to_be_clickable((By.XPATH, options_name))).click()
-        time.sleep(1)
 
-        # Filter apply / refresh
-        wait.until(EC.element_to_be_clickable((By.XPATH, '/html/body/form/div[2]/div/div/div[3]/div/div[1]/div[1]/span/button'))).click()
-        time.sleep(3)
+def download_via_capture(driver, wait, rto_name, vehicle_type, logger, attempts=3, final_dir=None):
+    """Click export and take the xlsx bytes from the CDP capture instead of the downloads folder."""
+    capture = export_capture_for(driver)
+    tag = (rto_code_from_label(rto_name), vehicle_type)
+    for attempt in range(1, attempts + 1):
+        capture.expect(tag)
+        wait.until(EC.element_to_be_clickable((By.XPATH, '/html/body/form/div[2]/div/div/div[3]/div/div[2]/div/div/div[1]/div[1]/a/img'))).click()
+        logger.info(f"📥 Export triggered (attempt {attempt}, CDP capture)")
+        try:
+            export = capture.wait(timeout=60)
+        except ExportCaptureError as e:
+            logger.warning(f"🔁 {e}, retrying export...")
+            continue
+        if export.tag != tag:
+            logger.warning(f"🔁 Captured export tagged {export.tag}, expected {tag}; retrying")
+            continue
+        return save_export(export.body, vehicle_type, logger, name_from_header=True, final_dir=final_dir)
+    logger.error(f"❌ No export captured for {tag} after {attempts} attempts")
+    return None
 
-        retry_count = 0
-        while True:
-            retry_count += 1
-            wait.until(EC.element_to_be_clickable((By.XPATH, '/html/body/form/div[2]/div/div/div[3]/div/div[2]/div/div/div[1]/div[1]/a/img'))).click()
-            logger.info(f"📥 Download triggered (attempt {retry_count})")
-            time.sleep(2)
-            if retry_count > 10:
-                logger.error(f"❌ Failed to download Excel file after {retry_count} attempts")
-                driver.quit()
-                return False
-            success = download_rename(rto_name, vehicle_type, download_dir, logger)
-            if success:
-                break
-            logger.info("🔁 No Excel file found, retrying download...")
+
+def process_rto_http(session, visible_li, n, vehicle_type, logger, ledger=None, target=DAILY_TARGET):
+    """HTTP-engine counterpart of process_rto: same task, same output file, no browser."""
+    try:
+        if n >= len(visible_li):
+            logger.error(f"Index {n} out of range for visible_li (len={len(visible_li)})")
+            return False
+
+        rto_name = li_text(visible_li[n])
+        logger.info(f"================= RTO option {n}: {rto_name} (http) =================")
+        year = target.year if year_option_for(target) is not None else None
+        body = session.export(n, vehicle_type, target.month, year=year)
+        final_path = save_export(body, vehicle_type, logger, final_dir=target.folder)
+
+        rto_code = rto_code_from_label(rto_name)
+        if ledger is not None and rto_code:
+            ledger.record(rto_code, vehicle_type, final_path)
         return True
 
     except Exception as e:
         logger.error(f"❌ Error at RTO {n}: {e}")
-        driver.quit()
         return False
 
 
-def process_state(state_name, state_xpath, start_index=1, shared_dict=None):
-    """Process a state - will run until completion, no maximum retries"""
+def open_session(download_dir, settings, logger=None):
+    """Start a session for the configured engine: a Chrome driver or a JSF HTTP session."""
+    if settings.engine == "http":
+        return JsfExportSession(URL, sticky=settings.sticky_filters).open(), None
+    return acquire_driver(download_dir, settings, logger)
+
+
+def select_state_rtos(driver, wait, state_name, settings):
+    """Select a state and return its RTO labels."""
+    if settings.engine == "http":
+        labels = driver.select_state(state_name)
+        RTO_LISTS.store(state_name, options_from_labels(labels))
+        return labels
+    return load_state_rtos(driver, wait, state_name)
+
+
+def run_rto(driver, wait, visible_li, n, vehicle_type, download_dir, logger, settings, ledger=None, waiter=None,
+            target=DAILY_TARGET):
+    """Download one RTO / vehicle-type sheet with the configured engine."""
+    if settings.engine == "http":
+        return process_rto_http(driver, visible_li, n, vehicle_type, logger, ledger=ledger, target=target)
+    return process_rto(driver, wait, visible_li, n, OPTIONS[vehicle_type], vehicle_type, download_dir, logger,
+                       ledger=ledger, waiter=waiter, settings=settings, target=target)
+
+
+def process_state_http(state_name, shared_dict=None, settings=DEFAULT_SETTINGS, target=DAILY_TARGET):
+    """process_state for the HTTP engine: one JSF session, fresh session on any failure."""
+    logger = get_logger(
+        name=f"STATE-{state_name}",
+        filename=f"{final_folder}_{state_name}.log"
+    )
+    logger.info(f"🚀 Starting HTTP export for {state_name}")
+    ledger = ScrapeLedger(ledger_path(target.folder))
+    state_success = False
+    session = None
+
+    try:
+        completed = ledger.completed_keys()
+        pending_rtos = None
+        while pending_rtos is None or pending_rtos:
+            if session is not None:
+                session.close()
+                logger.info(f"Still have {len(pending_rtos)} failed RTOs, will keep retrying...")
+                time.sleep(3)
+            session = JsfExportSession(URL, sticky=settings.sticky_filters).open()
+            labels = session.select_state(state_name)
+            if pending_rtos is None:
+                logger.info(f"Total RTO options for {state_name}: {len(labels)}")
+                pending_rtos = [
+                    (n, vehicle_type)
+                    for vehicle_type in OPTIONS
+                    for n in range(1, len(labels))
+                    if (rto_code_from_label(labels[n]), vehicle_type) not in completed
+                ]
+
+            still_failed = []
+            for n, vehicle_type in pending_rtos:
+                if not process_rto_http(session, labels, n, vehicle_type, logger, ledger=ledger, target=target):
+                    still_failed.append((n, vehicle_type))
+                    # ViewState is likely gone; start over with a fresh session
+                    session.close()
+                    session = JsfExportSession(URL, sticky=settings.sticky_filters).open()
+                    labels = session.select_state(state_name)
+            pending_rtos = still_failed
+
+        logger.info(f"\n✅ {state_name} completed successfully - ALL RTOs processed!")
+        state_success = True
+
+    except Exception as e:
+        logger.error(f"❌ Fatal error in {state_name}: {e}")
+        state_success = False
+
+    finally:
+        ledger.close()
+        if session is not None:
+            session.close()
+        if shared_dict is not None:
+            shared_dict[state_name] = state_success
+            logger.info(f"📊 Reported status for {state_name}: {state_success}")
+
+    return state_success
+
+
+def process_state(state_name, state_xpath, start_index=1, shared_dict=None, settings=DEFAULT_SETTINGS,
+                  target=DAILY_TARGET):
+    """Process a state for target's data month - will run until completion, no maximum retries"""
+    if settings.engine == "http":
+        return process_state_http(state_name, shared_dict, settings, target)
+
     logger = get_logger(
         name=f"STATE-{state_name}",
         filename=f"{final_folder}_{state_name}.log"
@@ -411,48 +825,25 @@ def process_state(state_name, state_xpath, start_index=1, shared_dict=None):
     download_dir = os.path.join(os.path.expanduser("~"), "Downloads", f"{state_name}_temp")
     os.makedirs(download_dir, exist_ok=True)
     
-    chrome_options = Options()
-    chrome_options.add_argument("--start-maximized")
-    #chrome_options.add_argument("--headless=new") 
-    chrome_options.add_argument("--disable-notifications")
-    chrome_options.add_experimental_option("detach", False)
-    prefs = {"download.default_directory": download_dir}
-    chrome_options.add_experimental_option("prefs", prefs)
-
-    driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=chrome_options)
-    wait = WebDriverWait(driver, 25)
+    driver, wait = acquire_driver(download_dir, settings, logger)
+    recycler = BrowserRecycler(partial(prepared_browser, download_dir, state_name, settings, logger, state_xpath),
+                               recycle_policy(settings), logger)
+
+    ledger = ScrapeLedger(ledger_path(target.folder))
+    waiter = PageWaiter(settings.wait_mode)
+    health = PageHealth()
+    breakers = StateBreakers()
+    completed = ledger.completed_keys()
+    if completed:
+        logger.info(f"📒 Ledger has {len(completed)} completed file(s); they will be skipped")
 
     failed_rtos = []
     state_success = False
 
     try:
-        driver.get(URL)
-        time.sleep(4)
-
-        # Open filter
-        wait.until(EC.element_to_be_clickable((By.XPATH, '//*[@id="filterLayout-toggler"]/span/a'))).click()
-        time.sleep(1)
-
-        # Select state
-        wait.until(EC.element_to_be_clickable((By.XPATH, '//*[@id="masterLayout_formlogin"]/div[2]/div/div/div[1]/div[2]/div[3]'))).click()
-        time.sleep(1)
-        wait.until(EC.element_to_be_clickable((By.XPATH, state_xpath))).click()
+        # Select state and get RTO list
+        visible_li = load_state_rtos(driver, wait, state_name, state_xpath)
         logger.info(f"✅ Selected state: {state_name}")
-        time.sleep(3)
-
-        # Get RTO list
-        rto_dropdown = wait.until(EC.element_to_be_clickable((By.XPATH, '//*[@id="selectedRto"]/div[3]')))
-        rto_dropdown.click()
-        time.sleep(1)
-
-        wait.until(EC.visibility_of_element_located((By.XPATH, '//*[@id="selectedRto_items"]')))
-        time.sleep(1)
-        all_li = driver.find_elements(By.XPATH,
-                                      '//*[@id="selectedRto_items"]//li[contains(@class,"ui-selectonemenu-item") and not(contains(@class,"ui-state-disabled"))]')
-        visible_li = [li for li in all_li if li.is_displayed()]
-
-        rto_dropdown.click()
-        time.sleep(2)
 
         logger.info(f"Total RTO options for {state_name}: {len(visible_li)}")
 
@@ -468,9 +859,22 @@ def process_state(state_name, state_xpath, start_index=1, shared_dict=None):
             # INFINITE LOOP - will keep retrying until all RTOs are processed
             while n < len(visible_li):
 
-                # Crash detection before each iteration
-                if is_crashed(driver):
-                    logger.error("❌ Site crashed / 503 detected!")
+                # Health check before each iteration; a blank page or expired view is reloaded in place
+                health_check = check_and_recover(driver, URL, health, breakers, state_name, logger)
+                if health_check == UNAVAILABLE:
+                    time.sleep(max(breakers.paused_for(state_name), 3))
+                    continue
+                if health_check == RELOADED:
+                    try:
+                        visible_li = load_state_rtos(driver, wait, state_name, state_xpath)
+                        logger.info(f"🔁 State reselected after reload (resuming at index {n})")
+                    except Exception as e:
+                        logger.error(f"Failed to reselect the state after reload: {e}")
+                        health.suspect()
+                        time.sleep(3)
+                    continue
+                if health_check == RESTART:
+                    logger.error("❌ Browser unresponsive or the page would not reload!")
                     time.sleep(3)
                     try:
                         driver.quit()
@@ -481,42 +885,20 @@ def process_state(state_name, state_xpath, start_index=1, shared_dict=None):
                     logger.info(f"🔄 Crash restart #{crash_restarts} - will keep trying...")
 
                     # Restart browser and re-initialize everything needed
-                    driver, wait = restart_driver(state_name, download_dir, logger)
+                    recycler.reset()
+                    driver, wait = restart_driver(state_name, download_dir, logger, settings=settings)
+                    health.suspect()
 
                     # Re-open filter, reselect state and re-populate visible_li
                     try:
-                        # open filter
-                        wait.until(EC.element_to_be_clickable((By.XPATH, '//*[@id="filterLayout-toggler"]/span/a'))).click()
-                        time.sleep(1)
-
-                        # select state area and the state itself
-                        wait.until(EC.element_to_be_clickable((By.XPATH,
-                                                              '//*[@id="masterLayout_formlogin"]/div[2]/div/div/div[1]/div[2]/div[3]'))).click()
-                        time.sleep(1)
-                        wait.until(EC.element_to_be_clickable((By.XPATH, state_xpath))).click()
-                        time.sleep(1)
+                        # Reselect the state; the RTO list comes from the per-day cache
+                        visible_li = load_state_rtos(driver, wait, state_name, state_xpath)
                         logger.info("🔁 State reloaded successfully after crash")
-
-                        # RELOAD RTO LIST (important: visible_li must point to elements from this driver)
-                        rto_dropdown = wait.until(EC.element_to_be_clickable((By.XPATH, '//*[@id="selectedRto"]/div[3]')))
-                        rto_dropdown.click()
-                        time.sleep(1)
-
-                        wait.until(EC.visibility_of_element_located((By.XPATH, '//*[@id="selectedRto_items"]')))
-                        time.sleep(1)
-
-                        all_li = driver.find_elements(By.XPATH,
-                                                      '//*[@id="selectedRto_items"]//li[contains(@class,"ui-selectonemenu-item") and not(contains(@class,"ui-state-disabled"))]')
-                        visible_li = [li for li in all_li if li.is_displayed()]
-
-                        rto_dropdown.click()
-                        time.sleep(1)
-
                         logger.info(f"🔁 Re-populated visible_li, count: {len(visible_li)} (resuming at index {n})")
 
                         # Re-select month so subsequent process_rto calls use same month
                         try:
-                            m = month
+                            m = target.month
                             wait.until(EC.element_to_be_clickable((By.XPATH, '//*[@id="groupingTable:selectMonth"]/div[3]'))).click()
                             time.sleep(1)
                             wait.until(EC.element_to_be_clickable((By.XPATH, f'//*[@id="groupingTable:selectMonth_{m}"]'))).click()
@@ -532,9 +914,26 @@ def process_state(state_name, state_xpath, start_index=1, shared_dict=None):
                     continue
 
                 try:
-                    success = process_rto(driver, wait, visible_li, n, xpath, vehicle_type, download_dir, logger)
-                    if not success:
+                    if (rto_code_from_label(li_text(visible_li[n])), vehicle_type) in completed:
+                        logger.info(f"⏭️ RTO {n} [{vehicle_type}] already in ledger, skipping")
+                        n += 1
+                        continue
+
+                    # Safe point between RTOs: swap in a fresh browser before this one bloats into a crash
+                    if recycler.observe(driver):
+                        fresh = recycler.handover(driver)
+                        if fresh is not None:
+                            driver, wait, _, visible_li = fresh
+
+                    success = process_rto(driver, wait, visible_li, n, xpath, vehicle_type, download_dir, logger,
+                                          ledger=ledger, waiter=waiter, settings=settings, target=target)
+                    if success:
+                        recycler.note_export()
+                        health.note_ok()
+                        breakers.record_success(state_name)
+                    else:
                         failed_rtos.append((n, vehicle_type, xpath))
+                        health.suspect()
                     n += 1
                     time.sleep(1)
 
@@ -548,7 +947,9 @@ def process_state(state_name, state_xpath, start_index=1, shared_dict=None):
                     crash_restarts += 1
                     logger.info(f"🔄 Exception restart #{crash_restarts} - will keep trying...")
 
-                    driver, wait = restart_driver(state_name, download_dir, logger)
+                    recycler.reset()
+                    driver, wait = restart_driver(state_name, download_dir, logger, settings=settings)
+                    health.suspect()
                     time.sleep(3)
                     continue
 
@@ -560,42 +961,42 @@ def process_state(state_name, state_xpath, start_index=1, shared_dict=None):
             logger.info(f"\n🔁 Retry attempt #{retry_count} for {state_name} - {len(failed_rtos)} RTOs remaining")
             still_failed = []
 
-            if is_crashed(driver):
+            health_check = check_and_recover(driver, URL, health, breakers, state_name, logger)
+            if health_check == UNAVAILABLE:
+                time.sleep(max(breakers.paused_for(state_name), 3))
+                continue
+            if health_check == RESTART:
                 time.sleep(3)
-                logger.warning("Driver crashed before retry loop. Restarting...")
+                logger.warning("Browser unresponsive before retry loop. Restarting...")
                 try:
                     driver.quit()
                 except Exception:
                     pass
-                driver, wait = restart_driver(state_name, download_dir, logger)
+                recycler.reset()
+                driver, wait = restart_driver(state_name, download_dir, logger, settings=settings)
+                health.suspect()
+            if health_check != HEALTHY:
                 # re-populate visible_li
                 try:
-                    wait.until(EC.element_to_be_clickable((By.XPATH, '//*[@id="filterLayout-toggler"]/span/a'))).click()
-                    time.sleep(1)
-                    wait.until(EC.element_to_be_clickable((By.XPATH, '//*[@id="masterLayout_formlogin"]/div[2]/div/div/div[1]/div[2]/div[3]'))).click()
-                    time.sleep(1)
-                    wait.until(EC.element_to_be_clickable((By.XPATH, state_xpath))).click()
-                    time.sleep(2)
-                    
-                    rto_dropdown = wait.until(EC.element_to_be_clickable((By.XPATH, '//*[@id="selectedRto"]/div[3]')))
-                    rto_dropdown.click()
-                    time.sleep(1)
-                    wait.until(EC.visibility_of_element_located((By.XPATH, '//*[@id="selectedRto_items"]')))
-                    time.sleep(1)
-                    all_li = driver.find_elements(By.XPATH,
-                                                  '//*[@id="selectedRto_items"]//li[contains(@class,"ui-selectonemenu-item") and not(contains(@class,"ui-state-disabled"))]')
-                    visible_li = [li for li in all_li if li.is_displayed()]
-                    rto_dropdown.click()
-                    time.sleep(1)
+                    visible_li = load_state_rtos(driver, wait, state_name, state_xpath)
                 except Exception as e:
                     logger.warning(f"Could not repopulate visible_li for retries: {e}")
                     time.sleep(3)
                     continue
 
             for n, vehicle_type, xpath in failed_rtos:
-                success = process_rto(driver, wait, visible_li, n, xpath, vehicle_type, download_dir, logger)
-                if not success:
+                if recycler.observe(driver):
+                    fresh = recycler.handover(driver)
+                    if fresh is not None:
+                        driver, wait, _, visible_li = fresh
+                success = process_rto(driver, wait, visible_li, n, xpath, vehicle_type, download_dir, logger,
+                                      ledger=ledger, waiter=waiter, settings=settings, target=target)
+                if success:
+                    recycler.note_export()
+                    health.note_ok()
+                else:
                     still_failed.append((n, vehicle_type, xpath))
+                    health.suspect()
                 time.sleep(1)
             
             failed_rtos = still_failed
@@ -613,6 +1014,11 @@ def process_state(state_name, state_xpath, start_index=1, shared_dict=None):
         state_success = False
 
     finally:
+        ledger.close()
+        recycler.reset()
+        release_warm_browsers()
+        for line in format_wait_summary(waiter.summary()):
+            logger.info(f"⏱️ {line}")
         if shared_dict is not None:
             shared_dict[state_name] = state_success
             logger.info(f"📊 Reported status for {state_name}: {state_success}")
@@ -630,7 +1036,7 @@ def process_state(state_name, state_xpath, start_index=1, shared_dict=None):
                     if file.endswith(".xlsx"):
                         shutil.move(
                             os.path.join(download_dir, file),
-                            os.path.join(FINAL_DIR, file)
+                            os.path.join(target.folder, file)
                         )
                 shutil.rmtree(download_dir)
         except Exception as e:
@@ -639,24 +1045,901 @@ def process_state(state_name, state_xpath, start_index=1, shared_dict=None):
     return state_success
 
 
-def main():
-    logger = get_logger("MAIN", f"{final_folder}_main.log")
+# -------- Work-stealing task queue --------
+
+@dataclass(frozen=True)
+class ScrapeTask:
+    """One unit of work on the shared queue.
+
+    rto_index=None is an expand task: the worker that picks it up reads the
+    state's RTO dropdown and enqueues one task per (RTO, vehicle class).
+    Tasks planned from the RTO list cache carry rto_code so a worker can
+    re-resolve the index if the dropdown has changed since. target is the
+    data month (None: the daily run).
+    """
+    state: str
+    rto_index: int | None = None
+    vehicle_type: str | None = None
+    attempt: int = 0
+    rto_code: str = ""
+    target: RunTarget | None = None
+
+    @property
+    def run_target(self) -> RunTarget:
+        return self.target or DAILY_TARGET
+
+
+def plan_state_tasks(state_name, labels, completed, target=None):
+    """One task per (RTO, vehicle class) not yet in the ledger; index 0 is the dropdown placeholder."""
+    tasks = []
+    for vehicle_type in OPTIONS:
+        for n in range(1, len(labels)):
+            code = rto_code_from_label(li_text(labels[n]))
+            if (code, vehicle_type) not in completed:
+                tasks.append(ScrapeTask(state_name, n, vehicle_type, rto_code=code, target=target))
+    return tasks
+
+
+def target_ledger(ledgers, target):
+    """The ledger of target's folder, opened once per worker and kept in ledgers."""
+    ledger = ledgers.get(target.folder)
+    if ledger is None:
+        ledger = ledgers[target.folder] = ScrapeLedger(ledger_path(target.folder))
+    return ledger
+
+
+def read_rto_dropdown(driver, wait):
+    """Open the RTO dropdown and read its visible items one by one (fallback for the script read)."""
+    rto_dropdown = wait.until(EC.element_to_be_clickable((By.XPATH, '//*[@id="selectedRto"]/div[3]')))
+    rto_dropdown.click()
+    time.sleep(1)
+    wait.until(EC.visibility_of_element_located((By.XPATH, '//*[@id="selectedRto_items"]')))
+    time.sleep(1)
+    all_li = driver.find_elements(By.XPATH,
+                                  '//*[@id="selectedRto_items"]//li[contains(@class,"ui-selectonemenu-item") and not(contains(@class,"ui-state-disabled"))]')
+    labels = [li_text(li) for li in all_li if li.is_displayed()]
+    rto_dropdown.click()
+    time.sleep(2)
+    return labels
+
+
+def load_state_rtos(driver, wait, state_name, state_xpath=None):
+    """
+    Open the filter, select a state and return its RTO labels in dropdown order.
+
+    The list comes from the per-day RTO list cache as long as the page still
+    reports the same number of items; otherwise it is read in one script call
+    (or, if the panel is not rendered, from the opened dropdown) and cached.
+    """
+    wait.until(EC.element_to_be_clickable((By.XPATH, '//*[@id="filterLayout-toggler"]/span/a'))).click()
+    time.sleep(1)
+    wait.until(EC.element_to_be_clickable((By.XPATH, '//*[@id="masterLayout_formlogin"]/div[2]/div/div/div[1]/div[2]/div[3]'))).click()
+    time.sleep(1)
+    wait.until(EC.element_to_be_clickable((By.XPATH, state_xpath or STATES[state_name]))).click()
+    time.sleep(3)
+
+    labels, _ = RTO_LISTS.labels(driver, state_name)
+    if not labels:
+        labels = read_rto_dropdown(driver, wait)
+        RTO_LISTS.store(state_name, options_from_labels(labels))
+    return labels
+
+
+def resolve_task_index(task, labels, logger):
+    """Dropdown index for task, re-resolved by rto_code if the list changed since planning."""
+    n = task.rto_index
+    if task.rto_code and (n >= len(labels) or rto_code_from_label(li_text(labels[n])) != task.rto_code):
+        n = find_rto_index(labels, task.rto_code)
+        if task.rto_index:
+            logger.warning(f"RTO list changed since planning; {task.rto_code} is now at index {n}")
+    return n
+
+
+def enqueue_task(task_queue, pending, task):
+    with pending.get_lock():
+        pending.value += 1
+    task_queue.put(task)
+
+
+def announce_file(ingest_queue, ledger, task):
+    """Hand the task's saved file (as recorded in the ledger) to the streaming ingestion stage."""
+    path = ledger.file_path(task.rto_code, task.vehicle_type) if task.rto_code else None
+    if path:
+        ingest_queue.put((path, task.run_target.as_of))
+
+
+def park_worker(worker_id, control, driver, logger):
+    """Quit the browser (and any spares) and sleep while the concurrency controller has this worker switched off."""
+    logger.info(f"⏸️ Worker {worker_id} parked by the concurrency controller")
+    try:
+        if driver is not None:
+            driver.quit()
+    except Exception:
+        pass
+    release_warm_browsers()
+    while not control.is_active(worker_id):
+        time.sleep(2)
+    logger.info(f"▶️ Worker {worker_id} resumed")
+    return None
+
+
+class SiteUnavailable(Exception):
+    """The site answers 503: hand the task back without spending one of its attempts."""
+
+
+def browser_worker(worker_id, task_queue, pending, in_flight, stats, settings=DEFAULT_SETTINGS, control=None,
+                   ingest_queue=None, breakers=None):
+    """
+    Pull tasks from the shared queue until a None sentinel arrives; finished
+    files go to ingest_queue. breakers is the pool's shared dict of per-state
+    circuit breakers: tasks of a paused state are handed back.
+    """
+    logger = get_logger(
+        name=f"WORKER-{worker_id}",
+        filename=f"{final_folder}_worker{worker_id}.log"
+    )
+    download_dir = os.path.join(os.path.expanduser("~"), "Downloads", f"worker{worker_id}_temp")
+    os.makedirs(download_dir, exist_ok=True)
+
+    ledgers = {}
+    waiter = PageWaiter(settings.wait_mode)
+    health = PageHealth()
+    breakers = StateBreakers(breakers)
+    driver = wait = None
+    current_state = current_target = None
+    visible_li = []
+    worker_stats = stats.get(worker_id) or {"done": 0, "failed": 0, "busy_s": 0.0, "started": time.time()}
+    # The replacement is warmed with whatever state this worker is on at the time
+    recycler = None
+    if settings.engine == "browser":
+        recycler = BrowserRecycler(lambda: prepared_browser(download_dir, current_state, settings, logger),
+                                   recycle_policy(settings), logger)
+
+    try:
+        while True:
+            if control is not None and not control.is_active(worker_id):
+                if recycler is not None:
+                    recycler.reset()
+                driver = park_worker(worker_id, control, driver, logger)
+            task = task_queue.get()
+            if task is None:
+                break
+            # Off the queue from here on: if this process dies, the pool hands it back
+            in_flight[worker_id] = [task]
+            paused = breakers.paused_for(task.state)
+            if paused:
+                # Still counted in pending: put it back and give other states' tasks a turn
+                task_queue.put(task)
+                in_flight.pop(worker_id, None)
+                time.sleep(min(paused, 5))
+                continue
+            if control is not None and task.rto_index is not None:
+                control.limiter.acquire()
+
+            t0 = time.time()
+            try:
+                health_check = HEALTHY
+                if driver is None:
+                    driver, wait = open_session(download_dir, settings, logger)
+                    current_state = current_target = None
+                    health.suspect()
+                elif settings.engine == "browser":
+                    health_check = check_and_recover(driver, URL, health, breakers, task.state, logger)
+                if health_check != HEALTHY and control is not None:
+                    control.record_crash()
+                if health_check == UNAVAILABLE:
+                    raise SiteUnavailable()
+                if health_check == RESTART:
+                    logger.error("❌ Browser unresponsive or the page would not reload!")
+                    try:
+                        driver.quit()
+                    except Exception:
+                        pass
+                    if recycler is not None:
+                        recycler.reset()
+                    driver, wait = restart_driver(task.state, download_dir, logger, settings=settings)
+                    current_state = current_target = None
+                    health.suspect()
+                elif health_check == RELOADED:
+                    current_state = current_target = None
+                elif recycler is not None and task.rto_index is not None and recycler.observe(driver):
+                    # Safe point between RTOs: hand this task to a fresh browser
+                    fresh = recycler.handover(driver)
+                    if fresh is not None:
+                        driver, wait, current_state, visible_li = fresh
+                        current_target = None
+
+                target = task.run_target
+                if target != current_target:
+                    if current_target is not None:
+                        # Year and month stick to the page; start another data month from a clean view
+                        if settings.engine == "http":
+                            try:
+                                driver.quit()
+                            except Exception:
+                                pass
+                            driver, wait = open_session(download_dir, settings, logger)
+                        else:
+                            driver.get(URL)
+                        current_state = None
+                    current_target = target
+                ledger = target_ledger(ledgers, target)
+
+                if task.state != current_state:
+                    visible_li = select_state_rtos(driver, wait, task.state, settings)
+                    current_state = task.state
+                    logger.info(f"✅ Selected state: {task.state} ({len(visible_li)} RTO options)")
+
+                if task.rto_index is None:
+                    tasks = plan_state_tasks(task.state, visible_li, ledger.completed_keys(), task.target)
+                    for planned in tasks:
+                        enqueue_task(task_queue, pending, planned)
+                    skipped = (len(visible_li) - 1) * len(OPTIONS) - len(tasks)
+                    logger.info(f"📋 Queued {len(tasks)} tasks for {task.state} ({skipped} already in ledger)")
+                    success = True
+                else:
+                    n = resolve_task_index(task, visible_li, logger)
+                    if n is None:
+                        logger.error(f"❌ {task.rto_code} no longer in the {task.state} dropdown, dropping task")
+                        success = True
+                    else:
+                        success = run_rto(driver, wait, visible_li, n, task.vehicle_type, download_dir, logger,
+                                          settings, ledger=ledger, waiter=waiter, target=target)
+                        if success:
+                            worker_stats["done"] += 1
+                            health.note_ok()
+                            breakers.record_success(task.state)
+                            if recycler is not None:
+                                recycler.note_export()
+                            if ingest_queue is not None:
+                                announce_file(ingest_queue, ledger, task)
+            except SiteUnavailable:
+                # Counted by the state's breaker; back on the queue as it was
+                enqueue_task(task_queue, pending, task)
+                success = True
+            except Exception as e:
+                logger.error(f"⚠️ Unexpected error on {task}: {e}")
+                success = False
+
+            if not success:
+                # process_rto quits the driver on failure; start fresh on the next task
+                try:
+                    driver.quit()
+                except Exception:
+                    pass
+                driver = None
+                if recycler is not None:
+                    recycler.reset()
+                worker_stats["failed"] += 1
+                if task.attempt + 1 < MAX_TASK_ATTEMPTS:
+                    enqueue_task(task_queue, pending, replace(task, attempt=task.attempt + 1))
+                else:
+                    logger.error(f"❌ Giving up on {task} after {MAX_TASK_ATTEMPTS} attempts")
+
+            worker_stats["busy_s"] += time.time() - t0
+            worker_stats["waits"] = waiter.summary()
+            stats[worker_id] = worker_stats
+            # Settled before it leaves in_flight: a death in between repeats the task rather than losing it
+            with pending.get_lock():
+                pending.value -= 1
+            in_flight.pop(worker_id, None)
+
+    finally:
+        for ledger in ledgers.values():
+            ledger.close()
+        if recycler is not None:
+            recycler.reset()
+        release_warm_browsers()
+        try:
+            if driver is not None:
+                driver.quit()
+        except Exception:
+            pass
+
+        try:
+            if os.path.exists(download_dir):
+                for file in os.listdir(download_dir):
+                    if file.endswith(".xlsx"):
+                        shutil.move(os.path.join(download_dir, file), os.path.join(FINAL_DIR, file))
+                shutil.rmtree(download_dir)
+        except Exception as e:
+            logger.info(f"⚠️ Error cleaning up worker {worker_id} temp directory: {e}")
+
+
+def tab_rto_flow(driver, tab, n, vehicle_type, logger, ledger=None, target=DAILY_TARGET):
+    """
+    process_rto for one tab of a tab_worker, as a generator (see tab_sessions).
+
+    Filters run as background action scripts and the export is awaited by
+    polling the tab's own CDP capture, so the other tabs are served while this
+    one waits on the site, and no tab can pick up another tab's file.
+    """
+    rto_name = li_text(tab.labels[n])
+    logger.info(f"================= [tab {tab.index}] RTO option {n}: {rto_name} =================")
+    for steps in (rto_steps(n, Y_AXIS_MAKER, X_AXIS_FUEL, year_option_for(target)),
+                  table_steps(target.month, VEHICLE_CLASS_ROWS[vehicle_type], ALL_VEHICLE_CLASS_ROWS)):
+        start_steps(driver, steps)
+        yield lambda d, steps=steps: poll_steps(d, steps)
+
+    final_path = None
+    tag = (rto_code_from_label(rto_name), vehicle_type)
+    for attempt in range(1, 4):
+        tab.capture.expect(tag)
+        driver.find_element(By.XPATH, EXPORT_XPATH).click()
+        logger.info(f"📥 [tab {tab.index}] Export triggered (attempt {attempt}, CDP capture)")
+        export = yield wait_for_export(tab.capture, 60)
+        if export and export.tag == tag:
+            final_path = save_export(export.body, vehicle_type, logger, name_from_header=True, final_dir=target.folder)
+            break
+        if export:
+            logger.warning(f"🔁 [tab {tab.index}] Captured export tagged {export.tag}, expected {tag}; retrying")
+        else:
+            logger.info(f"🔁 [tab {tab.index}] No export captured, retrying...")
+    if not final_path:
+        logger.error(f"❌ [tab {tab.index}] Failed to download Excel file for RTO {n}")
+        return False
+
+    rto_code = rto_code_from_label(rto_name)
+    if ledger is not None and rto_code:
+        ledger.record(rto_code, vehicle_type, final_path)
+    return True
+
+
+def tab_worker(worker_id, task_queue, pending, in_flight, stats, settings=DEFAULT_SETTINGS, control=None,
+               ingest_queue=None, breakers=None):
+    """
+    browser_worker with settings.tabs tabs in one Chrome, each running its own task.
+
+    The worker keeps up to one task per tab in flight and visits the tabs
+    round-robin, advancing whichever tab's wait is over. State selection and
+    expand tasks still run synchronously in their tab.
+    """
+    logger = get_logger(
+        name=f"WORKER-{worker_id}",
+        filename=f"{final_folder}_worker{worker_id}.log"
+    )
+    if settings.capture != "cdp":
+        logger.info(f"--capture {settings.capture} is not used with --tabs; each tab takes its export through CDP capture")
+    download_root = os.path.join(os.path.expanduser("~"), "Downloads", f"worker{worker_id}_temp")
+    os.makedirs(download_root, exist_ok=True)
+
+    ledgers = {}
+    breakers = StateBreakers(breakers)
+    driver = wait = None
+    tabs = []
+    tab_health = {}  # tab index -> PageHealth of that tab's page
+    stopping = False
+    worker_stats = stats.get(worker_id) or {"done": 0, "failed": 0, "busy_s": 0.0, "started": time.time()}
+
+    def track(*taken):
+        """Record the tabs' tasks, and any taken off the queue but not yet on a tab, for the pool."""
+        in_flight[worker_id] = [t.task for t in tabs if t.busy] + list(taken)
+
+    def finish(task, success):
+        if success:
+            worker_stats["done"] += 1
+            breakers.record_success(task.state)
+            if ingest_queue is not None:
+                announce_file(ingest_queue, target_ledger(ledgers, task.run_target), task)
+        else:
+            worker_stats["failed"] += 1
+            if task.attempt + 1 < MAX_TASK_ATTEMPTS:
+                enqueue_task(task_queue, pending, replace(task, attempt=task.attempt + 1))
+            else:
+                logger.error(f"❌ Giving up on {task} after {MAX_TASK_ATTEMPTS} attempts")
+        with pending.get_lock():
+            pending.value -= 1
+
+    try:
+        while True:
+            # Switched off by the controller: stop taking tasks, park once every tab is idle
+            draining = control is not None and not control.is_active(worker_id) and not stopping
+            if draining and not any(t.busy for t in tabs):
+                close_tabs(tabs)
+                driver = park_worker(worker_id, control, driver, logger)
+                tabs = []
+                continue
+
+            if driver is None:
+                driver, wait = launch_driver(download_root, extra_args=BACKGROUND_TAB_ARGS,
+                                             driver_path=settings.chromedriver, lean=settings.lean_browser)
+                tabs = open_tabs(driver, settings.tabs, URL,
+                                 on_tab=apply_lean_profile if settings.lean_browser else None,
+                                 capture=lambda d: CdpExportCapture(d).start())
+                tab_health = {tab.index: PageHealth() for tab in tabs}
+                logger.info(f"🗂️ Opened {len(tabs)} tabs in one browser")
+
+            # Hand a task to every idle tab; block only when no tab has work
+            for tab in tabs:
+                if tab.busy or stopping or draining:
+                    continue
+                if control is not None and not control.limiter.ready():
+                    break
+                try:
+                    task = task_queue.get(timeout=0.05) if any(t.busy for t in tabs) else task_queue.get()
+                except queue.Empty:
+                    break
+                if task is None:
+                    stopping = True
+                    break
+                # Off the queue from here on: if this process dies, the pool hands it back
+                track(task)
+                paused = breakers.paused_for(task.state)
+                if paused:
+                    # This state's breaker is open; still counted in pending
+                    task_queue.put(task)
+                    track()
+                    if not any(t.busy for t in tabs):
+                        time.sleep(min(paused, 5))
+                    break
+                if control is not None and task.rto_index is not None:
+                    control.limiter.acquire()
+
+                try:
+                    if not tab.capture.alive:
+                        raise WebDriverException(f"tab {tab.index} lost its export capture")
+                    driver.switch_to.window(tab.handle)
+                    health_check = check_and_recover(driver, URL, tab_health[tab.index], breakers, task.state, logger)
+                    if health_check == UNAVAILABLE:
+                        # Counted by the state's breaker; still counted in pending, so put it back as it was
+                        task_queue.put(task)
+                        track()
+                        break
+                    if health_check == RESTART:
+                        raise WebDriverException(f"tab {tab.index} would not reload")
+                    if health_check == RELOADED:
+                        tab.state = tab.target = None
+                    target = task.run_target
+                    if target != tab.target:
+                        if tab.target is not None:
+                            # Year and month stick to the page; start another data month from a clean view
+                            driver.get(URL)
+                            tab.state = None
+                        tab.target = target
+                    ledger = target_ledger(ledgers, target)
+                    if task.state != tab.state:
+                        tab.labels = load_state_rtos(driver, wait, task.state)
+                        tab.state = task.state
+                        logger.info(f"✅ [tab {tab.index}] Selected state: {task.state} ({len(tab.labels)} RTO options)")
+                    if task.rto_index is None:
+                        tasks = plan_state_tasks(task.state, tab.labels, ledger.completed_keys(), task.target)
+                        for planned in tasks:
+                            enqueue_task(task_queue, pending, planned)
+                        logger.info(f"📋 Queued {len(tasks)} tasks for {task.state}")
+                        with pending.get_lock():
+                            pending.value -= 1
+                        track()
+                        continue
+                    n = resolve_task_index(task, tab.labels, logger)
+                    if n is None:
+                        logger.error(f"❌ {task.rto_code} no longer in the {task.state} dropdown, dropping task")
+                        with pending.get_lock():
+                            pending.value -= 1
+                        track()
+                        continue
+                    tab.assign(task, tab_rto_flow(driver, tab, n, task.vehicle_type, logger, ledger, target))
+                except WebDriverException:
+                    # Off the queue but on no tab yet: hand it back (still counted in pending) before the browser goes
+                    task_queue.put(task)
+                    raise
+                except Exception as e:
+                    logger.error(f"⚠️ [tab {tab.index}] Could not start {task}: {e}")
+                    finish(task, False)
+                    track()
+                    driver.get(URL)
+                    tab.state = None
+            track()
+
+            if stopping and not any(t.busy for t in tabs):
+                break
+
+            # One round-robin pass over the busy tabs (counted as busy time while any tab has work)
+            t0 = time.time()
+            progressed = False
+            for tab in tabs:
+                if not tab.busy:
+                    continue
+                try:
+                    moved, done, outcome = step_tab(driver, tab)
+                except WebDriverException:
+                    raise
+                except Exception as e:
+                    logger.error(f"⚠️ [tab {tab.index}] Error on {tab.task}: {e}")
+                    moved, done, outcome = True, True, False
+                progressed |= moved
+                if not done:
+                    continue
+                task = tab.task
+                tab.release()
+                # Settle the task before any reload, which may lose the browser
+                finish(task, bool(outcome))
+                if outcome:
+                    tab_health[tab.index].note_ok()
+                else:
+                    tab_health[tab.index].suspect()
+                    # Page state is unknown after a failure; reload and reselect the state next time
+                    driver.get(URL)
+                    tab.state = None
+            track()
+            if not progressed:
+                time.sleep(0.1)
+            worker_stats["busy_s"] += time.time() - t0
+            stats[worker_id] = worker_stats
+
+    except WebDriverException as e:
+        # Browser is gone: hand every in-flight task back (still counted in pending) and let the pool respawn us
+        logger.error(f"❌ Browser lost: {e}")
+        for tab in tabs:
+            if tab.busy:
+                task_queue.put(tab.task)
+                tab.release()
+        in_flight.pop(worker_id, None)
+        raise
+    finally:
+        for ledger in ledgers.values():
+            ledger.close()
+        stats[worker_id] = worker_stats
+        close_tabs(tabs)
+        try:
+            if driver is not None:
+                driver.quit()
+        except Exception:
+            pass
+        shutil.rmtree(download_root, ignore_errors=True)
+
+
+def report_worker_throughput(stats, elapsed, logger):
     logger.info(f"\n{'='*60}")
-    logger.info(f"🚀 Starting Parallel RTO Data Collection")
-    logger.info(f"Processing {len(STATES)} states simultaneously")
-    logger.info(f"⚠️  NO RETRY LIMITS - Will run until completion")
+    logger.info("📈 Per-worker throughput")
+    total = 0
+    for worker_id in sorted(stats.keys()):
+        s = stats[worker_id]
+        total += s["done"]
+        per_min = s["done"] / (elapsed / 60) if elapsed else 0.0
+        busy_pct = 100 * s["busy_s"] / elapsed if elapsed else 0.0
+        logger.info(f"Worker {worker_id}: {s['done']} files, {s['failed']} failed, "
+                    f"{per_min:.2f} files/min, busy {busy_pct:.0f}%")
+    logger.info(f"All workers: {total} files, {total / (elapsed / 60) if elapsed else 0.0:.2f} files/min")
+    waits = merge_wait_summaries(s["waits"] for s in stats.values() if "waits" in s)
+    for line in format_wait_summary(waits):
+        logger.info(f"⏱️ {line}")
     logger.info(f"{'='*60}\n")
-    # Only the main process should archive/create the final folder
-    if os.path.exists(FINAL_DIR):
-        time_suffix = datetime.now().strftime("%H-%M-%S")
-        archived_dir = f"{FINAL_DIR}_{time_suffix}"
-        os.rename(FINAL_DIR, archived_dir)
-    os.makedirs(FINAL_DIR, exist_ok=True)
+
+
+def plan_pool_tasks(states, targets, logger):
+    """
+    The initial queue: states with a cached RTO list are planned here; the
+    rest get an expand task. Targets are interleaved per state so every
+    month makes progress at once.
+    """
+    targets = list(targets or [None])
+    completed = {}
+    for target in targets:
+        ledger = ScrapeLedger(ledger_path((target or DAILY_TARGET).folder))
+        completed[target] = ledger.completed_keys()
+        ledger.close()
+    planned = []
+    for state_name in states:
+        cached = RTO_LISTS.load(state_name)
+        for target in targets:
+            if cached is None:
+                planned.append(ScrapeTask(state_name, target=target))
+                continue
+            tasks = plan_state_tasks(state_name, [o.label for o in cached], completed[target], target)
+            planned.extend(tasks)
+            logger.info(f"📋 Planned {len(tasks)} tasks for {state_name}{f' [{target}]' if target else ''} "
+                        f"from the cached RTO list")
+    return planned
+
+
+def run_task_pool(states, settings, logger, targets=None, ingest=None, tasks=None):
+    """
+    Expand every state into RTO tasks on one queue and drain it with N browser workers.
+
+    targets are data months (run_targets.RunTarget) scraped side by side, each
+    into its own folder; None is the daily run. Workers hand every finished
+    file to ingest (a StreamingIngest) when one is given. tasks replaces the
+    planning of states with a given list (the missing-file rescrape).
+    """
+    manager = Manager()
+    in_flight = manager.dict()
+    stats = manager.dict()
+    breakers = manager.dict()  # state -> (consecutive 503s, paused until), see page_health.StateBreakers
+    task_queue = Queue()
+    pending = Value("i", 0)
+    # Adaptive runs start at half the workers and let the controller climb to --workers
+    control = PoolControl.create(max(1, settings.workers // 2) if settings.adaptive else settings.workers,
+                                 settings.max_rto_per_min)
+    controller = ConcurrencyController(control, settings.workers, logger) if settings.adaptive else None
+
+    for task in tasks if tasks is not None else plan_pool_tasks(states, targets, logger):
+        enqueue_task(task_queue, pending, task)
+
+    def spawn(worker_id):
+        target = tab_worker if settings.tabs > 1 and settings.engine == "browser" else browser_worker
+        p = Process(target=target,
+                    args=(worker_id, task_queue, pending, in_flight, stats, settings, control,
+                          ingest.queue if ingest is not None else None, breakers))
+        p.start()
+        return p
+
+    start_time = time.time()
+    workers = {}
+    for worker_id in range(settings.workers):
+        logger.info(f"🚀 Starting browser worker {worker_id}")
+        workers[worker_id] = spawn(worker_id)
+        time.sleep(2)
+
+    while pending.value > 0:
+        time.sleep(5)
+        for worker_id, p in list(workers.items()):
+            if p.is_alive():
+                continue
+            lost = in_flight.pop(worker_id, None) or []
+            logger.warning(f"⚠️ Worker {worker_id} died (exit code {p.exitcode}); respawning")
+            for task in lost:
+                # still counted in pending, so put it back without incrementing
+                task_queue.put(task)
+            workers[worker_id] = spawn(worker_id)
+        if controller is not None:
+            snapshot = list(stats.values())
+            controller.tick(sum(s["done"] for s in snapshot), sum(s["failed"] for s in snapshot))
+
+    # Wake parked workers so every worker reads its sentinel
+    control.active.value = settings.workers
+    for _ in workers:
+        task_queue.put(None)
+    for p in workers.values():
+        p.join()
+
+    report_worker_throughput(dict(stats), time.time() - start_time, logger)
+    best = controller.best() if controller is not None else None
+    if best:
+        logger.info(f"🎚️ Best sustained throughput: {best[1]:.2f} files/min with {best[0]} active workers")
+    manager.shutdown()
+
+
+def read_state_totals(driver, vehicle_type, settings, target=DAILY_TARGET):
+    """Totals of the selected state for one vehicle class and target's month: RTO "All", State on the
+    y-axis, Fuel on the x-axis."""
+    year_option = year_option_for(target)
+    if settings.engine == "http":
+        year = target.year if year_option is not None else None
+        return totals_from_export(driver.export(0, vehicle_type, target.month, year=year, y_axis="State"))
+    run_steps(driver, rto_steps(0, Y_AXIS_STATE, X_AXIS_FUEL, year_option))
+    run_steps(driver, table_steps(target.month, VEHICLE_CLASS_ROWS[vehicle_type], ALL_VEHICLE_CLASS_ROWS))
+    return totals_from_grid(read_grouping_table(driver))
+
+
+def read_rto_totals(driver, n, settings, target=DAILY_TARGET):
+    """Totals per vehicle_type of RTO n of the selected state for target's month, from one query: Vehicle
+    Class on the y-axis, Fuel on the x-axis, the classes of every vehicle type ticked."""
+    year_option = year_option_for(target)
+    if settings.engine == "http":
+        year = target.year if year_option is not None else None
+        return class_totals_from_export(driver.export(n, tuple(OPTIONS), target.month, year=year,
+                                                      y_axis="Vehicle Class"))
+    run_steps(driver, rto_steps(n, Y_AXIS_VEHICLE_CLASS, X_AXIS_FUEL, year_option))
+    run_steps(driver, table_steps(target.month, ALL_VEHICLE_CLASS_ROWS, ALL_VEHICLE_CLASS_ROWS))
+    return class_totals_from_grid(read_grouping_table(driver))
+
+
+def run_change_detection(states, settings, ledger, logger, target=DAILY_TARGET):
+    """
+    --changed-only pre-pass: one totals query per RTO (all vehicle classes
+    at once), compared with the totals taken alongside the latest
+    cumulative_folder snapshot. Files of unchanged RTOs are rebuilt from that
+    snapshot as grid CSVs and recorded in the ledger, so the scrape skips
+    them. Totals are saved after every state; a rerun on the same day only
+    queries RTOs it has no totals for yet. Returns the number of files
+    carried forward.
+    """
+    today = target.snapshot_day
+    current = TotalsSnapshot.load(today)
+    if current is None or (current.year, current.month) != (target.year, target.month):
+        current = TotalsSnapshot(today, target.year, target.month, {})
+    download_dir = os.path.join(os.path.expanduser("~"), "Downloads", "change_detection_temp")
+    os.makedirs(download_dir, exist_ok=True)
+    names_by_state = {}
+    queried, started = 0, time.time()
+    driver = wait = None
+
+    def drop_session():
+        nonlocal driver, wait
+        try:
+            if driver is not None:
+                driver.quit()
+        except Exception:
+            pass
+        driver = wait = None
+
+    def select_state(state_name, fresh=False):
+        nonlocal driver, wait
+        if fresh:
+            drop_session()
+        if driver is None:
+            driver, wait = open_session(download_dir, settings, logger)
+        return select_state_rtos(driver, wait, state_name, settings)
+
+    try:
+        for state_name in states:
+            try:
+                labels = select_state(state_name)
+            except Exception as e:
+                logger.warning(f"⚠️ Could not select {state_name}, scraping it in full: {e}")
+                drop_session()
+                continue
+            codes = [rto_code_from_label(li_text(label)) for label in labels]
+            names_by_state[state_name] = {code: li_text(label) for code, label in zip(codes[1:], labels[1:]) if code}
+            state_totals = current.totals.setdefault(state_name, {})
+            for n, rto_code in enumerate(codes):
+                if n == 0 or not rto_code or all(rto_code in state_totals.get(vt, {}) for vt in OPTIONS):
+                    continue
+                try:
+                    for vehicle_type, total in read_rto_totals(driver, n, settings, target).items():
+                        state_totals.setdefault(vehicle_type, {})[rto_code] = total
+                    queried += 1
+                except Exception as e:
+                    # Left out of the snapshot, so the RTO is scraped; the page state is unknown, start over
+                    logger.warning(f"⚠️ Could not read {rto_code} totals: {e}")
+                    try:
+                        select_state(state_name, fresh=True)
+                    except Exception as e:
+                        logger.warning(f"⚠️ Could not reselect {state_name}, scraping the rest of it: {e}")
+                        drop_session()
+                        break
+            current.save()
+            names = names_by_state[state_name]
+            have = sum(all(code in state_totals.get(vt, {}) for vt in OPTIONS) for code in names)
+            logger.info(f"🔍 {state_name}: totals for {have} of {len(names)} RTOs")
+    finally:
+        drop_session()
+        shutil.rmtree(download_dir, ignore_errors=True)
+    logger.info(f"🔍 {queried} RTO totals queries in {time.time() - started:.0f}s")
+
+    previous_csv = latest_cumulative(today)
+    previous = TotalsSnapshot.load(previous_csv[0]) if previous_csv else None
+    if previous is None:
+        logger.info("🔍 No earlier cumulative snapshot with totals; scraping everything")
+        return 0
+
+    cumulative = pd.read_csv(previous_csv[1])
+    completed = ledger.completed_keys()
+    carried = files = 0
+    for state_name, names in names_by_state.items():
+        files += len(names) * len(OPTIONS)
+        for vehicle_type in OPTIONS:
+            same = unchanged_rtos(previous, current, state_name, vehicle_type, list(names))
+            for rto_code in same - {code for code, vt in completed if vt == vehicle_type}:
+                grid = carry_forward_grid(cumulative, rto_code, vehicle_type)
+                path = save_grid(grid, safe_file_stem(names[rto_code], vehicle_type), target.folder)
+                ledger.record(rto_code, vehicle_type, path)
+                carried += 1
+            logger.info(f"🔍 {state_name} [{vehicle_type}]: {len(same)}/{len(names)} RTOs unchanged "
+                        f"since {previous.day}")
+    share = 100 * carried / files if files else 0.0
+    logger.info(f"♻️ Carried {carried} of {files} file(s) forward ({share:.1f}%) from {previous_csv[1]}")
+    return carried
+
+
+# Largest state, car class: its total moves every day once the dashboard publishes
+PROBE_STATE = "Tamil_Nadu"
+PROBE_VEHICLE_TYPE = "motor_car"
+
+
+def read_probe_total(settings, logger):
+    """One short session: the probe state's total for the probe vehicle class."""
+    download_dir = os.path.join(os.path.expanduser("~"), "Downloads", "probe_temp")
+    os.makedirs(download_dir, exist_ok=True)
+    driver, wait = open_session(download_dir, settings, logger)
+    try:
+        select_state_rtos(driver, wait, PROBE_STATE, settings)
+        return sum(read_state_totals(driver, PROBE_VEHICLE_TYPE, settings).values())
+    finally:
+        try:
+            driver.quit()
+        except Exception:
+            pass
+        shutil.rmtree(download_dir, ignore_errors=True)
+
+
+def wait_for_publication(settings, logger):
+    """
+    --wait-for-publication: hold the run until the probe total differs from
+    the value recorded at the last publication, polling with backoff until
+    settings.probe_deadline. Records when the change was seen.
+    """
+    today = Today.strftime("%Y-%m-%d")
+    baseline = load_baseline()
+    if baseline is not None and baseline.day == today:
+        logger.info(f"📰 Publication already seen today at {baseline.seen_at}; starting now")
+        return
+    deadline = datetime.combine(Today, datetime.strptime(settings.probe_deadline, "%H:%M").time()).timestamp()
+    logger.info(f"📰 Waiting for Vahan to publish (probe: {PROBE_STATE} {PROBE_VEHICLE_TYPE} total, "
+                f"last {baseline.value if baseline else 'unknown'}; deadline {settings.probe_deadline})")
+
+    result = wait_for_change(lambda: read_probe_total(settings, logger), baseline, month, deadline, logger)
+    record_publication(today, month, baseline, result)
+    if result.published:
+        save_baseline(ProbeBaseline(today, month, result.value, result.first_changed_at))
+        logger.info(f"📰 Published: probe total {result.value} (seen at {result.first_changed_at}, "
+                    f"after {result.polls} poll(s)); starting the scrape")
+    else:
+        logger.warning(f"⚠️ No new data by {settings.probe_deadline} after {result.polls} poll(s); "
+                       f"running anyway, data may be stale")
+    for line in publication_summary():
+        logger.info(f"📰 {line}")
+
+
+def start_ingest(settings, logger):
+    """The running streaming ingestion stage for --stream-ingest, or None."""
+    if not settings.stream_ingest:
+        return None
+    if settings.scheduler != "queue" and not settings.backfill:
+        logger.warning("⚠️ --stream-ingest needs the queue scheduler; files are parsed after the scrape instead")
+        return None
+    return StreamingIngest(logger).start()
+
+
+def log_consolidation(report, logger):
+    """Log consolidate_rto_files' per-file failures, which it otherwise only prints."""
+    for name, error in report.failed:
+        logger.warning(f"⚠️ Not in {report.output_csv}: {name} ({error})")
+    if report.empty:
+        logger.info(f"ℹ️ {len(report.empty)} file(s) had no rows for the target makers")
+    if not report.written:
+        logger.error(f"❌ {report.output_csv} was not written: no file gave any rows")
+
+
+def run_backfill(months, settings, logger):
+    """
+    --backfill: scrape every (year, month) into its own dated folder through
+    one task pool, so the months run concurrently, then rename, check and
+    consolidate each folder into its cumulative_folder snapshot. delta_data
+    is left to the daily run.
+    """
+    from preprocessing_services import consolidate_rto_files
+
+    targets = [backfill_target(year, m, Today, os.path.dirname(FINAL_DIR)) for year, m in months]
+    for target in targets:
+        os.makedirs(target.folder, exist_ok=True)
+        ledger = ScrapeLedger(ledger_path(target.folder))
+        ledger.reconcile(target.folder)
+        ledger.close()
+        logger.info(f"🗓️ Backfill {target}: {target.folder} → {target.cumulative_csv}")
 
     start_time = time.time()
+    ingest = start_ingest(settings, logger)
+    run_task_pool(STATES, settings, logger, targets, ingest=ingest)
+    if ingest is not None:
+        ingest.stop()
+    logger.info(f"⏱️ Backfill scrape of {len(targets)} month(s): {(time.time() - start_time) / 60:.2f} minutes")
+
+    # Each file is read once: by the streaming stage or by validate_folder, whose rows consolidate reuses
+    cache = ingest.cache if ingest is not None else FrameCache()
+    for target in targets:
+        try:
+            missing = validate_folder(target.folder, workers=settings.post_workers or None, cache=cache,
+                                      as_of=target.as_of).missing
+            ledger = ScrapeLedger(ledger_path(target.folder))
+            ledger.reconcile(target.folder)
+            ledger.close()
+            if missing:
+                logger.warning(f"⚠️ {target}: {len(missing)} file(s) still missing; rerun the same --backfill to resume")
+            report = consolidate_rto_files(target.folder, target.cumulative_csv, as_of=target.as_of,
+                                           parse=cache.parse)
+            log_consolidation(report, logger)
+            logger.info(f"✅ {target}: wrote {target.cumulative_csv}")
+        except Exception as e:
+            logger.error(f"❌ Post-processing failed for {target}: {e}")
+    logger.info(f"🧾 {ingest.summary() if ingest is not None else cache.summary()}")
+
+
+def run_state_processes(states, settings, logger):
+    """Legacy scheduler: one process per state, retrying failed states."""
     manager = Manager()
     shared_dict = manager.dict()
-    
+
     retry_attempt = 0
     failed_states = []
     while True:
@@ -665,13 +1948,13 @@ def main():
             logger.info(f"🔄 STATE RETRY ATTEMPT #{retry_attempt}")
             logger.info(f"Retrying failed states: {list(failed_states)}")
             logger.info(f"{'='*60}\n")
-        
-        states_to_process = STATES if retry_attempt == 0 else {k: v for k, v in STATES.items() if k in failed_states}
+
+        states_to_process = states if retry_attempt == 0 else {k: v for k, v in states.items() if k in failed_states}
         shared_dict.clear()
         processes = []
         for state_name, state_xpath in states_to_process.items():
             logger.info(f"🚀 Starting process for state: {state_name}")
-            p = Process(target=process_state, args=(state_name, state_xpath, 1, shared_dict))
+            p = Process(target=process_state, args=(state_name, state_xpath, 1, shared_dict, settings))
             processes.append(p)
             p.start()
             time.sleep(2)
@@ -685,19 +1968,76 @@ def main():
             logger.info(f"State {state_name}: {'✅ SUCCESS' if status else '❌ FAILED'}")
             if not status:
                 failed_states.append(state_name)
-        
+
         if not failed_states:
             logger.info(f"\n✅ All states completed successfully!")
             break
-        
+
         retry_attempt += 1
         logger.warning(f"\n⚠️ {len(failed_states)} state(s) failed: {failed_states}")
         logger.info(f"Retrying")
         time.sleep(2)
-        
-        
+
+    return retry_attempt
+
+
+def main(settings=DEFAULT_SETTINGS):
+    logger = get_logger("MAIN", f"{final_folder}_main.log")
+    logger.info(f"\n{'='*60}")
+    logger.info(f"🚀 Starting Parallel RTO Data Collection")
+    if settings.scheduler == "queue":
+        logger.info(f"Processing {len(STATES)} states with {settings.workers} browser workers")
+        logger.info(f"Each task retried up to {MAX_TASK_ATTEMPTS} times; leftovers go to the missing-file rescrape")
+    else:
+        logger.info(f"Processing {len(STATES)} states simultaneously")
+        logger.info(f"⚠️  NO RETRY LIMITS - Will run until completion")
+    logger.info(f"{'='*60}\n")
+    if settings.engine == "browser":
+        # Resolve chromedriver once; workers and restarts reuse the path instead of re-checking versions
+        settings = replace(settings, chromedriver=resolve_chromedriver(settings.chromedriver))
+        logger.info(f"🧭 Using chromedriver: {settings.chromedriver}")
+
+    if settings.backfill:
+        run_backfill(settings.backfill, settings, logger)
+        return
+
+    # Only the main process should archive/create the final folder.
+    # A rerun on the same day resumes from the ledger unless --fresh is given.
+    ledger_file = ledger_path(FINAL_DIR)
+    if settings.fresh and os.path.exists(FINAL_DIR):
+        time_suffix = datetime.now().strftime("%H-%M-%S")
+        archived_dir = f"{FINAL_DIR}_{time_suffix}"
+        os.rename(FINAL_DIR, archived_dir)
+        if os.path.exists(ledger_file):
+            os.rename(ledger_file, ledger_path(archived_dir))
+    os.makedirs(FINAL_DIR, exist_ok=True)
+
+    if settings.wait_for_publication:
+        wait_for_publication(settings, logger)
+
+    ledger = ScrapeLedger(ledger_file)
+    counts = ledger.reconcile(FINAL_DIR)
+    if counts["kept"] or counts["moved"]:
+        logger.info(f"📒 Resuming from ledger: {counts['kept'] + counts['moved']} file(s) already done, "
+                    f"{counts['dropped']} stale entr(y/ies) dropped")
+
+    if settings.changed_only:
+        try:
+            run_change_detection(STATES, settings, ledger, logger)
+        except Exception as e:
+            logger.error(f"❌ Change-detection pass failed, scraping everything: {e}")
+
+    start_time = time.time()
+    retry_attempt = 0
+    ingest = start_ingest(settings, logger)
+    if settings.scheduler == "queue":
+        run_task_pool(STATES, settings, logger, ingest=ingest)
+    else:
+        retry_attempt = run_state_processes(STATES, settings, logger)
 
     elapsed_time = time.time() - start_time
+    if ingest is not None:
+        ingest.stop()
     logger.info(f"\n{'='*60}")
     logger.info(f"🎉 ALL STATES COMPLETED SUCCESSFULLY!")
     logger.info(f"⏱️  Total time: {elapsed_time/60:.2f} minutes")
@@ -708,13 +2048,14 @@ def main():
         from datetime import date
         from preprocessing_services import consolidate_rto_files
         from delta_data import main as delta_main
-        from renameCheck import run_rename_check
 
         INPUT_FOLDER = FINAL_DIR
         OUTPUT_CSV = f"cumulative_folder/{date.today().strftime('%Y-%m-%d')}.csv"
-        run_rename_check(INPUT_FOLDER)
-
-        missing = run_file_check(INPUT_FOLDER, raise_on_missing=False)
+        # Rename check, file check and parsing in one pass over one listing of the folder;
+        # files the streaming stage already read are not read again
+        cache = ingest.cache if ingest is not None else FrameCache()
+        missing = list(validate_folder(INPUT_FOLDER, workers=settings.post_workers or None, cache=cache).missing)
+        ledger.reconcile(INPUT_FOLDER)
         for attempt in range(1, MAX_MISSING_RESCRAPE_PASSES + 1):
             if not missing:
                 break
@@ -724,19 +2065,203 @@ def main():
                 attempt,
                 MAX_MISSING_RESCRAPE_PASSES,
             )
-            rescrape_missing_files(missing, logger)
-            run_rename_check(INPUT_FOLDER)
-            missing = run_file_check(INPUT_FOLDER, raise_on_missing=False)
+            if ingest is not None:
+                ingest.start()
+            rescrape_missing_files(missing, logger, settings, ingest=ingest)
+            if ingest is not None:
+                ingest.stop()
+            missing = list(validate_folder(INPUT_FOLDER, workers=settings.post_workers or None, cache=cache).missing)
+            ledger.reconcile(INPUT_FOLDER)
 
         if missing:
-            run_file_check(INPUT_FOLDER, raise_on_missing=True)
+            raise MissingRtoFilesError(INPUT_FOLDER, missing)
 
-        consolidate_rto_files(INPUT_FOLDER, OUTPUT_CSV)
+        # Rows come from validate_folder's pool through the cache, so no second pool here
+        report = consolidate_rto_files(INPUT_FOLDER, OUTPUT_CSV, parse=cache.parse)
+        log_consolidation(report, logger)
+        logger.info(f"🧾 {ingest.summary() if ingest is not None else cache.summary()}; {OUTPUT_CSV} ready "
+                    f"{time.time() - start_time - elapsed_time:.1f}s after the scrape finished")
         delta_main()
         logger.info("✅ Post-processing completed successfully")
     except Exception as e:
         logger.error(f"❌ Error during post-processing: {e}")
+    finally:
+        ledger.close()
+
+
+def clock_time(text):
+    """argparse type for HH:MM options, normalised to two-digit hours."""
+    try:
+        return datetime.strptime(text, "%H:%M").strftime("%H:%M")
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected HH:MM (24-hour), got {text!r}") from None
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Scrape Vahan RTO Maker x Fuel sheets and run the daily pipeline.")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help="Number of browser workers pulling from the shared task queue",
+    )
+    parser.add_argument(
+        "--scheduler",
+        choices=["queue", "state"],
+        default="queue",
+        help="queue: shared (state, RTO, vehicle class) task queue; state: one process per state",
+    )
+    parser.add_argument(
+        "--fresh",
+        action="store_true",
+        help="Archive today's folder and ledger and scrape everything again instead of resuming",
+    )
+    parser.add_argument(
+        "--wait-mode",
+        choices=WAIT_MODES,
+        default="ajax",
+        help="fixed: original sleeps; ajax: return when PrimeFaces AJAX is idle; "
+             "compare: alternate both per RTO and log the per-RTO time of each",
+    )
+    parser.add_argument(
+        "--engine",
+        choices=["browser", "http"],
+        default="browser",
+        help="browser: drive Chrome; http: replay the reportview.xhtml JSF posts without a browser",
+    )
+    parser.add_argument(
+        "--sticky-filters",
+        action="store_true",
+        help="Set axis/year/month/vehicle class once per session and only switch the RTO per file",
+    )
+    parser.add_argument(
+        "--action-script",
+        action="store_true",
+        help="Drive the PrimeFaces widgets from two in-page scripts per RTO instead of one WebDriver call per click",
+    )
+    parser.add_argument(
+        "--tabs",
+        type=int,
+        default=1,
+        help="Tabs per browser worker; each tab runs its own RTO task (browser engine, uses in-page action scripts)",
+    )
+    parser.add_argument(
+        "--chromedriver",
+        default=None,
+        help="Pinned chromedriver binary; skips webdriver-manager entirely (also read from RTO_CHROMEDRIVER)",
+    )
+    parser.add_argument(
+        "--warm-spares",
+        type=int,
+        default=0,
+        help="Browsers each worker keeps launched in the background so a crash restart swaps one in "
+             "(each spare costs a full Chrome of memory)",
+    )
+    parser.add_argument(
+        "--lean-browser",
+        action="store_true",
+        help="Headless, smaller window, and images/fonts/media/analytics/chart scripts blocked via CDP",
+    )
+    parser.add_argument(
+        "--adaptive",
+        action="store_true",
+        help="Scale the active workers (up to --workers) on CPU, memory, the site's 503/crash rate "
+             "and measured files/min (queue scheduler)",
+    )
+    parser.add_argument(
+        "--max-rto-per-min",
+        type=float,
+        default=0.0,
+        help="Global cap on RTO task starts per minute across all workers (0 = unlimited)",
+    )
+    parser.add_argument(
+        "--recycle-rss-mb",
+        type=float,
+        default=0.0,
+        help="Swap in a fresh browser between RTOs once a worker's Chrome process tree exceeds this RSS (0 = off)",
+    )
+    parser.add_argument(
+        "--recycle-after",
+        type=int,
+        default=0,
+        help="Swap in a fresh browser between RTOs after this many exports (0 = off)",
+    )
+    parser.add_argument(
+        "--changed-only",
+        action="store_true",
+        help="Query each RTO's totals first and carry unchanged RTOs forward from the last cumulative snapshot",
+    )
+    parser.add_argument(
+        "--wait-for-publication",
+        action="store_true",
+        help="Poll one state total with backoff and start only once Vahan has published new numbers",
+    )
+    parser.add_argument(
+        "--probe-deadline",
+        type=clock_time,
+        default="14:00",
+        help="HH:MM after which --wait-for-publication gives up waiting and runs anyway",
+    )
+    parser.add_argument(
+        "--backfill",
+        default="",
+        metavar="MONTHS",
+        help="Scrape past months instead of the daily run, e.g. 2025-11,2026-01 or 2025-10..2026-02; "
+             "each month gets its own dated folder and cumulative_folder snapshot (queue scheduler)",
+    )
+    parser.add_argument(
+        "--capture",
+        choices=["folder", "cdp", "table"],
+        default="folder",
+        help="folder: poll the downloads folder for the xlsx; cdp: intercept the export response "
+             "through the DevTools Fetch domain and write it once under its final name; "
+             "table: read the on-screen grid in one script call and save it as CSV (no export at all)",
+    )
+    parser.add_argument(
+        "--stream-ingest",
+        action="store_true",
+        help="Check, rename and parse each file in the main process as soon as a worker saves it, "
+             "so the cumulative CSV is written right after the scrape (queue scheduler)",
+    )
+    parser.add_argument(
+        "--post-workers",
+        type=int,
+        default=0,
+        help="Processes for the rename/file check and for parsing files into the cumulative CSV "
+             "(0 = one per CPU, 1 = no pool)",
+    )
+    args = parser.parse_args()
+    try:
+        backfill = tuple(parse_months(args.backfill))
+        for year, m in backfill:
+            backfill_target(year, m, Today, os.path.dirname(FINAL_DIR))
+    except ValueError as e:
+        parser.error(f"--backfill: {e}")
+    return ScrapeSettings(
+        workers=max(1, args.workers),
+        scheduler=args.scheduler,
+        fresh=args.fresh,
+        wait_mode=args.wait_mode,
+        engine=args.engine,
+        sticky_filters=args.sticky_filters,
+        capture=args.capture,
+        action_script=args.action_script,
+        tabs=max(1, args.tabs),
+        chromedriver=args.chromedriver,
+        warm_spares=max(0, args.warm_spares),
+        lean_browser=args.lean_browser,
+        adaptive=args.adaptive,
+        max_rto_per_min=max(0.0, args.max_rto_per_min),
+        recycle_rss_mb=max(0.0, args.recycle_rss_mb),
+        recycle_exports=max(0, args.recycle_after),
+        changed_only=args.changed_only,
+        wait_for_publication=args.wait_for_publication,
+        probe_deadline=args.probe_deadline,
+        backfill=backfill,
+        stream_ingest=args.stream_ingest,
+        post_workers=max(0, args.post_workers),
+    )
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main(parse_args())
\ No newline at end of file
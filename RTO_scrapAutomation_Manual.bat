@@ -90,8 +90,8 @@ echo [INFO] Starting RTO data collection...
 echo [INFO] This may take a while. Please do not close this window.
 echo.
 
-REM Run the Python script
-python rto_scraper.py
+REM Run the Python script (extra arguments, e.g. --wait-for-publication, are passed through)
+python rto_scraper.py %*
 
 REM Check if the script ran successfully
 if errorlevel 1 (
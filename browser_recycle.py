@@ -0,0 +1,133 @@
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+import psutil
+
+
+@dataclass(frozen=True)
+class RecyclePolicy:
+    max_rss_mb: float = 0.0  # 0 = no memory limit
+    max_exports: int = 0  # 0 = no export limit
+    warm_at: float = 0.8  # start the replacement at this share of either limit
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_rss_mb > 0 or self.max_exports > 0
+
+
+def browser_rss_mb(driver) -> float:
+    """
+    Resident memory of the chromedriver process and every process under it
+    (browser, renderers, GPU). Shared pages are counted once per process, so
+    this overstates the real footprint a little; it is only compared with a
+    limit. 0.0 when the process tree cannot be read.
+    """
+    try:
+        root = psutil.Process(driver.service.process.pid)
+        processes = [root] + root.children(recursive=True)
+    except (AttributeError, psutil.Error):
+        return 0.0
+    total = 0
+    for process in processes:
+        try:
+            total += process.memory_info().rss
+        except psutil.Error:
+            pass
+    return total / (1024 * 1024)
+
+
+class BrowserRecycler:
+    """
+    Replaces a worker's browser before it grows into a crash.
+
+    Call observe(driver) at a safe point between RTOs and note_export() after
+    every saved file. Near a limit the replacement is prepared in a background
+    thread with prepare(); once a limit is crossed, handover(driver) returns
+    the prepared session (waiting for the warm-up if it is still running) and
+    quits the old browser. If the replacement could not be prepared the old
+    browser is kept and handover() returns None.
+    """
+
+    def __init__(self, prepare: Callable[[], tuple], policy: RecyclePolicy, logger):
+        self.prepare = prepare
+        self.policy = policy
+        self.logger = logger
+        self.exports = 0
+        self.recycled = 0
+        self.reason = None
+        self._thread = None
+        self._result = None
+        self._error = None
+
+    def note_export(self) -> None:
+        self.exports += 1
+
+    def observe(self, driver) -> str | None:
+        """Why the browser should be recycled now, or None; starts the warm-up near a limit."""
+        policy = self.policy
+        if not policy.enabled:
+            return None
+        shares = []
+        self.reason = None
+        if policy.max_rss_mb:
+            rss = browser_rss_mb(driver)
+            shares.append(rss / policy.max_rss_mb)
+            if rss >= policy.max_rss_mb:
+                self.reason = f"browser RSS {rss:.0f} MB ≥ {policy.max_rss_mb:.0f} MB"
+        if policy.max_exports:
+            shares.append(self.exports / policy.max_exports)
+            if self.exports >= policy.max_exports:
+                self.reason = self.reason or f"{self.exports} exports ≥ {policy.max_exports}"
+        if max(shares) >= policy.warm_at:
+            self._warm()
+        return self.reason
+
+    def _warm(self) -> None:
+        if self._thread is not None:
+            return
+        self._result = self._error = None
+        self._thread = threading.Thread(target=self._prepare, daemon=True)
+        self._thread.start()
+        self.logger.info("🔥 Warming a replacement browser in the background")
+
+    def _prepare(self) -> None:
+        try:
+            self._result = self.prepare()
+        except Exception as e:
+            self._error = e
+
+    def handover(self, driver) -> tuple | None:
+        """The prepared session in place of driver, which is quit; None keeps driver."""
+        self._warm()
+        t0 = time.time()
+        self._thread.join()
+        self._thread = None
+        result, self._result = self._result, None
+        if result is None:
+            self.logger.warning(f"⚠️ Replacement browser failed ({self._error}); keeping the current one")
+            return None
+        self.logger.info(f"♻️ Recycled browser ({self.reason}) after {self.exports} exports; "
+                         f"waited {time.time() - t0:.1f}s for the replacement")
+        _quit(driver)
+        self.exports = 0
+        self.recycled += 1
+        return result
+
+    def reset(self) -> None:
+        """The browser was replaced some other way (crash restart, parking): start counting afresh."""
+        self.exports = 0
+        thread, self._thread = self._thread, None
+        if thread is not None:
+            thread.join()
+            if self._result is not None:
+                _quit(self._result[0])
+        self._result = None
+
+
+def _quit(driver) -> None:
+    try:
+        driver.quit()
+    except Exception:
+        pass
@@ -0,0 +1,177 @@
+import base64
+import json
+import queue
+import re
+import threading
+import urllib.request
+from dataclasses import dataclass
+
+import trio
+from selenium.webdriver.common.bidi import cdp
+
+# The export is a non-AJAX form submit of reportview.xhtml, i.e. a Document
+# request; PrimeFaces partial posts are XHR and are never paused.
+EXPORT_URL_PATTERN = "*reportview.xhtml*"
+XLSX_MIME = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+FILENAME_PATTERN = re.compile(r"filename\*?=(?:UTF-8'')?\"?([^\";]+)\"?", re.IGNORECASE)
+
+
+class ExportCaptureError(Exception):
+    """CDP capture could not be started or no export arrived in time."""
+
+
+@dataclass(frozen=True)
+class CapturedExport:
+    tag: tuple[str, str] | None  # (rto_code, vehicle_type) armed by expect()
+    body: bytes
+    filename: str | None  # from Content-Disposition, informational only
+    url: str
+
+
+def devtools_endpoint(driver) -> tuple[str, str]:
+    """(major Chrome version, browser websocket URL) from chromedriver's debuggerAddress."""
+    address = (driver.capabilities.get("goog:chromeOptions") or {}).get("debuggerAddress")
+    if not address:
+        raise ExportCaptureError("Chrome did not report a debuggerAddress")
+    with urllib.request.urlopen(f"http://{address}/json/version", timeout=10) as resp:
+        data = json.load(resp)
+    version = re.search(r"/(\d+)\.", data.get("Browser", "")).group(1)
+    return version, data["webSocketDebuggerUrl"]
+
+
+def is_export_response(headers: dict[str, str]) -> bool:
+    return XLSX_MIME in headers.get("content-type", "") or "attachment" in headers.get("content-disposition", "")
+
+
+class CdpExportCapture:
+    """
+    Takes the Excel export off the wire instead of out of the downloads folder.
+
+    Fetch.enable pauses reportview.xhtml document responses. An export response
+    has its body read through Fetch.getResponseBody and is then answered with
+    204 No Content, so Chrome keeps the page and never writes a file; anything
+    else is let through untouched. The listener runs its own trio loop in a
+    daemon thread next to the synchronous Selenium calls.
+
+    Usage per download: expect(tag) -> click export -> wait().
+    """
+
+    def __init__(self, driver, url_pattern: str = EXPORT_URL_PATTERN):
+        self.driver = driver
+        self.url_pattern = url_pattern
+        self.target_id = driver.current_window_handle  # chromedriver handles are CDP target ids
+        self._exports: queue.Queue[CapturedExport] = queue.Queue()
+        self._tag = None
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._error: BaseException | None = None
+        self._scope: trio.CancelScope | None = None
+        self._token = None
+        self._thread: threading.Thread | None = None
+
+    def start(self, timeout: float = 20) -> "CdpExportCapture":
+        version, ws_url = devtools_endpoint(self.driver)
+        self._thread = threading.Thread(target=self._run, args=(version, ws_url), daemon=True)
+        self._thread.start()
+        if not self._ready.wait(timeout):
+            raise ExportCaptureError("Timed out enabling Fetch interception")
+        if self._error is not None:
+            raise ExportCaptureError(f"Fetch interception failed: {self._error}") from self._error
+        return self
+
+    @property
+    def alive(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def expect(self, tag: tuple[str, str] | None) -> None:
+        """Arm the capture for the next export; anything captured earlier is stale and dropped."""
+        with self._lock:
+            self._tag = tag
+            while not self._exports.empty():
+                self._exports.get_nowait()
+
+    def take(self) -> CapturedExport | None:
+        """The next captured export without blocking; None while none has arrived."""
+        try:
+            return self._exports.get_nowait()
+        except queue.Empty:
+            return None
+
+    def wait(self, timeout: float = 60) -> CapturedExport:
+        try:
+            return self._exports.get(timeout=timeout)
+        except queue.Empty:
+            if not self.alive:
+                raise ExportCaptureError(f"Capture listener stopped: {self._error}") from self._error
+            raise ExportCaptureError(f"No export response within {timeout:.0f} s") from None
+
+    def stop(self) -> None:
+        if self._token is not None and self.alive:
+            try:
+                trio.from_thread.run_sync(self._scope.cancel, trio_token=self._token)
+            except trio.RunFinishedError:
+                pass
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    # -------- listener thread --------
+
+    def _run(self, version: str, ws_url: str) -> None:
+        try:
+            trio.run(self._listen, version, ws_url)
+        except BaseException as e:  # surfaced through start()/wait()
+            self._error = e
+        finally:
+            self._ready.set()
+
+    async def _listen(self, version: str, ws_url: str) -> None:
+        devtools = cdp.import_devtools(version)
+        fetch = devtools.fetch
+        async with cdp.open_cdp(ws_url) as conn:
+            async with conn.open_session(self.target_id) as session:
+                events = session.listen(fetch.RequestPaused, buffer_size=50)
+                await session.execute(fetch.enable(patterns=[fetch.RequestPattern(
+                    url_pattern=self.url_pattern,
+                    resource_type=devtools.network.ResourceType.DOCUMENT,
+                    request_stage=fetch.RequestStage.RESPONSE,
+                )]))
+                with trio.CancelScope() as scope:
+                    self._scope = scope
+                    self._token = trio.lowlevel.current_trio_token()
+                    self._ready.set()
+                    async for event in events:
+                        await self._handle(session, fetch, event)
+
+    async def _handle(self, session, fetch, event) -> None:
+        headers = {h.name.lower(): h.value for h in event.response_headers or []}
+        if event.response_status_code != 200 or not is_export_response(headers):
+            await session.execute(fetch.continue_request(event.request_id))
+            return
+
+        body, encoded = await session.execute(fetch.get_response_body(event.request_id))
+        data = base64.b64decode(body) if encoded else body.encode("utf-8")
+        await session.execute(fetch.fulfill_request(event.request_id, response_code=204, response_headers=[]))
+
+        match = FILENAME_PATTERN.search(headers.get("content-disposition", ""))
+        with self._lock:
+            tag, self._tag = self._tag, None
+            self._exports.put(CapturedExport(
+                tag=tag,
+                body=data,
+                filename=match.group(1) if match else None,
+                url=event.request.url,
+            ))
+
+
+_captures: dict[str, CdpExportCapture] = {}
+
+
+def export_capture_for(driver) -> CdpExportCapture:
+    """One running capture per WebDriver session, started on first use (and again after a driver restart)."""
+    for session_id in [sid for sid, c in _captures.items() if not c.alive]:
+        del _captures[session_id]
+    capture = _captures.get(driver.session_id)
+    if capture is None:
+        capture = CdpExportCapture(driver).start()
+        _captures[driver.session_id] = capture
+    return capture
@@ -0,0 +1,146 @@
+import io
+import json
+import os
+from dataclasses import dataclass
+
+import pandas as pd
+
+from fix.file_check import RTO_CODE_PATTERN
+from jsf_http_engine import VEHICLE_CLASS_LABELS
+from xlsx_readers import read_sheet
+
+CUMULATIVE_DIR = "cumulative_folder"
+# A subfolder, so delta_data's cumulative_folder/*.csv glob never sees the snapshots
+TOTALS_DIR = os.path.join(CUMULATIVE_DIR, "totals")
+# Key of a totals row that covers the whole state rather than one RTO (the publication probe)
+STATE_WIDE = "*"
+# Columns consolidate_rto_files adds in front of the Maker x Fuel grid
+METADATA_COLUMNS = ["scrape_timestamp", "timestamp", "state", "rto", "rto_number", "vehicle_type", "district"]
+
+
+def totals_key(label: str) -> str:
+    """RTO code of a totals row label, or STATE_WIDE for a state-level row."""
+    match = RTO_CODE_PATTERN.search(str(label).upper())
+    return match.group(1) if match else STATE_WIDE
+
+
+def totals_from_rows(labels, totals) -> dict[str, int]:
+    return {
+        totals_key(label): int(total)
+        for label, total in zip(labels, totals)
+        if str(label).strip() and str(label).strip().upper() != "TOTAL"
+    }
+
+
+def totals_from_grid(df: pd.DataFrame) -> dict[str, int]:
+    """Totals per row of an on-screen grid (table_extract.grid_frame)."""
+    return totals_from_rows(df["Maker"], df["TOTAL"])
+
+
+def _export_rows(body: bytes):
+    """(labels, totals) of an exported sheet: label in the second column, TOTAL in the last."""
+    df = read_sheet(io.BytesIO(body))
+    df = df[df.iloc[:, 1].notna()]
+    return df.iloc[:, 1], pd.to_numeric(df.iloc[:, -1], errors="coerce").fillna(0)
+
+
+def totals_from_export(body: bytes) -> dict[str, int]:
+    """Totals per row of an exported sheet."""
+    return totals_from_rows(*_export_rows(body))
+
+
+def class_totals_from_rows(labels, totals) -> dict[str, int]:
+    """
+    Totals per vehicle_type from one RTO's Vehicle Class rows: each row
+    counts towards the vehicle_type whose VEHICLE_CLASS_LABELS hold it. A
+    class with no registrations has no row and counts 0.
+    """
+    by_type = dict.fromkeys(VEHICLE_CLASS_LABELS, 0)
+    for label, total in zip(labels, totals):
+        for vehicle_type, classes in VEHICLE_CLASS_LABELS.items():
+            if str(label).strip().upper() in classes:
+                by_type[vehicle_type] += int(total)
+    return by_type
+
+
+def class_totals_from_grid(df: pd.DataFrame) -> dict[str, int]:
+    """class_totals_from_rows of an on-screen Vehicle Class x Fuel grid (labels in its Maker column)."""
+    return class_totals_from_rows(df["Maker"], df["TOTAL"])
+
+
+def class_totals_from_export(body: bytes) -> dict[str, int]:
+    """class_totals_from_rows of an exported Vehicle Class x Fuel sheet."""
+    return class_totals_from_rows(*_export_rows(body))
+
+
+@dataclass(frozen=True)
+class TotalsSnapshot:
+    """Dashboard totals taken by the change-detection pass: state -> vehicle_type -> rto_code -> total."""
+    day: str
+    year: int
+    month: int
+    totals: dict
+
+    @staticmethod
+    def path(day: str, folder: str = TOTALS_DIR) -> str:
+        return os.path.join(folder, f"{day}.json")
+
+    @classmethod
+    def load(cls, day: str, folder: str = TOTALS_DIR) -> "TotalsSnapshot | None":
+        try:
+            with open(cls.path(day, folder), encoding="utf-8") as f:
+                data = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        return cls(data["day"], data["year"], data["month"], data["totals"])
+
+    def save(self, folder: str = TOTALS_DIR) -> str:
+        os.makedirs(folder, exist_ok=True)
+        path = self.path(self.day, folder)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"day": self.day, "year": self.year, "month": self.month, "totals": self.totals}, f, indent=1)
+        return path
+
+
+def latest_cumulative(before_day: str, folder: str = CUMULATIVE_DIR) -> tuple[str, str] | None:
+    """(day, path) of the newest YYYY-MM-DD.csv snapshot older than before_day."""
+    days = []
+    for name in os.listdir(folder) if os.path.isdir(folder) else []:
+        stem, ext = os.path.splitext(name)
+        if ext == ".csv" and len(stem) == 10 and stem < before_day:
+            days.append(stem)
+    if not days:
+        return None
+    day = max(days)
+    return day, os.path.join(folder, f"{day}.csv")
+
+
+def unchanged_rtos(previous: TotalsSnapshot, current: TotalsSnapshot, state: str, vehicle_type: str,
+                   rto_codes: list[str]) -> set[str]:
+    """
+    RTO codes whose totals match between the two snapshots. An RTO missing
+    from either snapshot counts as changed; a different year or month means
+    nothing is unchanged.
+    """
+    if (previous.year, previous.month) != (current.year, current.month):
+        return set()
+    before = previous.totals.get(state, {}).get(vehicle_type, {})
+    now = current.totals.get(state, {}).get(vehicle_type, {})
+    return {code for code in rto_codes if code in now and before.get(code) == now[code]}
+
+
+def carry_forward_grid(cumulative: pd.DataFrame, rto_code: str, vehicle_type: str) -> pd.DataFrame:
+    """
+    The RTO's rows of a cumulative snapshot turned back into a grid (S No,
+    Maker, fuels, TOTAL) that consolidate_rto_files reads like a fresh file.
+    Fuel columns the RTO's export did not have (empty for all its rows in the
+    snapshot) are left out, so they stay NaN in the consolidated CSV as they
+    would after a fresh scrape instead of being filled with 0.
+    """
+    rows = cumulative[(cumulative["rto_number"] == rto_code) & (cumulative["vehicle_type"] == vehicle_type)]
+    grid = rows.drop(columns=[c for c in METADATA_COLUMNS if c in rows.columns]).reset_index(drop=True)
+    if len(grid):
+        absent = [c for c in grid.columns if c not in ("Maker", "TOTAL") and grid[c].isna().all()]
+        grid = grid.drop(columns=absent)
+    grid.insert(0, "S No", range(1, len(grid) + 1))
+    return grid
@@ -0,0 +1,187 @@
+import time
+from dataclasses import dataclass, field
+from multiprocessing import Value
+
+import psutil
+
+
+class SharedRateLimiter:
+    """
+    Spaces RTO task starts across all worker processes to at most per_minute.
+
+    Built on multiprocessing Values so it can be handed to workers as a
+    Process argument; 0 means unlimited. The controller may change the rate
+    while workers are running.
+    """
+
+    def __init__(self, per_minute: float = 0.0):
+        self._rate = Value("d", per_minute)
+        self._next_slot = Value("d", 0.0)
+
+    @property
+    def per_minute(self) -> float:
+        return self._rate.value
+
+    def set_rate(self, per_minute: float) -> None:
+        self._rate.value = max(0.0, per_minute)
+
+    def ready(self) -> bool:
+        """Whether acquire() would return without waiting (nothing is claimed)."""
+        return self._rate.value <= 0 or time.time() >= self._next_slot.value
+
+    def acquire(self) -> float:
+        """Block until this caller may start a task; returns the seconds waited."""
+        rate = self._rate.value
+        if rate <= 0:
+            return 0.0
+        with self._next_slot.get_lock():
+            now = time.time()
+            slot = max(now, self._next_slot.value)
+            self._next_slot.value = slot + 60.0 / rate
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+        return delay
+
+
+@dataclass(frozen=True)
+class PoolControl:
+    """Shared between run_task_pool and its workers: how many may work, the crash count and the rate limiter."""
+    active: Value
+    crashes: Value
+    limiter: SharedRateLimiter
+
+    @classmethod
+    def create(cls, active: int, per_minute: float = 0.0) -> "PoolControl":
+        return cls(Value("i", active), Value("i", 0), SharedRateLimiter(per_minute))
+
+    def is_active(self, worker_id: int) -> bool:
+        return worker_id < self.active.value
+
+    def record_crash(self) -> None:
+        with self.crashes.get_lock():
+            self.crashes.value += 1
+
+
+@dataclass(frozen=True)
+class ControllerLimits:
+    cpu_high: float = 90.0
+    cpu_low: float = 70.0
+    mem_high: float = 85.0
+    mem_low: float = 75.0
+    errors_per_min_high: float = 1.0  # 503s / crashes / failed tasks across the pool
+    window_s: float = 60.0
+    min_gain: float = 0.05  # a step up must beat the smaller pool by this fraction to be kept
+    memory_s: float = 600.0  # throughput seen at a worker count is trusted this long
+    rate_backoff: float = 0.85  # on an error burst, cap task starts at this share of the observed rate
+    rate_recovery: float = 1.10  # and lift the cap by this factor per clean window
+
+
+@dataclass
+class ControllerWindow:
+    started: float
+    files: int
+    errors: int
+
+
+@dataclass
+class ConcurrencyController:
+    """
+    Hill-climbs the number of active workers toward the best sustained files/min.
+
+    Called from the pool's supervision loop; acts once per window. Each
+    window it scales down on CPU/memory pressure or an error burst (which
+    also caps the shared rate limiter just below the rate that caused it),
+    steps back when the last step up did not pay off, and otherwise steps up
+    while the box has headroom and the site is quiet.
+    """
+    control: PoolControl
+    max_workers: int
+    logger: object
+    limits: ControllerLimits = field(default_factory=ControllerLimits)
+    throughput: dict = field(default_factory=dict)  # active workers -> (files/min, measured at)
+    window: ControllerWindow | None = None
+    last_step: int = 0
+    rate_ceiling: float = 0.0  # the --max-rto-per-min the run started with (0 = none)
+
+    def __post_init__(self):
+        self.rate_ceiling = self.control.limiter.per_minute
+        psutil.cpu_percent(interval=None)  # prime: the next call averages over the window
+
+    @property
+    def active(self) -> int:
+        return self.control.active.value
+
+    def _set_active(self, count: int, reason: str) -> None:
+        count = max(1, min(self.max_workers, count))
+        if count == self.active:
+            return
+        self.last_step = count - self.active
+        self.logger.info(f"🎚️ Active workers {self.active} → {count}: {reason}")
+        self.control.active.value = count
+
+    def _known(self, count: int, now: float) -> float | None:
+        seen = self.throughput.get(count)
+        if seen is None or now - seen[1] > self.limits.memory_s:
+            return None
+        return seen[0]
+
+    def best(self) -> tuple[int, float] | None:
+        """(active workers, files/min) of the best window measured this run."""
+        if not self.throughput:
+            return None
+        count, (files_per_min, _) = max(self.throughput.items(), key=lambda item: item[1][0])
+        return count, files_per_min
+
+    def tick(self, files_done: int, errors: int) -> None:
+        now = time.time()
+        errors += self.control.crashes.value
+        if self.window is None:
+            self.window = ControllerWindow(now, files_done, errors)
+            return
+        elapsed = now - self.window.started
+        if elapsed < self.limits.window_s:
+            return
+
+        minutes = elapsed / 60
+        files_per_min = (files_done - self.window.files) / minutes
+        errors_per_min = (errors - self.window.errors) / minutes
+        self.window = ControllerWindow(now, files_done, errors)
+        cpu = psutil.cpu_percent(interval=None)
+        mem = psutil.virtual_memory().percent
+        active = self.active
+        self.throughput[active] = (files_per_min, now)
+        limiter = self.control.limiter
+        self.logger.info(f"🎚️ {active} workers: {files_per_min:.2f} files/min, {errors_per_min:.2f} errors/min, "
+                         f"CPU {cpu:.0f}%, memory {mem:.0f}%, rate cap "
+                         f"{f'{limiter.per_minute:.1f}/min' if limiter.per_minute else 'off'}")
+
+        lim = self.limits
+        if errors_per_min >= lim.errors_per_min_high:
+            if files_per_min > 0:
+                limiter.set_rate(files_per_min * lim.rate_backoff)
+            self._set_active(active - 1, f"{errors_per_min:.1f} errors/min from the site")
+            return
+        if limiter.per_minute != self.rate_ceiling:
+            # Ease a backed-off cap up again; without a configured ceiling, drop it once it no longer binds
+            raised = limiter.per_minute * lim.rate_recovery
+            if self.rate_ceiling:
+                raised = min(raised, self.rate_ceiling)
+            elif raised > 2 * files_per_min:
+                raised = 0.0
+            limiter.set_rate(raised)
+        if cpu >= lim.cpu_high or mem >= lim.mem_high:
+            self._set_active(active - 1, f"CPU {cpu:.0f}% / memory {mem:.0f}%")
+            return
+
+        smaller = self._known(active - 1, now)
+        if self.last_step > 0 and smaller is not None and files_per_min < smaller * (1 + lim.min_gain):
+            self._set_active(active - 1, f"{files_per_min:.2f} files/min is no better than {smaller:.2f} "
+                                         f"with {active - 1}")
+            return
+        larger = self._known(active + 1, now)
+        if larger is not None and larger < files_per_min * (1 + lim.min_gain):
+            self.last_step = 0
+            return
+        if cpu < lim.cpu_low and mem < lim.mem_low and errors_per_min == 0:
+            self._set_active(active + 1, f"headroom (CPU {cpu:.0f}%, memory {mem:.0f}%)")
@@ -0,0 +1,103 @@
+import os
+import threading
+from typing import Callable
+
+from webdriver_manager.chrome import ChromeDriverManager
+
+# Set to a chromedriver path to run fully offline (same as --chromedriver).
+CHROMEDRIVER_ENV = "RTO_CHROMEDRIVER"
+
+
+def resolve_chromedriver(pinned_path: str | None = None) -> str:
+    """
+    Path of the chromedriver binary for this run.
+
+    A pinned path (argument or RTO_CHROMEDRIVER) is used as-is without any
+    network access; otherwise webdriver-manager resolves it once.
+    """
+    pinned_path = pinned_path or os.environ.get(CHROMEDRIVER_ENV)
+    if pinned_path:
+        if not os.path.isfile(pinned_path):
+            raise FileNotFoundError(f"Pinned chromedriver not found: {pinned_path}")
+        return pinned_path
+    return ChromeDriverManager().install()
+
+
+class WarmDriverPool:
+    """
+    Keeps `spares` browsers launched and parked on the dashboard, so a crash
+    restart takes a ready one instead of cold-starting Chrome.
+
+    launch() must return (driver, wait). Spares are refilled in a background
+    thread after every take(); a spare that died while parked is discarded.
+    """
+
+    def __init__(self, launch: Callable[[], tuple], spares: int = 1):
+        self.launch = launch
+        self.spares = spares
+        self._ready: list[tuple] = []
+        self._lock = threading.Lock()
+        self._refilling = False
+        self._closed = False
+
+    def take(self) -> tuple:
+        session = None
+        while session is None:
+            with self._lock:
+                candidate = self._ready.pop(0) if self._ready else None
+            if candidate is None:
+                session = self.launch()
+            elif _alive(candidate[0]):
+                session = candidate
+            else:
+                _quit(candidate[0])
+        self._refill()
+        return session
+
+    def _refill(self) -> None:
+        with self._lock:
+            if self._refilling or self._closed or len(self._ready) >= self.spares:
+                return
+            self._refilling = True
+        threading.Thread(target=self._fill, daemon=True).start()
+
+    def _fill(self) -> None:
+        try:
+            while True:
+                with self._lock:
+                    if self._closed or len(self._ready) >= self.spares:
+                        return
+                try:
+                    session = self.launch()
+                except Exception:
+                    return
+                with self._lock:
+                    if self._closed:
+                        _quit(session[0])
+                        return
+                    self._ready.append(session)
+        finally:
+            with self._lock:
+                self._refilling = False
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            ready, self._ready = self._ready, []
+        for driver, _ in ready:
+            _quit(driver)
+
+
+def _alive(driver) -> bool:
+    try:
+        driver.current_window_handle
+        return True
+    except Exception:
+        return False
+
+
+def _quit(driver) -> None:
+    try:
+        driver.quit()
+    except Exception:
+        pass
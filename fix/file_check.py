@@ -11,6 +11,8 @@ from renameCheck import KNOWN_VEHICLE_TYPES, normalize_text, split_filename
 PROJECT_ROOT = Path(__file__).resolve().parent.parent
 DEFAULT_MANIFEST = PROJECT_ROOT / "fix" / "rto_files_list.json"
 RTO_CODE_PATTERN = re.compile(r"([A-Z]{2}\d+)")
+# .csv: grids saved by RTO_Scraper's table-extraction mode instead of an export
+SCRAPED_EXTENSIONS = (".xlsx", ".csv")
 
 STATE_FROM_RTO_PREFIX = {
     "TN": "Tamil_Nadu",
@@ -60,18 +62,29 @@ def setup_logger(log_path: str | None = None) -> logging.Logger:
     return logger
 
 
+# Parsed manifests by path, reused while the file's mtime is unchanged
+_manifest_cache: dict[Path, tuple[int, list[str]]] = {}
+
+
 def load_expected_files(manifest_path: str | Path) -> list[str]:
     path = Path(manifest_path)
     if not path.is_file():
         raise FileNotFoundError(f"Manifest not found: {path}")
 
+    mtime = path.stat().st_mtime_ns
+    cached = _manifest_cache.get(path)
+    if cached is not None and cached[0] == mtime:
+        return list(cached[1])
+
     with path.open(encoding="utf-8") as f:
         data = json.load(f)
 
     if not isinstance(data, list):
         raise ValueError(f"Manifest must be a JSON array: {path}")
 
-    return [str(name).strip() for name in data if str(name).strip()]
+    expected = [str(name).strip() for name in data if str(name).strip()]
+    _manifest_cache[path] = (mtime, expected)
+    return list(expected)
 
 
 def _extract_rto_code(text: str) -> str:
@@ -90,12 +103,19 @@ def file_identity(name: str) -> tuple[str, str, str]:
     )
 
 
-def build_folder_index(folder: str) -> dict[tuple[str, str], list[str]]:
-    """Map (rto_code, vehicle_type) -> actual filenames in folder."""
+def scraped_entries(folder: str) -> list[str]:
+    """One listing of the scraped files in folder, to share between the checks below."""
+    return [name for name in os.listdir(folder) if name.lower().endswith(SCRAPED_EXTENSIONS)]
+
+
+def build_folder_index(
+    folder: str, entries: list[str] | None = None
+) -> dict[tuple[str, str], list[str]]:
+    """Map (rto_code, vehicle_type) -> actual filenames in folder (or in entries, a listing of it)."""
     index: dict[tuple[str, str], list[str]] = {}
 
-    for entry in os.listdir(folder):
-        if not entry.lower().endswith(".xlsx"):
+    for entry in entries if entries is not None else os.listdir(folder):
+        if not entry.lower().endswith(SCRAPED_EXTENSIONS):
             continue
 
         code, vehicle_type, _ = file_identity(entry)
@@ -113,16 +133,15 @@ def find_missing_files(
     expected_names: list[str],
     *,
     folder_index: dict[tuple[str, str], list[str]] | None = None,
+    entries: list[str] | None = None,
 ) -> list[str]:
     """Return expected filenames that are not present (exact or by RTO code match)."""
+    if entries is None:
+        entries = scraped_entries(folder)
     if folder_index is None:
-        folder_index = build_folder_index(folder)
+        folder_index = build_folder_index(folder, entries)
 
-    present_exact = {
-        name.lower()
-        for name in os.listdir(folder)
-        if name.lower().endswith(".xlsx")
-    }
+    present_exact = {name.lower() for name in entries}
 
     missing: list[str] = []
     for expected in expected_names:
@@ -204,12 +223,11 @@ def run_file_check(
         raise FileNotFoundError(f"Folder not found: {folder}")
 
     expected = load_expected_files(manifest)
-    folder_index = build_folder_index(folder)
-    present_count = sum(
-        1 for name in os.listdir(folder) if name.lower().endswith(".xlsx")
-    )
+    entries = scraped_entries(folder)
+    folder_index = build_folder_index(folder, entries)
+    present_count = len(entries)
 
-    missing = find_missing_files(folder, expected, folder_index=folder_index)
+    missing = find_missing_files(folder, expected, folder_index=folder_index, entries=entries)
 
     logger.info(
         "File check: expected=%s present=%s missing=%s (folder=%s)",
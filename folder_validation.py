@@ -0,0 +1,226 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from functools import partial
+from pathlib import Path
+
+from fix.file_check import (
+    DEFAULT_MANIFEST,
+    build_folder_index,
+    find_missing_files,
+    load_expected_files,
+    scraped_entries,
+    setup_logger as setup_file_check_logger,
+)
+from renameCheck import apply_rename, check_and_fix_file, setup_logger as setup_rename_logger
+from rto_ingest import FrameCache, ingest_rto_file
+
+# Below this many files the pool costs more to start than the header reads take
+MIN_FILES_PER_POOL = 64
+
+
+@dataclass(frozen=True)
+class ValidationResult:
+    """Outcome of one rename + file check pass over a day's folder."""
+    folder: str
+    entries: tuple[str, ...]  # scraped files after renaming
+    ok: tuple[str, ...] = ()  # header matches the name
+    renamed: tuple[tuple[str, str], ...] = ()  # (old name, new name)
+    mismatched: tuple[tuple[str, str], ...] = ()  # dry run: would be renamed
+    no_header: tuple[str, ...] = ()
+    failed: tuple[tuple[str, str], ...] = ()  # (name, error) for files whose header could not be read
+    missing: tuple[str, ...] = ()  # manifest names with no matching file
+    duplicates: dict = field(default_factory=dict)  # (rto_code, vehicle_type) -> names, when more than one
+    expected: int = 0
+    elapsed_s: float = 0.0
+
+
+def _check_header(path: str) -> dict:
+    """Pool task: check_and_fix_file without touching the file (renames happen in the parent, in order)."""
+    try:
+        return check_and_fix_file(path, dry_run=True)
+    except Exception as e:
+        return {"file": path, "status": "error", "detail": str(e)}
+
+
+def _ingest_file(path: str, as_of: date | None = None):
+    """Pool task: ingest_rto_file (header check and parsed rows from one read), or an error result."""
+    try:
+        return ingest_rto_file(path, as_of)
+    except Exception as e:
+        return {"file": path, "status": "error", "detail": str(e)}
+
+
+def _name_of(result) -> str:
+    return os.path.basename(result["file"] if isinstance(result, dict) else result.path)
+
+
+def _map_files(task, paths: list[str], workers: int | None) -> list:
+    """task over paths, in the same order; spread over a process pool when it pays off."""
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(paths) < MIN_FILES_PER_POOL:
+        return [task(path) for path in paths]
+    workers = min(workers, len(paths) // (MIN_FILES_PER_POOL // 4))
+    chunksize = max(1, len(paths) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(task, paths, chunksize=chunksize))
+
+
+def validate_folder(
+    folder: str,
+    manifest_path: str | Path | None = None,
+    *,
+    workers: int | None = None,
+    dry_run: bool = False,
+    log_file: str | None = None,
+    cache: FrameCache | None = None,
+    as_of: date | None = None,
+) -> ValidationResult:
+    """
+    run_rename_check followed by run_file_check, from one listing of folder.
+
+    Headers are read in parallel; renames are then applied one by one in
+    sorted order, so a duplicate replaces the same file as in the
+    sequential check, and the listing is updated in memory instead of
+    being read again for the completeness check.
+
+    With a cache, each file is read once for everything: files the cache
+    already holds under their final name (streamed) are not read at all,
+    and the rest go through ingest_rto_file, whose parsed rows (for as_of)
+    are stored for consolidate_rto_files(parse=cache.parse).
+    """
+    t0 = time.time()
+    rename_logger = setup_rename_logger(log_file or f"rename_check_{datetime.now().strftime('%Y-%m-%d')}.log")
+    check_logger = setup_file_check_logger()
+    if not os.path.isdir(folder):
+        check_logger.error("Folder not found: %s", folder)
+        raise FileNotFoundError(f"Folder not found: {folder}")
+
+    entries = set(scraped_entries(folder))
+    ok, renamed, mismatched, no_header, failed = [], [], [], [], []
+    if cache is None:
+        to_read = sorted(name for name in entries if name.lower().endswith(".xlsx"))
+        task = _check_header
+    else:
+        # Grid CSVs are read too, for their rows
+        to_read = []
+        for name in sorted(entries):
+            entry = cache.get(os.path.join(folder, name), as_of)
+            if entry is None or entry.final_name != name:
+                to_read.append(name)
+            elif entry.check is None:
+                continue  # a grid CSV: nothing to check
+            elif entry.check["status"] in ("ok", "mismatch"):
+                ok.append(name)  # checked, and renamed if it had to be, when it was streamed
+            elif entry.check["status"] == "no_header":
+                no_header.append(name)
+            else:
+                failed.append((name, entry.check.get("detail", entry.check["status"])))
+        task = partial(_ingest_file, as_of=as_of)
+    replaced = set()  # names an earlier rename wrote over: their pool result describes the old content
+    for result in _map_files(task, [os.path.join(folder, name) for name in to_read], workers):
+        if _name_of(result) in replaced:
+            result = task(os.path.join(folder, _name_of(result)))
+        entry = None
+        if not isinstance(result, dict):
+            entry, result = result, result.check
+            if result is None:
+                # A grid CSV: nothing to check, only rows to keep
+                cache.put(entry.path, entry)
+                continue
+        name = os.path.basename(result["file"])
+        status = result["status"]
+        if status == "ok":
+            ok.append(name)
+        elif status == "no_header":
+            no_header.append(name)
+        elif status == "error":
+            failed.append((name, result["detail"]))
+            rename_logger.warning("UNREADABLE: %s (%s)", name, result["detail"])
+        elif status == "mismatch":
+            new_name = os.path.basename(result["new_path"])
+            if dry_run:
+                mismatched.append((name, new_name))
+                rename_logger.info("MISMATCH : %s", result["detail"])
+                continue
+            try:
+                apply_rename(result)
+            except OSError as e:
+                failed.append((name, str(e)))
+                rename_logger.warning("RENAME FAILED: %s (%s)", result["detail"], e)
+                continue
+            if new_name in entries and new_name != name:
+                replaced.add(new_name)
+            entries.discard(name)
+            entries.add(new_name)
+            renamed.append((name, new_name))
+            rename_logger.info("RENAMED  : %s", result["detail"])
+            if entry is not None:
+                cache.put(result["new_path"], entry)
+            continue
+        if entry is not None and status != "error":
+            cache.put(entry.path, entry)
+
+    manifest = Path(manifest_path) if manifest_path else DEFAULT_MANIFEST
+    expected = load_expected_files(manifest)
+    listing = sorted(entries)
+    folder_index = build_folder_index(folder, listing)
+    missing = find_missing_files(folder, expected, folder_index=folder_index, entries=listing)
+    duplicates = {key: sorted(names) for key, names in folder_index.items() if len(names) > 1}
+
+    result = ValidationResult(
+        folder=folder,
+        entries=tuple(listing),
+        ok=tuple(ok),
+        renamed=tuple(renamed),
+        mismatched=tuple(mismatched),
+        no_header=tuple(no_header),
+        failed=tuple(failed),
+        missing=tuple(missing),
+        duplicates=duplicates,
+        expected=len(expected),
+        elapsed_s=time.time() - t0,
+    )
+    rename_logger.info(
+        "Done. ok=%s mismatch=%s renamed=%s no_header=%s",
+        len(ok),
+        len(mismatched),
+        len(renamed),
+        len(no_header),
+    )
+    check_logger.info(
+        "File check: expected=%s present=%s missing=%s duplicates=%s (folder=%s, %.2fs)",
+        len(expected),
+        len(listing),
+        len(missing),
+        len(duplicates),
+        folder,
+        result.elapsed_s,
+    )
+    for (code, vehicle_type), names in duplicates.items():
+        check_logger.warning("  DUPLICATE %s [%s]: %s", code, vehicle_type, ", ".join(names))
+    for name in missing:
+        check_logger.error("  MISSING: %s", name)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Rename RTO files after their headers and check them against the manifest in one pass."
+    )
+    parser.add_argument("--folder", required=True, help="Folder containing downloaded RTO files")
+    parser.add_argument("--manifest", default=str(DEFAULT_MANIFEST), help="JSON file listing expected filenames")
+    parser.add_argument("--workers", type=int, default=None, help="Header-check processes (default: CPU count)")
+    parser.add_argument("--dry-run", action="store_true", help="Only report mismatches, do not rename files")
+    args = parser.parse_args()
+
+    result = validate_folder(args.folder, args.manifest, workers=args.workers, dry_run=args.dry_run)
+    print(f"{len(result.renamed)} renamed, {len(result.missing)} missing, {len(result.duplicates)} duplicated, "
+          f"{len(result.no_header) + len(result.failed)} without a readable header ({result.elapsed_s:.2f}s)")
+
+
+if __name__ == "__main__":
+    main()
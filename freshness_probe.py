@@ -0,0 +1,129 @@
+import argparse
+import json
+import os
+import statistics
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Callable
+
+FRESHNESS_DIR = os.path.join("cumulative_folder", "totals")
+BASELINE_FILE = "probe_baseline.json"
+PUBLICATIONS_FILE = "publications.jsonl"
+
+
+@dataclass(frozen=True)
+class ProbeBaseline:
+    """Last value of the probe total, for the data month it was read for."""
+    day: str
+    month: int
+    value: int
+    seen_at: str
+
+
+@dataclass(frozen=True)
+class ProbeResult:
+    value: int | None
+    published: bool
+    polls: int
+    last_unchanged_at: str | None  # the publication happened after this poll...
+    first_changed_at: str | None  # ...and before this one
+
+
+def _now() -> str:
+    return datetime.now().isoformat(timespec="seconds")
+
+
+def load_baseline(folder: str = FRESHNESS_DIR) -> ProbeBaseline | None:
+    try:
+        with open(os.path.join(folder, BASELINE_FILE), encoding="utf-8") as f:
+            return ProbeBaseline(**json.load(f))
+    except (FileNotFoundError, json.JSONDecodeError, TypeError):
+        return None
+
+
+def save_baseline(baseline: ProbeBaseline, folder: str = FRESHNESS_DIR) -> None:
+    os.makedirs(folder, exist_ok=True)
+    with open(os.path.join(folder, BASELINE_FILE), "w", encoding="utf-8") as f:
+        json.dump(asdict(baseline), f, indent=1)
+
+
+def record_publication(day: str, month: int, previous: ProbeBaseline | None, result: ProbeResult,
+                       folder: str = FRESHNESS_DIR) -> None:
+    os.makedirs(folder, exist_ok=True)
+    row = {"day": day, "month": month, "previous": previous.value if previous else None, **asdict(result)}
+    with open(os.path.join(folder, PUBLICATIONS_FILE), "a", encoding="utf-8") as f:
+        f.write(json.dumps(row) + "\n")
+
+
+def is_published(value: int, baseline: ProbeBaseline | None, month: int) -> bool:
+    """A new value for the same data month, or anything non-zero once the data month has rolled over."""
+    if baseline is None or baseline.month != month:
+        return value > 0
+    return value != baseline.value
+
+
+def wait_for_change(read_value: Callable[[], int], baseline: ProbeBaseline | None, month: int, deadline: float,
+                    logger, initial_s: float = 300, factor: float = 1.5, max_s: float = 1800,
+                    sleep: Callable[[float], None] = time.sleep) -> ProbeResult:
+    """
+    Poll read_value() until it differs from the baseline, backing off from
+    initial_s by factor up to max_s between polls (a failed read backs off
+    the same way). Gives up at deadline (epoch seconds).
+    """
+    delay = initial_s
+    polls = 0
+    last_unchanged_at = None
+    value = None
+    while True:
+        polls += 1
+        try:
+            value = read_value()
+        except Exception as e:
+            logger.warning(f"⚠️ Probe read failed: {e}")
+        else:
+            if is_published(value, baseline, month):
+                return ProbeResult(value, True, polls, last_unchanged_at, _now())
+            last_unchanged_at = _now()
+            logger.info(f"⏳ Probe total still {value} (poll {polls}); next check in {delay / 60:.1f} min")
+        if time.time() + delay > deadline:
+            return ProbeResult(value, False, polls, last_unchanged_at, None)
+        sleep(delay)
+        delay = min(delay * factor, max_s)
+
+
+def _minutes(stamp: str) -> int:
+    t = datetime.fromisoformat(stamp)
+    return t.hour * 60 + t.minute
+
+
+def publication_summary(folder: str = FRESHNESS_DIR) -> list[str]:
+    """When the data was first seen published, over the recorded days."""
+    try:
+        with open(os.path.join(folder, PUBLICATIONS_FILE), encoding="utf-8") as f:
+            rows = [json.loads(line) for line in f if line.strip()]
+    except FileNotFoundError:
+        return ["No publications recorded yet"]
+    seen = sorted(_minutes(r["first_changed_at"]) for r in rows if r.get("published") and r.get("first_changed_at"))
+    missed = sum(1 for r in rows if not r.get("published"))
+    if not seen:
+        return [f"No publication observed in {len(rows)} probe run(s)"]
+    hhmm = lambda m: f"{m // 60:02d}:{m % 60:02d}"
+    p90 = seen[min(len(seen) - 1, int(0.9 * len(seen)))]
+    return [
+        f"Published data first seen on {len(seen)} day(s) ({missed} probe run(s) timed out)",
+        f"Earliest {hhmm(seen[0])}, median {hhmm(int(statistics.median(seen)))}, "
+        f"90% by {hhmm(p90)}, latest {hhmm(seen[-1])}",
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarise when Vahan published the daily numbers.")
+    parser.add_argument("--folder", default=FRESHNESS_DIR, help="Folder holding publications.jsonl")
+    args = parser.parse_args()
+    for line in publication_summary(args.folder):
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,423 @@
+import argparse
+import os
+import re
+import xml.etree.ElementTree as ET
+from dataclasses import dataclass
+from html.parser import HTMLParser
+from urllib.parse import urljoin
+
+import requests
+
+URL = "https://vahan.parivahan.gov.in/vahan4dashboard/vahan/view/reportview.xhtml"
+
+# Vehicle classes ticked in the VhClass checkbox table for each vehicle type,
+# matched on the checkbox label (the browser path clicks tr[7], tr[52], tr[39], tr[51]).
+VEHICLE_CLASS_LABELS = {
+    "motor_car": ("MOTOR CAR",),
+    "motor_cab": ("MOTOR CAB", "LUXURY CAB", "MAXI CAB"),
+}
+
+AB_CALL_PATTERN = re.compile(r"PrimeFaces\.ab\(\{(.*?)\}", re.DOTALL)
+AB_ARG_PATTERN = re.compile(r"(\w+)\s*:\s*(?:\"([^\"]*)\"|'([^']*)')")
+SUBMIT_PARAM_PATTERN = re.compile(r"addSubmitParam\(\s*'[^']*'\s*,\s*\{\s*'([^']+)'")
+TAG_PATTERN = re.compile(r"<[^>]+>")
+
+
+class JsfExportError(RuntimeError):
+    """Raised when the server answers a form post with an error or a non-xlsx body."""
+
+
+class ViewStateExpired(JsfExportError):
+    """Raised when the server no longer accepts our javax.faces.ViewState."""
+
+
+@dataclass
+class ReportFormIds:
+    """Client ids on reportview.xhtml. None means discover from the page."""
+    form: str = "masterLayout_formlogin"
+    rto: str = "selectedRto"
+    y_axis: str = "yaxisVar"
+    x_axis: str = "xaxisVar"
+    year: str = "selectedYear"
+    month: str = "groupingTable:selectMonth"
+    vehicle_class: str = "VhClass"
+    state: str | None = None
+    main_refresh: str | None = None
+    table_refresh: str | None = None
+    export: str | None = None
+
+
+class _FormParser(HTMLParser):
+    """Collects form fields, select options, checkbox labels and PrimeFaces behaviors."""
+
+    def __init__(self, form_id: str):
+        super().__init__(convert_charrefs=True)
+        self.form_id = form_id
+        self.form_action = None
+        self.fields: dict[str, list[str]] = {}
+        self.selects: dict[str, list[tuple[str, str]]] = {}
+        self.select_ids: dict[str, str] = {}
+        self.checkboxes: dict[str, list[tuple[str, str]]] = {}
+        self.labels: dict[str, str] = {}
+        self.behaviors: dict[tuple[str, str], dict[str, str]] = {}
+        self.buttons: list[str] = []
+        self.export_links: list[tuple[str, str]] = []
+        self._select = None
+        self._option = None
+        self._label_for = None
+        self._anchor = None
+        self._script = False
+        self._text: list[str] = []
+
+    def _scan_behaviors(self, text: str, default_source: str | None = None):
+        for call in AB_CALL_PATTERN.findall(text):
+            args = {m.group(1): m.group(2) if m.group(2) is not None else m.group(3)
+                    for m in AB_ARG_PATTERN.finditer(call)}
+            source = args.get("s") or default_source
+            if source:
+                self.behaviors[(source, args.get("e", "action"))] = args
+
+    def handle_starttag(self, tag, attrs):
+        a = {k: (v or "") for k, v in attrs}
+        for handler in ("onclick", "onchange"):
+            if a.get(handler):
+                self._scan_behaviors(a[handler], a.get("id"))
+
+        if tag == "form" and a.get("id") == self.form_id:
+            self.form_action = a.get("action")
+        elif tag == "input" and a.get("name"):
+            kind = a.get("type", "text").lower()
+            if kind == "checkbox":
+                self.checkboxes.setdefault(a["name"], []).append((a.get("value", "on"), a.get("id", "")))
+                self.fields.setdefault(a["name"], [])
+                if "checked" in a:
+                    self.fields[a["name"]].append(a.get("value", "on"))
+            elif kind not in ("submit", "button", "image", "reset"):
+                self.fields[a["name"]] = [a.get("value", "")]
+        elif tag == "select" and a.get("name"):
+            self._select = a["name"]
+            self.selects[self._select] = []
+            self.select_ids[a.get("id", self._select)] = self._select
+            self.fields[self._select] = []
+        elif tag == "option" and self._select:
+            self._option = (a.get("value"), "selected" in a)
+            self._text = []
+        elif tag == "label" and a.get("for"):
+            self._label_for = a["for"]
+            self._text = []
+        elif tag == "button" and a.get("id"):
+            self.buttons.append(a["id"])
+        elif tag == "a":
+            match = SUBMIT_PARAM_PATTERN.search(a.get("onclick", ""))
+            self._anchor = match.group(1) if match else None
+        elif tag == "img" and self._anchor:
+            self.export_links.append((self._anchor, a.get("src", "") + " " + a.get("title", "")))
+        elif tag == "script":
+            self._script = True
+            self._text = []
+
+    def handle_endtag(self, tag):
+        if tag == "option" and self._select and self._option:
+            label = " ".join("".join(self._text).split())
+            value = self._option[0] if self._option[0] is not None else label
+            self.selects[self._select].append((value, label))
+            if self._option[1] or not self.fields[self._select]:
+                self.fields[self._select] = [value]
+            self._option = None
+        elif tag == "select":
+            self._select = None
+        elif tag == "label" and self._label_for:
+            self.labels[self._label_for] = " ".join("".join(self._text).split())
+            self._label_for = None
+        elif tag == "a":
+            self._anchor = None
+        elif tag == "script" and self._script:
+            self._scan_behaviors("".join(self._text))
+            self._script = False
+
+    def handle_data(self, data):
+        if self._option or self._label_for or self._script:
+            self._text.append(data)
+
+
+class JsfExportSession:
+    """
+    Browserless engine for reportview.xhtml.
+
+    Holds one HTTP session, keeps the JSF form fields and javax.faces.ViewState
+    in sync with every partial response, replays the same AJAX posts the
+    PrimeFaces widgets send for state, RTO, axis, month and vehicle class, and
+    returns the Excel export as bytes.
+    """
+
+    def __init__(self, url: str = URL, ids: ReportFormIds | None = None, timeout: float = 60,
+                 http: requests.Session | None = None, sticky: bool = False):
+        self.url = url
+        self.ids = ids or ReportFormIds()
+        self.timeout = timeout
+        # sticky: skip the change post for selects that already hold the wanted value
+        self.sticky = sticky
+        self.http = http or requests.Session()
+        self.action_url = url
+        self.fields: dict[str, list[str]] = {}
+        self.selects: dict[str, list[tuple[str, str]]] = {}
+        self.select_ids: dict[str, str] = {}
+        self.checkboxes: dict[str, list[tuple[str, str]]] = {}
+        self.labels: dict[str, str] = {}
+        self.behaviors: dict[tuple[str, str], dict[str, str]] = {}
+        self.buttons: list[str] = []
+        self.export_links: list[tuple[str, str]] = []
+
+    # ---- page model ----
+
+    @property
+    def _viewstate_field(self) -> str:
+        for name in self.fields:
+            if name.endswith("faces.ViewState"):
+                return name
+        return "javax.faces.ViewState"
+
+    @property
+    def _faces_prefix(self) -> str:
+        return self._viewstate_field.rsplit(".", 1)[0]
+
+    def _merge(self, html: str):
+        parser = _FormParser(self.ids.form)
+        parser.feed(html)
+        parser.close()
+        if parser.form_action:
+            self.action_url = urljoin(self.url, parser.form_action)
+        self.fields.update(parser.fields)
+        self.selects.update(parser.selects)
+        self.select_ids.update(parser.select_ids)
+        self.checkboxes.update(parser.checkboxes)
+        self.labels.update(parser.labels)
+        self.behaviors.update(parser.behaviors)
+        for button in parser.buttons:
+            if button not in self.buttons:
+                self.buttons.append(button)
+        for link in parser.export_links:
+            if link not in self.export_links:
+                self.export_links.append(link)
+
+    def _apply_partial(self, text: str):
+        try:
+            root = ET.fromstring(text.encode("utf-8") if isinstance(text, str) else text)
+        except ET.ParseError as e:
+            raise JsfExportError(f"Unparseable partial response: {e}") from e
+
+        if root.find("redirect") is not None:
+            raise ViewStateExpired("Server redirected the partial request (view expired)")
+        error = root.find("error")
+        if error is not None:
+            name = error.findtext("error-name", "")
+            message = error.findtext("error-message", "")
+            if "ViewExpired" in name:
+                raise ViewStateExpired(message or name)
+            raise JsfExportError(f"{name}: {message}")
+
+        for update in root.iter("update"):
+            update_id = update.get("id", "")
+            content = update.text or ""
+            if "ViewState" in update_id:
+                self.fields[self._viewstate_field] = [content.strip()]
+            else:
+                self._merge(content)
+
+    # ---- discovery ----
+
+    def _state_select(self) -> str:
+        if self.ids.state:
+            return self.select_ids.get(self.ids.state, self.ids.state)
+        rto_select = f"{self.ids.rto}_input"
+        for name, options in self.selects.items():
+            labels = " ".join(label.upper() for _, label in options)
+            if name != rto_select and "KARNATAKA" in labels and "KERALA" in labels:
+                return name
+        raise JsfExportError("Could not find the state select on the page")
+
+    def _component_of(self, select_name: str) -> str:
+        return select_name[: -len("_input")] if select_name.endswith("_input") else select_name
+
+    def _refresh_buttons(self) -> tuple[str, str]:
+        if self.ids.main_refresh and self.ids.table_refresh:
+            return self.ids.main_refresh, self.ids.table_refresh
+        with_behavior = [b for b in self.buttons if (b, "action") in self.behaviors]
+        table = self.ids.table_refresh or next(
+            (b for b in with_behavior if self.ids.vehicle_class in self.behaviors[(b, "action")].get("p", "")),
+            None,
+        )
+        main = self.ids.main_refresh or next((b for b in with_behavior if b != table), None)
+        if not main or not table:
+            raise JsfExportError(f"Could not identify refresh buttons among {with_behavior}")
+        return main, table
+
+    def _export_param(self) -> str:
+        if self.ids.export:
+            return self.ids.export
+        for param, hint in self.export_links:
+            if "xls" in hint.lower() or "excel" in hint.lower():
+                return param
+        if self.export_links:
+            return self.export_links[0][0]
+        raise JsfExportError("Could not find the Excel export link")
+
+    # ---- posts ----
+
+    def _form_data(self) -> list[tuple[str, str]]:
+        data = [(self.ids.form, self.ids.form)]
+        for name, values in self.fields.items():
+            data.extend((name, v) for v in values)
+        return data
+
+    def _ajax(self, source: str, event: str | None = None):
+        behavior = self.behaviors.get((source, event or "action"), {})
+        prefix = self._faces_prefix
+        data = self._form_data() + [
+            (f"{prefix}.partial.ajax", "true"),
+            (f"{prefix}.source", source),
+            (f"{prefix}.partial.execute", behavior.get("p", source)),
+            (f"{prefix}.partial.render", behavior.get("u", "@form")),
+        ]
+        if event:
+            data += [(f"{prefix}.behavior.event", event), (f"{prefix}.partial.event", event)]
+        else:
+            data.append((source, source))
+
+        resp = self.http.post(
+            self.action_url,
+            data=data,
+            headers={"Faces-Request": "partial/ajax", "X-Requested-With": "XMLHttpRequest"},
+            timeout=self.timeout,
+        )
+        if resp.status_code != 200:
+            raise JsfExportError(f"HTTP {resp.status_code} from partial submit of {source}")
+        self._apply_partial(resp.content)
+
+    def _select(self, component: str, *, index: int | None = None, label: str | None = None):
+        name = self.select_ids.get(f"{component}_input", f"{component}_input")
+        if name not in self.selects:
+            name = component if component in self.selects else name
+        options = self.selects.get(name)
+        if not options:
+            raise JsfExportError(f"No options for select {component}")
+
+        if index is not None:
+            if index >= len(options):
+                raise JsfExportError(f"Index {index} out of range for {component} ({len(options)} options)")
+            value = options[index][0]
+        else:
+            wanted = label.strip().upper()
+            value = next((v for v, l in options if l.strip().upper() == wanted), None)
+            if value is None:
+                value = next((v for v, l in options if l.strip().upper().startswith(wanted)), None)
+            if value is None:
+                raise JsfExportError(f"No option {label!r} in {component}")
+
+        if self.sticky and self.fields.get(name) == [value]:
+            return
+        self.fields[name] = [value]
+        component_id = self._component_of(name)
+        if (component_id, "change") in self.behaviors:
+            self._ajax(component_id, "change")
+
+    def _set_vehicle_classes(self, vehicle_types: tuple[str, ...]):
+        name = self.ids.vehicle_class
+        wanted = tuple(label for vehicle_type in vehicle_types for label in VEHICLE_CLASS_LABELS[vehicle_type])
+        values = [
+            value for value, input_id in self.checkboxes.get(name, [])
+            if self.labels.get(input_id, "").strip().upper() in wanted
+        ]
+        if len(values) != len(wanted):
+            raise JsfExportError(f"Vehicle classes {wanted} not all found in {name}")
+        self.fields[name] = values
+
+    # ---- public API ----
+
+    def open(self):
+        resp = self.http.get(self.url, timeout=self.timeout)
+        if resp.status_code != 200:
+            raise JsfExportError(f"HTTP {resp.status_code} loading {self.url}")
+        self._merge(resp.text)
+        if self._viewstate_field not in self.fields:
+            raise JsfExportError("No javax.faces.ViewState on the page")
+        return self
+
+    def select_state(self, state_name: str) -> list[str]:
+        """Select a state (e.g. 'Tamil_Nadu') and return its RTO dropdown labels."""
+        state_select = self._state_select()
+        self._select(self._component_of(state_select), label=state_name.replace("_", " "))
+        return self.rto_labels()
+
+    def rto_labels(self) -> list[str]:
+        return [label for _, label in self.selects.get(f"{self.ids.rto}_input", [])]
+
+    def export(self, rto_index: int, vehicle_type: str | tuple[str, ...], month: int, year: int | None = None,
+               y_axis: str = "Maker") -> bytes:
+        """
+        Run the same filter sequence as process_rto and return the xlsx bytes.
+        A tuple of vehicle types ticks all of their classes in one export.
+        """
+        main_refresh, table_refresh = self._refresh_buttons()
+
+        self._select(self.ids.rto, index=rto_index)
+        self._select(self.ids.y_axis, label=y_axis)
+        self._select(self.ids.x_axis, label="Fuel")
+        if year is not None:
+            self._select(self.ids.year, label=str(year))
+        self._ajax(main_refresh)
+
+        self._select(self.ids.month, index=month)
+        self._set_vehicle_classes((vehicle_type,) if isinstance(vehicle_type, str) else tuple(vehicle_type))
+        self._ajax(table_refresh)
+
+        param = self._export_param()
+        data = self._form_data() + [(param, param)]
+        with self.http.post(self.action_url, data=data, timeout=self.timeout, stream=True) as resp:
+            if resp.status_code != 200:
+                raise JsfExportError(f"HTTP {resp.status_code} from export")
+            body = b"".join(resp.iter_content(chunk_size=65536))
+
+        if not body.startswith(b"PK"):
+            if b"ViewExpired" in body or b"viewExpired" in body:
+                raise ViewStateExpired("Export answered with a view-expired page")
+            # The page text says why, e.g. an axis the server cannot export
+            text = " ".join(TAG_PATTERN.sub(" ", body[:4000].decode("utf-8", "replace")).split())
+            raise JsfExportError(f"Export did not return an xlsx ({len(body)} bytes){': ' + text[:200] if text else ''}")
+        return body
+
+    def close(self):
+        self.http.close()
+
+    # Same lifecycle call as a WebDriver so callers can treat both engines alike.
+    quit = close
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Export one RTO Maker x Fuel sheet over plain HTTP (no browser)."
+    )
+    parser.add_argument("--url", default=URL, help="reportview.xhtml URL (or a local stand-in)")
+    parser.add_argument("--state", default="Kerala", help="State name as in RTO_Scraper.STATES")
+    parser.add_argument("--rto-index", type=int, default=1, help="Index in the RTO dropdown")
+    parser.add_argument("--vehicle-type", choices=sorted(VEHICLE_CLASS_LABELS), default="motor_car")
+    parser.add_argument("--month", type=int, required=True, help="Month number (1-12)")
+    parser.add_argument("--out", default=".", help="Folder to write the xlsx into")
+    args = parser.parse_args()
+
+    session = JsfExportSession(args.url).open()
+    try:
+        labels = session.select_state(args.state)
+        print(f"{args.state}: {len(labels)} RTO options")
+        body = session.export(args.rto_index, args.vehicle_type, args.month)
+    finally:
+        session.close()
+
+    path = os.path.join(args.out, f"{labels[args.rto_index]}_{args.vehicle_type}.xlsx")
+    with open(path, "wb") as f:
+        f.write(body)
+    print(f"Wrote {path} ({len(body)} bytes)")
+
+
+if __name__ == "__main__":
+    main()
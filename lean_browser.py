@@ -0,0 +1,56 @@
+# Chrome switches for --lean-browser: headless, a modest window instead of
+# --start-maximized, no image decoding and no GPU compositing.
+LEAN_ARGS = (
+    "--headless=new",
+    "--window-size=1280,900",
+    "--disable-gpu",
+    "--disable-extensions",
+    "--mute-audio",
+    "--blink-settings=imagesEnabled=false",
+)
+
+# Network.setBlockedURLs patterns. Stylesheets are deliberately not blocked:
+# PrimeFaces hides the SelectOneMenu panels and decides what is clickable
+# through its theme CSS, so the filter clicks depend on it.
+BLOCKED_URL_PATTERNS = (
+    # images and icons
+    "*.png*", "*.jpg*", "*.jpeg*", "*.gif*", "*.svg*", "*.webp*", "*.ico*",
+    # fonts
+    "*.woff*", "*.ttf*", "*.eot*", "*.otf*",
+    # media
+    "*.mp4*", "*.webm*", "*.mp3*",
+    # analytics / tag managers
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*", "*hotjar.com*",
+    # chart libraries: the dashboard charts are never read, and PrimeFaces only
+    # logs "widget not available" when a chart widget's script is missing
+    "*charts.js*", "*chart.js*", "*chartjs*", "*highcharts*", "*jqplot*",
+)
+
+# Navigation timing plus what was actually fetched, to confirm the savings.
+PAGE_LOAD_JS = """
+var nav = performance.getEntriesByType('navigation')[0];
+var res = performance.getEntriesByType('resource');
+var bytes = 0;
+for (var i = 0; i < res.length; i++) { bytes += res[i].transferSize || 0; }
+return {
+    dom_ready_ms: nav ? Math.round(nav.domContentLoadedEventEnd) : null,
+    load_ms: nav ? Math.round(nav.loadEventEnd) : null,
+    resources: res.length,
+    kb: Math.round((bytes + (nav ? nav.transferSize || 0 : 0)) / 1024)
+};
+"""
+
+
+def apply_lean_profile(driver) -> None:
+    """Block non-essential requests for the current tab; call before navigating."""
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": list(BLOCKED_URL_PATTERNS)})
+
+
+def page_load_stats(driver) -> dict:
+    return driver.execute_script(PAGE_LOAD_JS) or {}
+
+
+def format_page_load(stats: dict) -> str:
+    return (f"Page load: DOM ready {stats.get('dom_ready_ms')} ms, load {stats.get('load_ms')} ms, "
+            f"{stats.get('resources')} resources, {stats.get('kb')} KB")
@@ -0,0 +1,172 @@
+import time
+from dataclasses import dataclass
+
+from selenium.common.exceptions import WebDriverException
+
+from page_waits import wait_for_ajax_idle
+
+PAGE_OK = "ok"
+PAGE_UNAVAILABLE = "unavailable"  # 503 / "Service Unavailable" from the site or its proxy
+PAGE_BLANK = "blank"  # about:blank, an empty body or no dashboard form
+PAGE_EXPIRED = "expired"  # the JSF view (ViewState) is gone; AJAX posts no longer do anything
+PAGE_DEAD = "dead"  # the browser itself does not answer
+
+# Outcomes of check_and_recover
+HEALTHY = "healthy"
+RELOADED = "reloaded"  # same browser, dashboard reloaded: the state has to be selected again
+UNAVAILABLE = "unavailable"
+RESTART = "restart"
+
+# One round trip. Also hooks PrimeFaces' AJAX completion once per page, so an
+# expired view reported to an AJAX post (the page itself looks fine) is seen
+# on the next probe.
+HEALTH_PROBE_JS = """
+if (window.jQuery && !window.__rtoHealthHook) {
+    window.__rtoHealthHook = true;
+    jQuery(document).on('pfAjaxComplete', function (e, xhr) {
+        if (xhr && /ViewExpired|view could not be restored/i.test(xhr.responseText || '')) {
+            window.__rtoViewExpired = true;
+        }
+    });
+}
+var body = document.body;
+var text = body ? (body.innerText || '').slice(0, 2000) : '';
+// The HTTP status of the page load, or an error page's title or heading; never the dashboard's own
+// text, where a count can be exactly 503
+var nav = window.performance && performance.getEntriesByType ? performance.getEntriesByType('navigation')[0] : null;
+if (nav && nav.responseStatus === 503) { return 'unavailable'; }
+var unavailable = /\\b503\\b|Service (Temporarily )?Unavailable/i;
+var heading = document.forms.length ? null : document.querySelector('h1, h2');
+if (unavailable.test(document.title) || (heading && unavailable.test(heading.textContent || ''))) {
+    return 'unavailable';
+}
+if (window.__rtoViewExpired || /ViewExpired|view could not be restored|session has expired/i.test(text)) {
+    return 'expired';
+}
+if (document.readyState !== 'complete' || location.href === 'about:blank' || !body || !document.forms.length) {
+    return 'blank';
+}
+if (!document.querySelector("input[name$='faces.ViewState']")) { return 'expired'; }
+return 'ok';
+"""
+
+
+def probe_page(driver) -> str:
+    """Classify the page in one script call: PAGE_OK, _UNAVAILABLE, _BLANK, _EXPIRED or _DEAD."""
+    try:
+        status = driver.execute_script(HEALTH_PROBE_JS)
+    except WebDriverException:
+        return PAGE_DEAD
+    return status if status in (PAGE_OK, PAGE_UNAVAILABLE, PAGE_BLANK, PAGE_EXPIRED) else PAGE_BLANK
+
+
+def soft_recover(driver, url: str, timeout: float = 30.0) -> bool:
+    """Reload the dashboard in the same browser (a fresh view and ViewState); True when it probes healthy."""
+    try:
+        driver.get(url)
+    except WebDriverException:
+        return False
+    wait_for_ajax_idle(driver, timeout)
+    return probe_page(driver) == PAGE_OK
+
+
+class PageHealth:
+    """
+    Per-session health state. check() only probes when the page has not
+    recently proven itself: a successful RTO (note_ok) is trusted for
+    trust_s, so a run of good files costs no extra round trips.
+    """
+
+    def __init__(self, trust_s: float = 60.0):
+        self.trust_s = trust_s
+        self._ok_at = 0.0
+
+    def note_ok(self) -> None:
+        self._ok_at = time.time()
+
+    def suspect(self) -> None:
+        """Probe on the next check (new session, failed RTO)."""
+        self._ok_at = 0.0
+
+    def check(self, driver) -> str:
+        if time.time() - self._ok_at < self.trust_s:
+            return PAGE_OK
+        status = probe_page(driver)
+        if status == PAGE_OK:
+            self.note_ok()
+        return status
+
+
+@dataclass(frozen=True)
+class BreakerPolicy:
+    threshold: int = 2  # consecutive 503s for a state before it is paused
+    base_s: float = 30.0
+    factor: float = 2.0
+    max_s: float = 600.0
+
+
+class StateBreakers:
+    """
+    Circuit breakers per state over a dict shared by every worker (a
+    Manager dict in the task pool, a plain dict in a state process):
+    state -> (consecutive 503s, paused until). Updates from different
+    workers may interleave; a lost count only delays the pause by one probe.
+    """
+
+    def __init__(self, shared=None, policy: BreakerPolicy = BreakerPolicy()):
+        self.shared = shared if shared is not None else {}
+        self.policy = policy
+
+    def paused_for(self, state: str) -> float:
+        """Seconds until state may be tried again (0 when its breaker is closed or half-open)."""
+        _, until = self.shared.get(state, (0, 0.0))
+        return max(0.0, until - time.time())
+
+    def record_failure(self, state: str) -> float:
+        """Count a 503 for state; returns the pause it now starts (0 below the threshold)."""
+        failures, _ = self.shared.get(state, (0, 0.0))
+        failures += 1
+        policy = self.policy
+        pause = 0.0
+        if failures >= policy.threshold:
+            pause = min(policy.max_s, policy.base_s * policy.factor ** (failures - policy.threshold))
+        self.shared[state] = (failures, time.time() + pause)
+        return pause
+
+    def record_success(self, state: str) -> None:
+        if state in self.shared:
+            del self.shared[state]
+
+
+def check_and_recover(driver, url: str, health: PageHealth, breakers: StateBreakers, state: str, logger) -> str:
+    """
+    Health check before an RTO, replacing the old crash check and its full browser restart.
+
+    HEALTHY: go ahead. RELOADED: the page was reloaded in the same browser
+    (blank page, expired view, or a 503 that had cleared), so select the state again.
+    UNAVAILABLE: the site answers 503 (or the state is still paused); hold the state back.
+    RESTART: the browser is gone or a reload did not help; start a new one.
+
+    A 503 page never clears by itself, so once the state's pause is over the
+    check reloads the page as a trial (half-open breaker): a healthy reload
+    closes the breaker, another 503 counts as a failure and lengthens the pause.
+    """
+    status = health.check(driver)
+    if status == PAGE_OK:
+        return HEALTHY
+    if status == PAGE_UNAVAILABLE and breakers.paused_for(state):
+        return UNAVAILABLE
+    logger.warning(f"🩺 Page check before next RTO: {status}")
+    if status == PAGE_DEAD:
+        return RESTART
+    if soft_recover(driver, url):
+        health.note_ok()
+        breakers.record_success(state)
+        logger.info("🩹 Dashboard reloaded in the same browser")
+        return RELOADED
+    if status == PAGE_UNAVAILABLE or probe_page(driver) == PAGE_UNAVAILABLE:
+        pause = breakers.record_failure(state)
+        if pause:
+            logger.warning(f"⛔ Pausing {state} for {pause:.0f}s: the site keeps answering 503")
+        return UNAVAILABLE
+    return RESTART
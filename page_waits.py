@@ -0,0 +1,137 @@
+import os
+import time
+
+from selenium.common.exceptions import WebDriverException
+
+WAIT_MODES = ("fixed", "ajax", "compare")
+POLL_INTERVAL = 0.1
+
+# True once the document is loaded and neither jQuery nor the PrimeFaces
+# request queue has anything in flight.
+AJAX_IDLE_JS = """
+if (document.readyState !== 'complete') { return false; }
+var jqIdle = !window.jQuery || window.jQuery.active === 0;
+var pfIdle = !(window.PrimeFaces && PrimeFaces.ajax && PrimeFaces.ajax.Queue)
+    || PrimeFaces.ajax.Queue.isEmpty();
+return jqIdle && pfIdle;
+"""
+
+
+def wait_for_ajax_idle(driver, timeout: float) -> bool:
+    """Poll until the page reports no AJAX activity. False on timeout or script error."""
+    # A click dispatches its request synchronously, but PrimeFaces may defer
+    # it by a tick; a short grace period avoids reading "idle" too early.
+    time.sleep(POLL_INTERVAL)
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if driver.execute_script(AJAX_IDLE_JS):
+                return True
+        except WebDriverException:
+            return False
+        time.sleep(POLL_INTERVAL)
+    return False
+
+
+def wait_for_download(download_dir: str, timeout: float) -> bool:
+    """Poll until a finished .xlsx (no .crdownload alongside) shows up in download_dir."""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            names = os.listdir(download_dir)
+        except FileNotFoundError:
+            names = []
+        if any(n.endswith(".xlsx") for n in names) and not any(n.endswith(".crdownload") for n in names):
+            return True
+        time.sleep(POLL_INTERVAL)
+    return False
+
+
+class PageWaiter:
+    """
+    Replacement for the fixed time.sleep() calls in process_rto.
+
+    mode="fixed"   sleeps exactly as before.
+    mode="ajax"    returns as soon as jQuery/PrimeFaces report idle, and only
+                   falls back to the fixed sleep if the probe times out.
+    mode="compare" alternates fixed and ajax per RTO so both are measured on
+                   the same run; see summary().
+    """
+
+    def __init__(self, mode: str = "ajax", timeout_factor: float = 5.0, min_timeout: float = 10.0):
+        if mode not in WAIT_MODES:
+            raise ValueError(f"Unknown wait mode: {mode}")
+        self.mode = mode
+        self.timeout_factor = timeout_factor
+        self.min_timeout = min_timeout
+        self.active = "fixed" if mode == "fixed" else "ajax"
+        self.fallbacks = 0
+        self.timings: dict[str, list[float]] = {"fixed": [], "ajax": []}
+        self._rto_started = None
+        self._rto_count = 0
+
+    def _timeout(self, seconds: float) -> float:
+        return max(seconds * self.timeout_factor, self.min_timeout)
+
+    def start_rto(self) -> str:
+        """Call at the start of each RTO; picks the mode used for it."""
+        if self.mode == "compare":
+            self.active = "fixed" if self._rto_count % 2 == 0 else "ajax"
+        self._rto_count += 1
+        self._rto_started = time.time()
+        return self.active
+
+    def finish_rto(self) -> None:
+        if self._rto_started is not None:
+            self.timings[self.active].append(time.time() - self._rto_started)
+            self._rto_started = None
+
+    def settle(self, driver, seconds: float) -> float:
+        """Wait after an interaction that may trigger a PrimeFaces AJAX update; returns the seconds waited."""
+        started = time.time()
+        if self.active == "fixed":
+            time.sleep(seconds)
+        elif not wait_for_ajax_idle(driver, self._timeout(seconds)):
+            self.fallbacks += 1
+            time.sleep(seconds)
+        return time.time() - started
+
+    def settle_download(self, download_dir: str, seconds: float) -> None:
+        """Wait for the exported file to land in download_dir."""
+        if self.active == "fixed":
+            time.sleep(seconds)
+            return
+        if not wait_for_download(download_dir, self._timeout(seconds)):
+            self.fallbacks += 1
+
+    def summary(self) -> dict:
+        return {
+            mode: {"rtos": len(values), "total_s": sum(values)}
+            for mode, values in self.timings.items()
+        } | {"fallbacks": self.fallbacks}
+
+
+def format_wait_summary(summary: dict) -> list[str]:
+    """Human-readable lines comparing mean seconds per RTO for each wait mode."""
+    lines = []
+    means = {}
+    for mode in ("fixed", "ajax"):
+        rtos = summary.get(mode, {}).get("rtos", 0)
+        if rtos:
+            means[mode] = summary[mode]["total_s"] / rtos
+            lines.append(f"{mode:>5} waits: {rtos} RTOs, {means[mode]:.1f} s/RTO")
+    if len(means) == 2 and means["fixed"]:
+        saved = means["fixed"] - means["ajax"]
+        lines.append(f"ajax saves {saved:.1f} s/RTO ({100 * saved / means['fixed']:.0f}%)")
+    lines.append(f"ajax fallbacks to fixed sleep: {summary.get('fallbacks', 0)}")
+    return lines
+
+
+def merge_wait_summaries(summaries) -> dict:
+    merged = {"fixed": {"rtos": 0, "total_s": 0.0}, "ajax": {"rtos": 0, "total_s": 0.0}, "fallbacks": 0}
+    for summary in summaries:
+        for mode in ("fixed", "ajax"):
+            merged[mode]["rtos"] += summary.get(mode, {}).get("rtos", 0)
+            merged[mode]["total_s"] += summary.get(mode, {}).get("total_s", 0.0)
+        merged["fallbacks"] += summary.get("fallbacks", 0)
+    return merged
@@ -0,0 +1,161 @@
+import time
+from dataclasses import asdict, dataclass
+
+# Runs a list of steps inside the page and reports back once, instead of one
+# WebDriver round trip (plus an XPath lookup) per click. After every step that
+# may fire a PrimeFaces AJAX request the script waits for jQuery and the
+# PrimeFaces queue to drain before moving on.
+#
+# Step ops:
+#   select  SelectOneMenu `target` (component id) -> item `index`, through the
+#           widget's selectItem() so its change behaviour fires as on a click
+#   check   make the checkbox in table row `index` of `target` match `checked`
+#           (clicks the row label only when the state differs)
+#   click   click the element at XPath `target`
+ACTION_JS = """
+var steps = arguments[0], timeoutMs = arguments[1], done = arguments[arguments.length - 1];
+var started = Date.now(), deadline = started + timeoutMs;
+function idle() {
+    var jqIdle = !window.jQuery || jQuery.active === 0;
+    var pfIdle = !(window.PrimeFaces && PrimeFaces.ajax && PrimeFaces.ajax.Queue) || PrimeFaces.ajax.Queue.isEmpty();
+    return document.readyState === 'complete' && jqIdle && pfIdle;
+}
+function widgetFor(id) {
+    if (!window.PrimeFaces) { return null; }
+    for (var key in PrimeFaces.widgets) {
+        var w = PrimeFaces.widgets[key];
+        if (w && w.id === id) { return w; }
+    }
+    return null;
+}
+function byXPath(xpath) {
+    return document.evaluate(xpath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+}
+function run(step) {
+    if (step.op === 'select') {
+        var w = widgetFor(step.target);
+        if (w && w.items && w.selectItem) {
+            var item = w.items.eq(step.index);
+            if (!item.length) { throw new Error('no item ' + step.index + ' in ' + step.target); }
+            w.selectItem(item);
+            return true;
+        }
+        var li = document.getElementById(step.target + '_' + step.index);
+        if (!li) { throw new Error('no item ' + step.index + ' in ' + step.target); }
+        li.click();
+        return true;
+    }
+    if (step.op === 'check') {
+        var row = document.querySelector('#' + CSS.escape(step.target) + ' > tbody > tr:nth-child(' + step.index + ')');
+        var box = row && row.querySelector('input[type=checkbox]');
+        if (!box) { throw new Error('no checkbox row ' + step.index + ' in ' + step.target); }
+        if (box.checked === step.checked) { return false; }
+        row.querySelector('label').click();
+        return true;
+    }
+    if (step.op === 'click') {
+        var el = byXPath(step.target);
+        if (!el) { throw new Error('nothing at ' + step.target); }
+        el.click();
+        return true;
+    }
+    throw new Error('unknown op ' + step.op);
+}
+var i = 0, acted = 0;
+function next() {
+    if (i >= steps.length) { done({ok: true, steps: steps.length, acted: acted, ms: Date.now() - started}); return; }
+    var step = steps[i];
+    try {
+        if (run(step)) { acted++; }
+    } catch (e) {
+        done({ok: false, step: i, error: String(e && e.message || e), ms: Date.now() - started});
+        return;
+    }
+    i++;
+    // PrimeFaces may queue the request a tick after the event; give it one before polling.
+    setTimeout(function poll() {
+        if (!step.settle || idle()) { next(); return; }
+        if (Date.now() > deadline) { done({ok: false, step: i - 1, error: 'timed out waiting for AJAX', ms: Date.now() - started}); return; }
+        setTimeout(poll, 50);
+    }, step.settle ? 50 : 0);
+}
+next();
+"""
+
+# Same script, started without blocking; the result lands in window.__pfActionResult.
+BACKGROUND_ACTION_JS = (
+    "window.__pfActionResult = null;"
+    "var args = Array.prototype.slice.call(arguments);"
+    "args.push(function (result) { window.__pfActionResult = result; });"
+    "(function () {" + ACTION_JS + "}).apply(null, args);"
+)
+ACTION_RESULT_JS = "return window.__pfActionResult;"
+
+MAIN_REFRESH_XPATH = '/html/body/form/div[2]/div/div/div[1]/div[3]/div[3]/div/button'
+TABLE_REFRESH_XPATH = '/html/body/form/div[2]/div/div/div[3]/div/div[1]/div[1]/span/button'
+EXPORT_XPATH = '/html/body/form/div[2]/div/div/div[3]/div/div[2]/div/div/div[1]/div[1]/a/img'
+
+
+class ActionScriptError(Exception):
+    """A step of an in-page action script failed."""
+
+    def __init__(self, step, error: str):
+        self.step = step
+        super().__init__(f"{step.op} {step.target}[{step.index}]: {error}")
+
+
+@dataclass(frozen=True)
+class Step:
+    op: str
+    target: str
+    index: int | None = None
+    checked: bool | None = None
+    settle: bool = True
+
+
+def run_steps(driver, steps: list[Step], timeout: float = 60) -> dict:
+    """Execute steps in the page with one execute_async_script call; raises ActionScriptError on the first failure."""
+    driver.set_script_timeout(timeout + 5)
+    started = time.time()
+    result = driver.execute_async_script(ACTION_JS, [asdict(s) for s in steps], int(timeout * 1000))
+    if not result or not result.get("ok"):
+        result = result or {"step": 0, "error": "no result from action script"}
+        raise ActionScriptError(steps[result["step"]], result["error"])
+    result["round_trip_s"] = time.time() - started
+    return result
+
+
+def start_steps(driver, steps: list[Step], timeout: float = 60) -> None:
+    """Start steps in the page and return at once; poll_steps() collects the outcome."""
+    driver.execute_script(BACKGROUND_ACTION_JS, [asdict(s) for s in steps], int(timeout * 1000))
+
+
+def poll_steps(driver, steps: list[Step]) -> dict | None:
+    """None while the steps started by start_steps() are still running, else their result."""
+    result = driver.execute_script(ACTION_RESULT_JS)
+    if result is None:
+        return None
+    if not result.get("ok"):
+        raise ActionScriptError(steps[result["step"]], result["error"])
+    return result
+
+
+def rto_steps(n: int, y_axis: int, x_axis: int, year_option: int | None) -> list[Step]:
+    """RTO, axes and (optionally) year, then the main refresh."""
+    steps = [
+        Step("select", "selectedRto", n),
+        Step("select", "yaxisVar", y_axis),
+        Step("select", "xaxisVar", x_axis),
+    ]
+    if year_option is not None:
+        steps.append(Step("select", "selectedYear", year_option))
+    steps.append(Step("click", MAIN_REFRESH_XPATH))
+    return steps
+
+
+def table_steps(month: int, class_rows: tuple[int, ...], all_rows: tuple[int, ...]) -> list[Step]:
+    """Month and vehicle classes of the grouping table, then the table refresh."""
+    steps = [Step("select", "groupingTable:selectMonth", month)]
+    steps += [Step("check", "VhClass", row, checked=row in class_rows) for row in all_rows]
+    steps.append(Step("click", TABLE_REFRESH_XPATH))
+    return steps
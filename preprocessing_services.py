@@ -1,9 +1,12 @@
 import pandas as pd
 import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
 from datetime import date
 import re
 from datetime import date, timedelta
 from preprocess import cluster_mapping
+from xlsx_readers import read_sheet
 import json
 
 with open("district.json", "r", encoding="utf-8") as f:
@@ -32,6 +35,9 @@ TARGET_MAKERS = {
     "SKODA AUTO AS",
 }
 
+# Below this many files per extra process the pool costs more to start than the parsing takes
+MIN_FILES_PER_WORKER = 8
+
 
 
 def parse_filename(filename):
@@ -65,86 +71,146 @@ def parse_filename(filename):
     return None
 
 
-def process_rto_file(filepath):
-    """Process a single RTO Excel file"""
+def read_rto_file(filepath, as_of=None, source=None, filename=None, reader=None):
+    """process_rto_file without the error handling: raises on a file it cannot use.
+    reader is the xlsx_readers backend for Excel exports (default: xlsx_readers.default_reader())."""
+    if filepath.lower().endswith('.csv'):
+        df = pd.read_csv(source or filepath)
+    else:
+        df = read_sheet(source or filepath, reader)
+
+    filename = filename or os.path.basename(filepath)
+    file_info = parse_filename(filename)
+
+    if not file_info:
+        raise ValueError(f"Could not parse filename: {filename}")
+
+    # Remove the first column (S No) if it exists
+    if 'S No' in df.columns or 'Unnamed: 0' in df.columns:
+        df = df.iloc[:, 1:]
+    columns = df.columns.tolist()
+    if len(columns) > 0:
+        columns[0] = 'Maker'
+        df.columns = columns
+    # Remove empty rows (where Maker is NaN)
+    yesterday = (as_of or date.today() - timedelta(days=1)).strftime('%d-%m-%Y')
+    df = df[df['Maker'].notna() & (df['Maker'] != '')]
+    df = df[~df['Maker'].str.strip().isin(['Maker', 'TOTAL', ''])]
+    df.insert(0, 'scrape_timestamp', date.today().strftime('%d-%m-%Y'))
+    df.insert(1, 'timestamp', yesterday)
+    df.insert(2, 'state', file_info['state'])
+    df.insert(3, 'rto', file_info['rto'])
+    df.insert(4, 'rto_number', file_info['rto_number'])
+    df.insert(5, 'vehicle_type', file_info['vehicle_type'])
+    district = DISTRICT_MAP.get(file_info['rto'].upper(), "Unknown")
+    df.insert(6, 'district', district)
+
+
+    # Clean up maker names (strip whitespace)
+    df['Maker'] = df['Maker'].str.strip()
+    df = df[df['Maker'].isin(TARGET_MAKERS)]
+    last_col = df.columns[-1]
+    if 'Unnamed' in str(last_col):
+        df.rename(columns={last_col: 'TOTAL'}, inplace=True)
+    for col in df.columns[7:]:
+        if col != 'Maker':
+            df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0).astype(int)
+
+    return df
+
+
+def process_rto_file(filepath, as_of=None, source=None, filename=None):
+    """Process a single RTO Excel file (or a grid CSV saved by the table-extraction mode).
+    as_of is the data date for the timestamp column (default: yesterday). source is the
+    file's content when already in memory, filename the name to take the RTO from
+    (default: filepath's)."""
     try:
-        df = pd.read_excel(filepath, header=3)
-        
-        filename = os.path.basename(filepath)
-        file_info = parse_filename(filename)
-        
-        if not file_info:
-            print(f"Could not parse filename: {filename}")
-            return None
-        
-        # Remove the first column (S No) if it exists
-        if 'S No' in df.columns or 'Unnamed: 0' in df.columns:
-            df = df.iloc[:, 1:]
-        columns = df.columns.tolist()
-        if len(columns) > 0:
-            columns[0] = 'Maker'
-            df.columns = columns
-        # Remove empty rows (where Maker is NaN)
-        yesterday = (date.today() - timedelta(days=1)).strftime('%d-%m-%Y')
-        df = df[df['Maker'].notna() & (df['Maker'] != '')]
-        df = df[~df['Maker'].str.strip().isin(['Maker', 'TOTAL', ''])]
-        df.insert(0, 'scrape_timestamp', date.today().strftime('%d-%m-%Y'))
-        df.insert(1, 'timestamp', yesterday)
-        df.insert(2, 'state', file_info['state'])
-        df.insert(3, 'rto', file_info['rto'])
-        df.insert(4, 'rto_number', file_info['rto_number'])
-        df.insert(5, 'vehicle_type', file_info['vehicle_type'])
-        district = DISTRICT_MAP.get(file_info['rto'].upper(), "Unknown")
-        df.insert(6, 'district', district)
-
-        
-        # Clean up maker names (strip whitespace)
-        df['Maker'] = df['Maker'].str.strip()
-        df = df[df['Maker'].isin(TARGET_MAKERS)]
-        last_col = df.columns[-1]
-        if 'Unnamed' in str(last_col):
-            df.rename(columns={last_col: 'TOTAL'}, inplace=True)
-        for col in df.columns[7:]:
-            if col != 'Maker':
-                df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0).astype(int)
-        
-        return df
-    
+        return read_rto_file(filepath, as_of=as_of, source=source, filename=filename)
     except Exception as e:
         print(f"Error processing {filepath}: {str(e)}")
         return None
 
-def consolidate_rto_files(input_folder, output_csv):
-    """Process all Excel files in folder and create consolidated CSV"""
-    
-    all_data = []
-    xlsx_files = [f for f in os.listdir(input_folder) if f.endswith('.xlsx')]
-    
+@dataclass(frozen=True)
+class ConsolidationReport:
+    """What consolidate_rto_files did with each file of the folder."""
+    output_csv: str
+    files: int = 0
+    records: int = 0
+    written: bool = False
+    empty: tuple = ()  # names that parsed but had no rows for the target makers
+    failed: tuple = ()  # (name, error) for files that could not be parsed
+
+
+def _parse_task(filepath, as_of=None):
+    """Pool task: (DataFrame or None, error or None) for one file."""
+    try:
+        return read_rto_file(filepath, as_of=as_of), None
+    except Exception as e:
+        return None, f"{type(e).__name__}: {e}"
+
+
+def _parse_files(paths, as_of, parse, workers):
+    """(df, error) per path, in the order of paths whatever order the workers finish in."""
+    if parse is not None:
+        # A caller-supplied parse (e.g. FrameCache.parse) answers from memory in this process
+        results = []
+        for path in paths:
+            try:
+                results.append((parse(path, as_of=as_of), None))
+            except Exception as e:
+                results.append((None, f"{type(e).__name__}: {e}"))
+        return results
+    workers = min(workers or os.cpu_count() or 1, len(paths) // MIN_FILES_PER_WORKER)
+    if workers <= 1:
+        return [_parse_task(path, as_of) for path in paths]
+    chunksize = max(1, len(paths) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(_parse_task, paths, [as_of] * len(paths), chunksize=chunksize))
+
+
+def consolidate_rto_files(input_folder, output_csv, as_of=None, parse=None, workers=None):
+    """Process all Excel files in folder and create consolidated CSV (as_of: see process_rto_file).
+    parse replaces process_rto_file, e.g. to reuse files already parsed by streaming_ingest.
+    Without one, files are parsed on a pool of workers processes (default: CPU count; 1 = none).
+    Files are taken in name order and rows sorted by rto_number and vehicle_type, so the CSV
+    is the same however the work is split. Returns a ConsolidationReport."""
+    xlsx_files = sorted(f for f in os.listdir(input_folder) if f.endswith(('.xlsx', '.csv')))
+
     if not xlsx_files:
         print(f"No Excel files found in {input_folder}")
-        return
-    
+        return ConsolidationReport(output_csv)
+
     print(f"Found {len(xlsx_files)} Excel files to process")
-    for filename in xlsx_files:
-        filepath = os.path.join(input_folder, filename)
+    paths = [os.path.join(input_folder, filename) for filename in xlsx_files]
+    all_data, empty, failed = [], [], []
+    for filename, (df, error) in zip(xlsx_files, _parse_files(paths, as_of, parse, workers)):
         print(f"Processing: {filename}")
-        
-        df = process_rto_file(filepath)
-        if df is not None and not df.empty:
+        if error is not None:
+            failed.append((filename, error))
+            print(f"  ✗ {error}")
+        elif df is not None and not df.empty:
             all_data.append(df)
             print(f"  ✓ Added {len(df)} records")
         else:
+            empty.append(filename)
             print(f"  ✗ No data extracted")
-    
 
+    records = 0
     if all_data:
         final_df = pd.concat(all_data, ignore_index=True)
+        # Stable, so rows of one file keep the sheet's order
+        final_df = final_df.sort_values(['rto_number', 'vehicle_type'], kind='mergesort', ignore_index=True)
         final_df.to_csv(output_csv, index=False)
         print(f"\n✓ Successfully created {output_csv}")
         print(f"  Total records: {len(final_df)}")
         print(f"  Total columns: {len(final_df.columns)}")
+        records = len(final_df)
     else:
         print("No data was processed!")
+    if failed:
+        print(f"  {len(failed)} file(s) failed: " + ", ".join(name for name, _ in failed))
+    return ConsolidationReport(output_csv, files=len(xlsx_files), records=records, written=bool(all_data),
+                               empty=tuple(empty), failed=tuple(failed))
 
 
 
@@ -3,7 +3,7 @@ import logging
 import os
 import re
 from datetime import datetime
-from openpyxl import load_workbook
+from xlsx_header import read_header_text
 
 
 TITLE_PREFIX_PATTERN = re.compile(r"^maker\s+wise\s+fuel\s+data\s+of\s+", re.IGNORECASE)
@@ -79,17 +79,17 @@ def get_available_path(path: str) -> str:
     return path
 
 
-def check_and_fix_file(file_path: str, dry_run: bool):
+def check_and_fix_file(file_path: str, dry_run: bool, header_text: str | None = None):
+    """Compare the file's title with its name and rename it after the title; header_text if already read."""
     base_name = os.path.splitext(os.path.basename(file_path))[0]
     rto_from_name, vehicle_type = split_filename(base_name)
     is_report_table = base_name.strip().lower() == "reporttable"
     if is_report_table and not vehicle_type:
         vehicle_type = "motor_car"
 
-    wb = load_workbook(file_path, read_only=True, data_only=True)
-    sheet = wb.active
-    header_text = extract_header_text(sheet)
-    wb.close()
+    if header_text is None:
+        # Streams just the title row out of the zip; openpyxl + extract_header_text if the layout is unusual
+        header_text = read_header_text(file_path)
 
     rto_from_header = extract_rto_from_header(header_text)
 
@@ -115,18 +115,23 @@ def check_and_fix_file(file_path: str, dry_run: bool):
     new_path = os.path.join(os.path.dirname(file_path), f"{new_base}.xlsx")
     new_path = get_available_path(new_path)
 
-    if not dry_run:
-        if os.path.exists(new_path) and os.path.abspath(new_path) != os.path.abspath(file_path):
-            os.remove(new_path)
-        os.rename(file_path, new_path)
-
-    return {
+    result = {
         "file": file_path,
-        "status": "renamed" if not dry_run else "mismatch",
+        "status": "mismatch",
         "detail": f"{os.path.basename(file_path)} -> {os.path.basename(new_path)}",
         "header": rto_from_header,
         "new_path": new_path,
     }
+    return result if dry_run else apply_rename(result)
+
+
+def apply_rename(result: dict) -> dict:
+    """Carry out a "mismatch" result of check_and_fix_file(dry_run=True); returns it as "renamed"."""
+    file_path, new_path = result["file"], result["new_path"]
+    if os.path.exists(new_path) and os.path.abspath(new_path) != os.path.abspath(file_path):
+        os.remove(new_path)
+    os.rename(file_path, new_path)
+    return {**result, "status": "renamed"}
 
 
 def get_default_folder():
@@ -0,0 +1,123 @@
+import io
+import os
+import threading
+from dataclasses import dataclass
+from datetime import date, timedelta
+
+import pandas as pd
+
+from fix.file_check import RTO_CODE_PATTERN, file_identity
+from preprocessing_services import read_rto_file
+from renameCheck import check_and_fix_file, extract_rto_from_header
+from xlsx_header import read_header_text
+
+
+def file_signature(path: str) -> tuple[int, int]:
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def resolve_as_of(as_of: date | None) -> date:
+    # process_rto_file's default, pinned so a cached frame and a later consolidate agree
+    return as_of or date.today() - timedelta(days=1)
+
+
+@dataclass(frozen=True)
+class IngestedRto:
+    """Everything the post-processing needs from one downloaded file, read from disk once."""
+    path: str
+    signature: tuple[int, int]  # (size, mtime) when read; a rename keeps it
+    as_of: date
+    check: dict | None  # check_and_fix_file(dry_run=True) result; None for grid CSVs
+    rto_name: str  # RTO from the title ("" without one)
+    rto_code: str
+    vehicle_type: str
+    frame: pd.DataFrame | None  # process_rto_file's rows, for the name the file ends up with
+    error: str | None = None  # why there is no frame
+
+    @property
+    def final_name(self) -> str:
+        """The file's name once the rename check has run."""
+        return _final_name(self.path, self.check)
+
+
+def _final_name(path: str, check: dict | None) -> str:
+    if check is not None and check["status"] == "mismatch":
+        return os.path.basename(check["new_path"])
+    return os.path.basename(path)
+
+
+def ingest_rto_file(filepath: str, as_of: date | None = None) -> IngestedRto:
+    """
+    Read a downloaded file once and derive from the same bytes: the title
+    (streamed from the first row), the rename check's verdict, the RTO
+    identity and vehicle class, and the parsed Maker x Fuel rows.
+    """
+    as_of = resolve_as_of(as_of)
+    signature = file_signature(filepath)
+    with open(filepath, "rb") as f:
+        body = f.read()
+
+    check = None
+    rto_name = ""
+    if filepath.lower().endswith(".xlsx"):
+        header_text = read_header_text(io.BytesIO(body))
+        check = check_and_fix_file(filepath, dry_run=True, header_text=header_text)
+        rto_name = extract_rto_from_header(header_text)
+    final_name = _final_name(filepath, check)
+    code, vehicle_type, _ = file_identity(final_name)
+    match = RTO_CODE_PATTERN.search(rto_name.upper())
+    frame, error = None, None
+    try:
+        frame = read_rto_file(filepath, as_of=as_of, source=io.BytesIO(body), filename=final_name)
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    return IngestedRto(filepath, signature, as_of, check, rto_name, match.group(1) if match else code,
+                       vehicle_type, frame, error)
+
+
+class FrameCache:
+    """
+    Parsed files by path, shared by the streaming stage, the validation
+    pass and consolidate_rto_files. parse() stands in for read_rto_file
+    (raising on a bad file) and answers from the cache while the file is unchanged.
+    """
+
+    def __init__(self):
+        self._files: dict[str, IngestedRto] = {}
+        self._lock = threading.Lock()
+        self.reused = 0
+        self.parsed_late = 0
+
+    def __len__(self) -> int:
+        return len(self._files)
+
+    def put(self, path: str, entry: IngestedRto) -> None:
+        """Store entry under path, where the file now is (after any rename)."""
+        with self._lock:
+            self._files[os.path.abspath(path)] = entry
+
+    def get(self, path: str, as_of: date | None = None) -> IngestedRto | None:
+        """The entry for path if it was read with the same as_of and the file has not changed since."""
+        with self._lock:
+            entry = self._files.get(os.path.abspath(path))
+        if entry is None or entry.as_of != resolve_as_of(as_of):
+            return None
+        try:
+            return entry if entry.signature == file_signature(path) else None
+        except FileNotFoundError:
+            return None
+
+    def summary(self) -> str:
+        return (f"{len(self)} file(s) read once for checks and rows; consolidate reused {self.reused}, "
+                f"parsed {self.parsed_late} again")
+
+    def parse(self, filepath: str, as_of: date | None = None) -> pd.DataFrame | None:
+        entry = self.get(filepath, as_of)
+        if entry is not None:
+            self.reused += 1
+            if entry.error:
+                raise ValueError(entry.error)
+            return entry.frame
+        self.parsed_late += 1
+        return read_rto_file(filepath, as_of=resolve_as_of(as_of))
@@ -0,0 +1,88 @@
+import json
+import os
+from dataclasses import dataclass
+
+from fix.file_check import RTO_CODE_PATTERN
+
+RTO_LIST_SUFFIX = "_rto_lists"
+
+# Enabled, not explicitly hidden RTO items of the selectedRto SelectOneMenu; the
+# panel markup is in the DOM even while the dropdown is closed.
+_RTO_ITEMS = """
+var items = document.querySelectorAll('#selectedRto_items li.ui-selectonemenu-item');
+var labels = [];
+for (var i = 0; i < items.length; i++) {
+    var li = items[i];
+    if (li.classList.contains('ui-state-disabled') || li.style.display === 'none') { continue; }
+    labels.push((li.textContent || '').replace(/\\s+/g, ' ').trim());
+}
+"""
+RTO_LABELS_JS = _RTO_ITEMS + "return labels;"
+RTO_COUNT_JS = _RTO_ITEMS + "return labels.length;"
+
+
+@dataclass(frozen=True)
+class RtoOption:
+    index: int
+    label: str
+    rto_code: str
+
+
+def rto_list_dir(final_dir: str) -> str:
+    """Per-day cache next to the day folder, e.g. Downloads/2026-05-28_RTO_Files_rto_lists/."""
+    return f"{os.path.normpath(final_dir)}{RTO_LIST_SUFFIX}"
+
+
+def options_from_labels(labels: list[str]) -> list[RtoOption]:
+    options = []
+    for i, label in enumerate(labels):
+        match = RTO_CODE_PATTERN.search(label.upper())
+        options.append(RtoOption(i, label, match.group(1) if match else ""))
+    return options
+
+
+class RtoListCache:
+    """
+    RTO dropdown contents per state as plain data, one JSON file per state.
+
+    Files are replaced atomically, so pool workers and the rescrape pass can
+    read and refresh them concurrently.
+    """
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+
+    def _path(self, state_name: str) -> str:
+        return os.path.join(self.cache_dir, f"{state_name}.json")
+
+    def load(self, state_name: str) -> list[RtoOption] | None:
+        try:
+            with open(self._path(state_name), encoding="utf-8") as f:
+                rows = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        return [RtoOption(*row) for row in rows]
+
+    def store(self, state_name: str, options: list[RtoOption]) -> None:
+        os.makedirs(self.cache_dir, exist_ok=True)
+        path = self._path(state_name)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump([[o.index, o.label, o.rto_code] for o in options], f, ensure_ascii=False, indent=1)
+        os.replace(tmp, path)
+
+    def labels(self, driver, state_name: str) -> tuple[list[str], bool]:
+        """
+        RTO labels for the state currently selected in driver, and whether the cache was used.
+
+        Only the item count is read from the page when the cached list matches
+        it; otherwise all labels are read in one script call and the cache is
+        rewritten. An empty list means the panel is not in the DOM yet.
+        """
+        cached = self.load(state_name)
+        if cached is not None and cached and driver.execute_script(RTO_COUNT_JS) == len(cached):
+            return [o.label for o in cached], True
+        labels = driver.execute_script(RTO_LABELS_JS) or []
+        if labels:
+            self.store(state_name, options_from_labels(labels))
+        return labels, False
@@ -0,0 +1,79 @@
+import calendar
+import os
+import re
+from dataclasses import dataclass
+from datetime import date
+
+CUMULATIVE_DIR = "cumulative_folder"
+_MONTH = re.compile(r"^(\d{4})-(\d{1,2})$")
+
+
+@dataclass(frozen=True)
+class RunTarget:
+    """
+    The data month a scrape is for, and where it goes: the day folder in
+    Downloads and the cumulative_folder snapshot consolidated from it.
+    """
+    year: int
+    month: int
+    snapshot_day: str  # YYYY-MM-DD
+    folder: str
+    as_of: date  # last day of data in the snapshot (its "timestamp" column)
+
+    @property
+    def cumulative_csv(self) -> str:
+        return os.path.join(CUMULATIVE_DIR, f"{self.snapshot_day}.csv")
+
+    def __str__(self) -> str:
+        return f"{self.year}-{self.month:02d}"
+
+
+def day_folder(downloads_dir: str, day: str) -> str:
+    return os.path.join(downloads_dir, f"{day}_RTO_Files")
+
+
+def backfill_target(year: int, month: int, today: date, downloads_dir: str) -> RunTarget:
+    """
+    A past month. Its snapshot is dated on the month's last day, like the
+    existing month-end files in cumulative_folder. The current month is the
+    daily run's: a backfill of it would share today's folder, ledger and
+    cumulative CSV.
+    """
+    if not 1 <= month <= 12:
+        raise ValueError(f"Month out of range: {year}-{month}")
+    if (year, month) > (today.year, today.month):
+        raise ValueError(f"Cannot backfill a future month: {year}-{month:02d}")
+    if (year, month) == (today.year, today.month):
+        raise ValueError(f"Cannot backfill the current month {year}-{month:02d}; the daily run scrapes it")
+    month_end = date(year, month, calendar.monthrange(year, month)[1])
+    day = month_end.isoformat()
+    return RunTarget(year, month, day, day_folder(downloads_dir, day), month_end)
+
+
+def _parse_month(text: str) -> tuple[int, int]:
+    match = _MONTH.match(text.strip())
+    if not match:
+        raise ValueError(f"Expected YYYY-MM, got {text!r}")
+    return int(match.group(1)), int(match.group(2))
+
+
+def parse_months(spec: str) -> list[tuple[int, int]]:
+    """
+    (year, month) pairs from "2025-11,2026-01" or ranges such as
+    "2025-10..2026-02" (both ends included), in order and without repeats.
+    """
+    months = []
+    for part in spec.split(","):
+        if not part.strip():
+            continue
+        if ".." in part:
+            first, last = (_parse_month(p) for p in part.split("..", 1))
+            if first > last:
+                raise ValueError(f"Empty month range: {part}")
+            year, month = first
+            while (year, month) <= last:
+                months.append((year, month))
+                year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+        else:
+            months.append(_parse_month(part))
+    return list(dict.fromkeys(months))
@@ -0,0 +1,144 @@
+import hashlib
+import os
+import sqlite3
+import time
+import uuid
+
+from fix.file_check import SCRAPED_EXTENSIONS, file_identity
+
+LEDGER_SUFFIX = "_ledger.sqlite3"
+
+
+def ledger_path(final_dir: str) -> str:
+    """Ledger lives next to the day's folder, e.g. Downloads/2026-05-28_RTO_Files_ledger.sqlite3."""
+    return f"{os.path.normpath(final_dir)}{LEDGER_SUFFIX}"
+
+
+def _is_download_name(path: str) -> bool:
+    """True for the {uuid}_{vehicle_type}.xlsx names given before renameCheck runs."""
+    prefix = os.path.basename(path).split("_", 1)[0]
+    try:
+        uuid.UUID(prefix)
+    except ValueError:
+        return False
+    return True
+
+
+def file_checksum(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(65536), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ScrapeLedger:
+    """
+    Durable record of completed (rto_code, vehicle_type) downloads for one day.
+
+    Each process opens its own connection; SQLite serialises the writers, so
+    state processes, pool workers and the rescrape pass can share one file.
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        self.conn = sqlite3.connect(db_path, timeout=30)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS completed (
+                rto_code     TEXT NOT NULL,
+                vehicle_type TEXT NOT NULL,
+                file_path    TEXT NOT NULL,
+                checksum     TEXT NOT NULL,
+                completed_at REAL NOT NULL,
+                PRIMARY KEY (rto_code, vehicle_type)
+            )
+            """
+        )
+        self.conn.commit()
+
+    def record(self, rto_code: str, vehicle_type: str, file_path: str) -> None:
+        self.conn.execute(
+            "INSERT OR REPLACE INTO completed VALUES (?, ?, ?, ?, ?)",
+            (rto_code.upper(), vehicle_type, file_path, file_checksum(file_path), time.time()),
+        )
+        self.conn.commit()
+
+    def is_complete(self, rto_code: str, vehicle_type: str) -> bool:
+        row = self.conn.execute(
+            "SELECT 1 FROM completed WHERE rto_code = ? AND vehicle_type = ?",
+            (rto_code.upper(), vehicle_type),
+        ).fetchone()
+        return row is not None
+
+    def file_path(self, rto_code: str, vehicle_type: str) -> str | None:
+        row = self.conn.execute(
+            "SELECT file_path FROM completed WHERE rto_code = ? AND vehicle_type = ?",
+            (rto_code.upper(), vehicle_type),
+        ).fetchone()
+        return row[0] if row else None
+
+    def completed_at(self, rto_code: str, vehicle_type: str) -> float | None:
+        row = self.conn.execute(
+            "SELECT completed_at FROM completed WHERE rto_code = ? AND vehicle_type = ?",
+            (rto_code.upper(), vehicle_type),
+        ).fetchone()
+        return row[0] if row else None
+
+    def completed_keys(self) -> set[tuple[str, str]]:
+        return {
+            (code, vehicle_type)
+            for code, vehicle_type in self.conn.execute(
+                "SELECT rto_code, vehicle_type FROM completed"
+            )
+        }
+
+    def reconcile(self, folder: str) -> dict[str, int]:
+        """
+        Bring the ledger in line with what is actually on disk.
+
+        Files renamed by renameCheck are found again by checksum. Entries whose
+        file is gone, or whose renamed file turned out to hold a different RTO,
+        are dropped so that work gets redone.
+        """
+        by_checksum: dict[str, str] = {}
+        if os.path.isdir(folder):
+            for name in os.listdir(folder):
+                if name.lower().endswith(SCRAPED_EXTENSIONS):
+                    path = os.path.join(folder, name)
+                    by_checksum.setdefault(file_checksum(path), path)
+
+        counts = {"kept": 0, "moved": 0, "dropped": 0}
+        rows = self.conn.execute(
+            "SELECT rto_code, vehicle_type, file_path, checksum FROM completed"
+        ).fetchall()
+
+        for code, vehicle_type, file_path, checksum in rows:
+            current = by_checksum.get(checksum)
+            mismatch = False
+            if current is not None and not _is_download_name(current):
+                name_code, name_vehicle, _ = file_identity(current)
+                mismatch = bool(name_code) and (name_code, name_vehicle) != (code, vehicle_type)
+
+            if current is None or mismatch:
+                self.conn.execute(
+                    "DELETE FROM completed WHERE rto_code = ? AND vehicle_type = ?",
+                    (code, vehicle_type),
+                )
+                counts["dropped"] += 1
+            elif os.path.abspath(current) != os.path.abspath(file_path):
+                self.conn.execute(
+                    "UPDATE completed SET file_path = ? WHERE rto_code = ? AND vehicle_type = ?",
+                    (current, code, vehicle_type),
+                )
+                counts["moved"] += 1
+            else:
+                counts["kept"] += 1
+
+        self.conn.commit()
+        return counts
+
+    def close(self) -> None:
+        self.conn.close()
@@ -0,0 +1,78 @@
+import os
+import threading
+import time
+from datetime import date
+from multiprocessing import Queue
+
+import pandas as pd
+
+from renameCheck import apply_rename
+from rto_ingest import FrameCache, ingest_rto_file
+
+
+class StreamingIngest:
+    """
+    Parses finished downloads while the scrape is still running.
+
+    Pool workers put (path, as_of) on queue as soon as a file is saved and in
+    the ledger. A thread in the main process reads each file once with
+    ingest_rto_file, renames it after its title (as renameCheck does) and
+    keeps the result in cache. Hand cache to validate_folder and cache.parse
+    to consolidate_rto_files afterwards: streamed files are neither read
+    nor parsed again, so the CSV is the same as a plain consolidate.
+    """
+
+    def __init__(self, logger, cache: FrameCache | None = None):
+        self.queue = Queue()
+        self.logger = logger
+        self.cache = cache if cache is not None else FrameCache()
+        self.streamed = 0
+        self.last_file_at = None
+        self._thread = None
+
+    def start(self) -> "StreamingIngest":
+        self._thread = threading.Thread(target=self._run, name="streaming-ingest", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Finish everything already queued, then end the thread."""
+        if self._thread is None:
+            return
+        self.queue.put(None)
+        self._thread.join()
+        self._thread = None
+
+    def _run(self) -> None:
+        while True:
+            item = self.queue.get()
+            if item is None:
+                break
+            path, as_of = item
+            try:
+                self.ingest(path, as_of)
+            except Exception as e:
+                self.logger.warning(f"⚠️ Streaming ingest failed for {path}: {e}")
+
+    def ingest(self, path: str, as_of: date | None = None) -> None:
+        if not os.path.exists(path):
+            return
+        entry = ingest_rto_file(path, as_of)
+        status = entry.check["status"] if entry.check is not None else "ok"
+        if status == "mismatch":
+            apply_rename(entry.check)
+            self.logger.info(f"✏️ Renamed while streaming: {entry.check['detail']}")
+            path = entry.check["new_path"]
+        elif status == "no_header":
+            self.logger.warning(f"⚠️ No header in {os.path.basename(path)}; left for the rename check")
+        self.cache.put(path, entry)
+        self.streamed += 1
+        self.last_file_at = time.time()
+
+    def parse(self, filepath: str, as_of: date | None = None) -> pd.DataFrame | None:
+        """read_rto_file, answered from the streamed frame when the file is unchanged."""
+        return self.cache.parse(filepath, as_of)
+
+    def summary(self) -> str:
+        return (f"{self.streamed} file(s) parsed during the scrape; consolidate reused {self.cache.reused}, "
+                f"parsed {self.cache.parsed_late} afterwards")
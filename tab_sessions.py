@@ -0,0 +1,104 @@
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Generator
+
+# Background tabs must keep running their in-page scripts and timers at full speed.
+BACKGROUND_TAB_ARGS = (
+    "--disable-background-timer-throttling",
+    "--disable-renderer-backgrounding",
+    "--disable-backgrounding-occluded-windows",
+)
+
+# A tab flow is a generator that runs with the driver switched to its tab and
+# yields a poll function whenever it has to wait. The scheduler calls
+# poll(driver) on its next visit to the tab; None means "not yet", anything
+# else is sent back into the generator. The generator's return value is the
+# task outcome.
+Poll = Callable[[Any], Any]
+TabFlow = Generator[Poll, Any, Any]
+
+
+@dataclass
+class BrowserTab:
+    index: int
+    handle: str
+    capture: Any = None  # cdp_capture.CdpExportCapture bound to this tab's target
+    state: str | None = None
+    target: Any = None  # data month the page's filters were last set for
+    labels: list[str] = field(default_factory=list)
+    task: Any = None
+    flow: TabFlow | None = None
+    poll: Poll | None = None
+    started: float = 0.0
+
+    @property
+    def busy(self) -> bool:
+        return self.flow is not None
+
+    def assign(self, task, flow: TabFlow) -> None:
+        self.task, self.flow, self.poll, self.started = task, flow, None, time.time()
+
+    def release(self) -> None:
+        self.task = self.flow = self.poll = None
+
+
+def open_tabs(driver, count: int, url: str, on_tab=None, capture=None) -> list[BrowserTab]:
+    """
+    Open count tabs on url.
+
+    The first tab is the driver's current window; on_tab(driver) runs in every
+    new tab before it navigates (e.g. to apply per-tab CDP settings).
+    capture(driver), called with the driver switched to the tab, starts the
+    export capture for that tab. Chrome's download folder is one per browser,
+    not per tab, so tabs cannot tell their downloads apart on disk; each tab
+    takes its export off its own page target instead.
+    """
+    tabs = []
+    for i in range(count):
+        if i:
+            driver.switch_to.new_window("tab")
+            if on_tab is not None:
+                on_tab(driver)
+            driver.get(url)
+        tabs.append(BrowserTab(i, driver.current_window_handle, capture(driver) if capture is not None else None))
+    return tabs
+
+
+def close_tabs(tabs: list[BrowserTab]) -> None:
+    """Stop every tab's export capture (the browser itself is quit by the caller)."""
+    for tab in tabs:
+        if tab.capture is not None:
+            tab.capture.stop()
+
+
+def step_tab(driver, tab: BrowserTab) -> tuple[bool, bool, Any]:
+    """
+    Visit tab once: advance its flow if the pending poll is satisfied.
+
+    Returns (progressed, finished, outcome). Exceptions from the poll or the
+    flow propagate; the caller decides whether the tab or the browser is lost.
+    """
+    driver.switch_to.window(tab.handle)
+    value = None
+    if tab.poll is not None:
+        value = tab.poll(driver)
+        if value is None:
+            return False, False, None
+    try:
+        tab.poll = tab.flow.send(value)
+    except StopIteration as stop:
+        return True, True, stop.value
+    return True, False, None
+
+
+def wait_for_export(capture, timeout: float) -> Poll:
+    """Poll that returns the tab's next captured export, or False after timeout or once its capture has stopped."""
+    deadline = time.time() + timeout
+
+    def poll(_driver):
+        export = capture.take()
+        if export is not None:
+            return export
+        return False if time.time() > deadline or not capture.alive else None
+
+    return poll
@@ -0,0 +1,124 @@
+import os
+
+import pandas as pd
+
+GRID_COLUMNS_HEAD = ["S No", "Maker"]
+GRID_TOTAL = "TOTAL"
+
+# Reads the groupingTable DataTable in one execute_async_script call: header
+# cells (with their row/col spans) plus the body rows of every paginator page.
+# Pages are turned through the PrimeFaces paginator widget; a page is ready once
+# its tbody rows have been replaced and the AJAX queue is empty.
+GRID_JS = """
+var done = arguments[arguments.length - 1];
+var deadline = Date.now() + arguments[0];
+function text(el) { return (el.innerText || el.textContent || '').replace(/\\s+/g, ' ').trim(); }
+function header() {
+    return Array.prototype.map.call(document.querySelectorAll('#groupingTable thead > tr'), function (tr) {
+        return Array.prototype.map.call(tr.querySelectorAll('th'), function (th) {
+            return {text: text(th), colspan: th.colSpan || 1, rowspan: th.rowSpan || 1};
+        });
+    });
+}
+function tbody() { return document.getElementById('groupingTable_data'); }
+function bodyRows() {
+    var body = tbody();
+    if (!body) { return []; }
+    return Array.prototype.map.call(body.children, function (tr) {
+        return Array.prototype.map.call(tr.children, text);
+    }).filter(function (cells) { return cells.length > 1; });
+}
+function idle() { return !(window.PrimeFaces && PrimeFaces.ajax && PrimeFaces.ajax.Queue) || PrimeFaces.ajax.Queue.isEmpty(); }
+var widget = null;
+if (window.PrimeFaces) {
+    for (var key in PrimeFaces.widgets) {
+        var w = PrimeFaces.widgets[key];
+        if (w && w.id === 'groupingTable') { widget = w; break; }
+    }
+}
+var pager = widget && widget.paginator;
+var pageCount = pager ? (pager.cfg.pageCount || 1) : 1;
+var rows = [];
+function turnTo(page, then) {
+    if (!pager || pager.getCurrentPage() === page) { then(); return; }
+    var marker = tbody() && tbody().firstElementChild;
+    pager.setPage(page);
+    (function poll() {
+        var first = tbody() && tbody().firstElementChild;
+        if (first !== marker && idle()) { then(); return; }
+        if (Date.now() > deadline) { done({error: 'timed out turning to page ' + (page + 1)}); return; }
+        setTimeout(poll, 100);
+    })();
+}
+function collect(page) {
+    turnTo(page, function () {
+        rows = rows.concat(bodyRows());
+        if (page + 1 < pageCount) { collect(page + 1); return; }
+        var columns = header();
+        turnTo(0, function () { done({header: columns, rows: rows, pages: pageCount}); });
+    });
+}
+if (!tbody()) { done({error: 'groupingTable not found'}); } else { collect(0); }
+"""
+
+
+class TableExtractError(Exception):
+    """The grouping table could not be read from the page."""
+
+
+def leaf_columns(header_rows: list[list[dict]]) -> list[str]:
+    """
+    Flatten a multi-row <thead> into one label per body column.
+
+    Each column takes the text of the lowest header cell covering it, so
+    "Fuel" spanning the fuel names yields the fuel names, while row-spanning
+    cells such as "Maker" keep their own text.
+    """
+    placed: dict[tuple[int, int], str] = {}
+    width = 0
+    for r, cells in enumerate(header_rows):
+        c = 0
+        for cell in cells:
+            while (r, c) in placed:
+                c += 1
+            for dr in range(cell["rowspan"]):
+                for dc in range(cell["colspan"]):
+                    placed[(r + dr, c + dc)] = cell["text"]
+            c += cell["colspan"]
+            width = max(width, c)
+    last_row = len(header_rows) - 1
+    return [placed.get((last_row, c), "") for c in range(width)]
+
+
+def grid_frame(payload: dict) -> pd.DataFrame:
+    """
+    Turn the GRID_JS payload into the same grid the xlsx export holds:
+    S No, Maker, one column per fuel, TOTAL (numbers without thousands separators).
+    """
+    if payload.get("error"):
+        raise TableExtractError(payload["error"])
+    columns = leaf_columns(payload["header"])
+    if len(columns) < len(GRID_COLUMNS_HEAD) + 1:
+        raise TableExtractError(f"Unexpected grouping table header: {columns}")
+    columns = GRID_COLUMNS_HEAD + columns[len(GRID_COLUMNS_HEAD):-1] + [GRID_TOTAL]
+
+    rows = [row for row in payload["rows"] if len(row) == len(columns)]
+    df = pd.DataFrame(rows, columns=columns)
+    for col in df.columns[len(GRID_COLUMNS_HEAD):]:
+        df[col] = pd.to_numeric(df[col].str.replace(",", "", regex=False), errors="coerce").fillna(0).astype(int)
+    return df
+
+
+def read_grouping_table(driver, timeout: float = 60) -> pd.DataFrame:
+    """Read every page of the on-screen Maker x Fuel table in a single script call."""
+    driver.set_script_timeout(timeout + 5)
+    payload = driver.execute_async_script(GRID_JS, int(timeout * 1000))
+    return grid_frame(payload or {"error": "no result from grouping table script"})
+
+
+def save_grid(df: pd.DataFrame, file_stem: str, folder: str) -> str:
+    """Write the grid as <file_stem>.csv; preprocessing_services reads it like an export."""
+    os.makedirs(folder, exist_ok=True)
+    path = os.path.join(folder, f"{file_stem}.csv")
+    df.to_csv(path, index=False)
+    return path
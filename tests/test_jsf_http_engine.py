@@ -0,0 +1,111 @@
+import io
+
+import pytest
+
+from change_detection import class_totals_from_export, totals_from_export
+from jsf_http_engine import VEHICLE_CLASS_LABELS, JsfExportError, JsfExportSession, ViewStateExpired
+from vahan_standin_server import STANDIN_RTOS, StandinHandler, export_rows, serve, standin_url
+from xlsx_header import read_header_text
+from xlsx_readers import read_sheet
+
+MONTH = 5
+
+
+@pytest.fixture(scope="module")
+def url():
+    server = serve()
+    yield standin_url(server)
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def session(url):
+    session = JsfExportSession(url).open()
+    yield session
+    session.close()
+
+
+def title(body: bytes) -> str:
+    return read_header_text(io.BytesIO(body))
+
+
+def rows(body: bytes) -> list[tuple[str, int]]:
+    """(label, TOTAL) per row of an exported sheet."""
+    df = read_sheet(io.BytesIO(body))
+    return [(label, int(total)) for label, total in zip(df.iloc[:, 1], df.iloc[:, -1])]
+
+
+def expected_rows(rto: str, classes: tuple[str, ...], y_axis: str = "Maker", year: str = "2026"):
+    return [(label, sum(row)) for label, row in export_rows(y_axis, "Kerala", [rto], classes, MONTH, year)]
+
+
+def test_select_state_lists_rto_labels(session):
+    labels = session.select_state("Kerala")
+    assert labels == ["All Vahan4 Running Office"] + STANDIN_RTOS["Kerala"]
+    assert session.select_state("Tamil_Nadu")[1:] == STANDIN_RTOS["Tamil Nadu"]
+
+
+@pytest.mark.parametrize("vehicle_type", sorted(VEHICLE_CLASS_LABELS))
+def test_export_is_the_rto_sheet_for_the_vehicle_classes(session, vehicle_type):
+    session.select_state("Kerala")
+    body = session.export(2, vehicle_type, MONTH)
+    assert body.startswith(b"PK")
+    assert "ALAPPUZHA RTO - KL4" in title(body)
+    assert rows(body) == expected_rows("ALAPPUZHA RTO - KL4", VEHICLE_CLASS_LABELS[vehicle_type])
+
+
+def test_export_replays_the_year_choice(session):
+    session.select_state("Kerala")
+    this_year = session.export(1, "motor_car", MONTH)
+    last_year = session.export(1, "motor_car", MONTH, year=2025)
+    assert "(2026)" in title(this_year)
+    assert "(2025)" in title(last_year)
+    assert rows(last_year) == expected_rows("ADOOR SRTO - KL26", ("MOTOR CAR",), year="2025")
+    assert rows(last_year) != rows(this_year)
+
+
+def test_sticky_mode_skips_repeated_posts_and_exports_the_same_sheets(url):
+    def run(sticky):
+        session = JsfExportSession(url, sticky=sticky).open()
+        try:
+            session.select_state("Kerala")
+            before = StandinHandler.stats["partials"]
+            bodies = [session.export(n, "motor_cab", MONTH) for n in (1, 2, 3)]
+            return StandinHandler.stats["partials"] - before, [rows(body) for body in bodies]
+        finally:
+            session.close()
+
+    plain_posts, plain = run(sticky=False)
+    sticky_posts, sticky = run(sticky=True)
+    assert sticky == plain
+    assert sticky_posts < plain_posts
+
+
+def test_vehicle_class_export_gives_both_totals_of_an_rto(session):
+    session.select_state("Kerala")
+    body = session.export(2, ("motor_car", "motor_cab"), MONTH, y_axis="Vehicle Class")
+    totals = class_totals_from_export(body)
+    for vehicle_type in ("motor_car", "motor_cab"):
+        classes = tuple(VEHICLE_CLASS_LABELS[vehicle_type])
+        assert totals[vehicle_type] == sum(total for _, total in expected_rows("ALAPPUZHA RTO - KL4", classes))
+
+
+def test_state_export_totals_every_rto_of_the_state(session):
+    session.select_state("Kerala")
+    body = session.export(0, "motor_car", MONTH, y_axis="State")
+    expected = sum(total for rto in STANDIN_RTOS["Kerala"] for _, total in expected_rows(rto, ("MOTOR CAR",)))
+    assert sum(totals_from_export(body).values()) == expected
+
+
+def test_unsupported_axis_is_rejected_with_the_reason(session):
+    session.select_state("Kerala")
+    with pytest.raises(JsfExportError, match="Fuel on the x-axis, not Norms x Fuel"):
+        session.export(1, "motor_car", MONTH, y_axis="Norms")
+
+
+def test_stale_viewstate_is_reported(session):
+    session.select_state("Kerala")
+    session.fields[session._viewstate_field] = ["0:0"]
+    with pytest.raises(ViewStateExpired):
+        session.export(1, "motor_car", MONTH)
@@ -0,0 +1,173 @@
+import zipfile
+from datetime import datetime
+from xml.sax.saxutils import escape
+
+import pandas as pd
+import pytest
+from openpyxl import Workbook
+
+import xlsx_readers
+from xlsx_readers import SheetLayoutError, read_sheet, read_sheet_openpyxl, read_sheet_xml
+
+TITLE = "Maker Wise Vehicle Registration of Kochi - KL7 ( Kerala )"
+HEADER = ["S No", "Maker", "PETROL", "DIESEL", "ELECTRIC(BOV)", "TOTAL"]
+
+CONTENT_TYPES = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">
+<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>
+<Default Extension="xml" ContentType="application/xml"/>
+<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>
+<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>
+<Override PartName="/xl/sharedStrings.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sharedStrings+xml"/>
+<Override PartName="/xl/styles.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.styles+xml"/>
+</Types>"""
+ROOT_RELS = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>
+</Relationships>"""
+WORKBOOK = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">
+<sheets><sheet name="Sheet1" sheetId="1" r:id="rId1"/></sheets>
+</workbook>"""
+WORKBOOK_RELS = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>
+<Relationship Id="rId2" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/sharedStrings" Target="sharedStrings.xml"/>
+<Relationship Id="rId3" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles" Target="styles.xml"/>
+</Relationships>"""
+# Style 0 is General, style 1 a date (numFmtId 14)
+STYLES = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<styleSheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">
+<fonts count="1"><font/></fonts><fills count="1"><fill><patternFill patternType="none"/></fill></fills><borders count="1"><border/></borders>
+<cellStyleXfs count="1"><xf/></cellStyleXfs>
+<cellXfs count="2"><xf numFmtId="0"/><xf numFmtId="14" applyNumberFormat="1"/></cellXfs>
+<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles>
+</styleSheet>"""
+MAIN_NS = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+
+
+def _ref(col: int, row: int) -> str:
+    return f"{chr(ord('A') + col)}{row}"
+
+
+def write_xlsx(path, rows: dict[int, list], inline_strings: bool = False, blank_cells: bool = False):
+    """
+    A one-sheet workbook written straight as XML. rows maps a row number to
+    its cell values; strings go to sharedStrings.xml (or inline), None is
+    left out (or written as an empty <c/> with blank_cells), datetimes get
+    the date style.
+    """
+    shared: list[str] = []
+    sheet_rows = []
+    for r in sorted(rows):
+        cells = []
+        for c, value in enumerate(rows[r]):
+            ref = _ref(c, r)
+            if value is None:
+                if blank_cells:
+                    cells.append(f'<c r="{ref}"/>')
+            elif isinstance(value, datetime):
+                serial = (value - datetime(1899, 12, 30)).days
+                cells.append(f'<c r="{ref}" s="1"><v>{serial}</v></c>')
+            elif isinstance(value, str) and inline_strings:
+                cells.append(f'<c r="{ref}" t="inlineStr"><is><t>{escape(value)}</t></is></c>')
+            elif isinstance(value, str):
+                if value not in shared:
+                    shared.append(value)
+                cells.append(f'<c r="{ref}" t="s"><v>{shared.index(value)}</v></c>')
+            else:
+                cells.append(f'<c r="{ref}"><v>{value}</v></c>')
+        sheet_rows.append(f'<row r="{r}">{"".join(cells)}</row>')
+    sheet = (f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+             f'<worksheet xmlns="{MAIN_NS}"><sheetData>{"".join(sheet_rows)}</sheetData></worksheet>')
+    strings = "".join(f"<si><t>{escape(s)}</t></si>" for s in shared)
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.writestr("[Content_Types].xml", CONTENT_TYPES)
+        archive.writestr("_rels/.rels", ROOT_RELS)
+        archive.writestr("xl/workbook.xml", WORKBOOK)
+        archive.writestr("xl/_rels/workbook.xml.rels", WORKBOOK_RELS)
+        archive.writestr("xl/styles.xml", STYLES)
+        archive.writestr("xl/sharedStrings.xml",
+                         f'<sst xmlns="{MAIN_NS}" count="{len(shared)}" uniqueCount="{len(shared)}">{strings}</sst>')
+        archive.writestr("xl/worksheets/sheet1.xml", sheet)
+    return path
+
+
+def export_rows(data: list[list]) -> dict[int, list]:
+    """The Vahan export layout: title on row 1, group header on row 3, fuel header on row 4, data from row 5."""
+    rows = {1: [TITLE], 3: ["S No", "Maker", "Fuel", None, None, "TOTAL"], 4: HEADER}
+    for i, values in enumerate(data):
+        rows[5 + i] = values
+    return rows
+
+
+CASES = {
+    "counts": [[1, "MARUTI SUZUKI INDIA LTD", 120, 8, 0, 128], [2, "TATA MOTORS LTD", 40, 12, 9, 61]],
+    # Empty count cells become NaN and turn the column into float64
+    "blank_counts": [[1, "MARUTI SUZUKI INDIA LTD", 120, None, 0, 120], [2, "TATA MOTORS LTD", None, 12, 9, 21]],
+    # pd.read_excel's default NA strings in data rows
+    "na_markers": [[1, "MARUTI SUZUKI INDIA LTD", "NA", 8, "n/a", 8], [2, "TATA MOTORS LTD", 40, "null", 9, 49],
+                   [3, "NULL", 1, 2, 3, 6]],
+    "fractions": [[1, "MARUTI SUZUKI INDIA LTD", 1.5, 8, 0, 9.5]],
+    # Text that is not a number stays next to the ints, as object
+    "dash_cells": [[1, "MARUTI SUZUKI INDIA LTD", "-", 8, 0, 8], [2, "TATA MOTORS LTD", 40, 12, "-", 52]],
+    # A blank row between data rows stays as an all-NaN row; a repeated maker keeps its name
+    "gap_row": [[1, "MARUTI SUZUKI INDIA LTD", 120, 8, 0, 128], [None] * 6, [3, "MARUTI SUZUKI INDIA LTD", 1, 2, 3, 6]],
+    "header_only": [],
+}
+
+
+@pytest.mark.parametrize("case", sorted(CASES))
+@pytest.mark.parametrize("inline_strings", [False, True], ids=["shared", "inline"])
+@pytest.mark.parametrize("blank_cells", [False, True], ids=["absent", "empty_c"])
+def test_xml_reader_matches_openpyxl(tmp_path, case, inline_strings, blank_cells):
+    path = write_xlsx(tmp_path / f"{case}.xlsx", export_rows(CASES[case]), inline_strings, blank_cells)
+    pd.testing.assert_frame_equal(read_sheet_xml(path), read_sheet_openpyxl(path))
+
+
+def test_xml_reader_matches_openpyxl_on_an_openpyxl_workbook(tmp_path):
+    wb = Workbook()
+    ws = wb.active
+    for r, values in export_rows(CASES["blank_counts"] + CASES["na_markers"]).items():
+        for c, value in enumerate(values):
+            ws.cell(row=r, column=c + 1, value=value)
+    path = tmp_path / "openpyxl.xlsx"
+    wb.save(path)
+    pd.testing.assert_frame_equal(read_sheet_xml(path), read_sheet_openpyxl(path))
+
+
+@pytest.mark.parametrize("case", sorted(CASES))
+def test_calamine_reader_matches_openpyxl(tmp_path, case):
+    pytest.importorskip("python_calamine")
+    path = write_xlsx(tmp_path / f"{case}.xlsx", export_rows(CASES[case]))
+    pd.testing.assert_frame_equal(xlsx_readers.read_sheet_calamine(path), read_sheet_openpyxl(path))
+
+
+@pytest.mark.parametrize("data", [
+    [[1, "MARUTI SUZUKI INDIA LTD", datetime(2026, 5, 1), 8, 0, 8]],  # a date cell
+    [[1, "MARUTI SUZUKI INDIA LTD", "120", 8, 0, 128], [2, "TATA MOTORS LTD", "x", 1, 1, 2]],  # numbers as text
+], ids=["date", "numeric_text"])
+def test_auto_falls_back_to_openpyxl_outside_the_layout(tmp_path, data):
+    path = write_xlsx(tmp_path / "odd.xlsx", export_rows(data))
+    with pytest.raises(SheetLayoutError):
+        read_sheet_xml(path)
+    pd.testing.assert_frame_equal(read_sheet(path, "auto"), read_sheet_openpyxl(path))
+
+
+def test_auto_falls_back_without_a_header_row(tmp_path):
+    path = write_xlsx(tmp_path / "no_header.xlsx", {1: [TITLE], 8: ["Maker", 1]})
+    with pytest.raises(SheetLayoutError):
+        read_sheet_xml(path)
+    pd.testing.assert_frame_equal(read_sheet(path, "auto"), read_sheet_openpyxl(path))
+
+
+def test_default_reader_follows_the_environment(tmp_path, monkeypatch):
+    path = write_xlsx(tmp_path / "counts.xlsx", export_rows(CASES["counts"]))
+    calls = []
+    monkeypatch.setitem(xlsx_readers.READERS, "xml", lambda source: calls.append(source) or read_sheet_xml(source))
+    monkeypatch.delenv(xlsx_readers.READER_ENV, raising=False)
+    read_sheet(path)
+    assert calls == []
+    monkeypatch.setenv(xlsx_readers.READER_ENV, "xml")
+    read_sheet(path)
+    assert calls == [path]
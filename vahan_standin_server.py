@@ -0,0 +1,273 @@
+"""
+Local stand-in for reportview.xhtml, used to exercise jsf_http_engine offline.
+
+It mimics the parts of the PrimeFaces form the scraper relies on: the state,
+RTO, axis, year and month selects, the VhClass checkboxes, the two refresh
+buttons, rotating javax.faces.ViewState values, partial responses and the
+Excel export link. Exports are generated with openpyxl in the Vahan layout.
+
+    python vahan_standin_server.py --port 8765
+    python jsf_http_engine.py --url http://127.0.0.1:8765/vahan4dashboard/vahan/view/reportview.xhtml
+"""
+import argparse
+import hashlib
+import io
+import threading
+import uuid
+from html import escape
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+from openpyxl import Workbook
+
+PATH = "/vahan4dashboard/vahan/view/reportview.xhtml"
+FORM = "masterLayout_formlogin"
+STATE_SELECT = "j_idt31"
+MAIN_REFRESH = "j_idt71"
+TABLE_REFRESH = "groupingTable:j_idt84"
+EXPORT_LINK = "groupingTable:xls"
+SELECTED = ' selected="selected"'
+
+STANDIN_RTOS = {
+    "Karnataka": ["BAGALKOT  RTO - KA29", "BANTWALA ARTO - KA70", "BELLARY  RTO - KA34"],
+    "Kerala": ["ADOOR SRTO - KL26", "ALAPPUZHA RTO - KL4", "ALATHUR SRTO - KL49"],
+    "Puducherry": ["BAHOUR - PY11", "KARAIKAL - PY2"],
+    "Tamil Nadu": ["ALANGUDI UO - TN641", "ALANGULAM UO - TN644", "AMBATTUR RTO - TN612", "AMBUR UO - TN628"],
+}
+Y_AXIS = ["Vehicle Category", "Vehicle Class", "Norms", "Fuel", "Maker", "State"]
+X_AXIS = ["Month Wise", "Vehicle Category", "Norms", "Fuel", "Vehicle Class"]
+YEARS = ["2026", "2025", "2024", "2023"]
+MONTHS = ["Select Month", "JAN", "FEB", "MAR", "APR", "MAY", "JUN", "JUL", "AUG", "SEP", "OCT", "NOV", "DEC"]
+VEHICLE_CLASSES = ["MOTOR CYCLE/SCOOTER", "MOTOR CAR", "MOTOR CAB", "LUXURY CAB", "MAXI CAB"]
+FUELS = ["CNG ONLY", "DIESEL", "ELECTRIC(BOV)", "PETROL", "PETROL/CNG", "PURE EV"]
+MAKERS = ["MARUTI SUZUKI INDIA LTD", "HYUNDAI MOTOR INDIA LTD", "TATA MOTORS PASSENGER VEHICLES LTD",
+          "KIA INDIA PRIVATE LIMITED", "SOME OTHER MAKER LTD"]
+
+
+def standin_counts(rto: str, vehicle_class: str, month: int, year: str = YEARS[0]) -> list[list[int]]:
+    """Deterministic Maker x Fuel counts for one RTO / vehicle class / month / year."""
+    seed = hashlib.sha256(f"{rto}|{vehicle_class}|{month}|{year}".encode()).digest()
+    return [[seed[(i * len(FUELS) + j) % len(seed)] % 7 for j in range(len(FUELS))] for i in range(len(MAKERS))]
+
+
+def _column_sums(grids: list[list[list[int]]]) -> list[int]:
+    return [sum(grid[i][j] for grid in grids for i in range(len(MAKERS))) for j in range(len(FUELS))]
+
+
+# Y-axis choices the stand-in can export, each with Fuel on the x-axis
+EXPORT_Y_AXES = ("Maker", "Vehicle Class", "State")
+
+
+def export_rows(y_axis: str, state: str, rtos: list[str], classes: tuple[str, ...], month: int,
+                year: str = YEARS[0]) -> list[tuple[str, list[int]]]:
+    """
+    (label, fuel counts) per row of the grid for the y-axis, over the given
+    RTOs (one, or all of the state's for "All"). The same counts summed
+    another way, so every y-axis gives the same grand total.
+    """
+    grids = {c: [standin_counts(rto, c, month, year) for rto in rtos] for c in classes}
+    if y_axis == "State":
+        return [(state, _column_sums([g for c in classes for g in grids[c]]))]
+    if y_axis == "Vehicle Class":
+        return [(c, _column_sums(grids[c])) for c in classes]
+    every = [g for c in classes for g in grids[c]]
+    return [(maker, [sum(g[i][j] for g in every) for j in range(len(FUELS))]) for i, maker in enumerate(MAKERS)]
+
+
+def build_export(state: str, rto: str, classes: tuple[str, ...], month: int, y_axis: str = "Maker",
+                 year: str = YEARS[0]) -> bytes:
+    """The xlsx for one RTO label, or for the whole state when rto is None."""
+    rtos = [rto] if rto is not None else STANDIN_RTOS[state]
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "reportTable"
+    ws.append([f"{y_axis} wise fuel data of {rto or 'All Vahan4 Running Office'} , {state}({year})"])
+    ws.append([])
+    ws.append(["S No", y_axis, "Fuel"] + [None] * (len(FUELS) - 1) + ["TOTAL"])
+    ws.append([None, None] + FUELS + [None])
+    for i, (label, row) in enumerate(export_rows(y_axis, state, rtos, classes, month, year), start=1):
+        ws.append([i, label] + row + [sum(row)])
+    buf = io.BytesIO()
+    wb.save(buf)
+    return buf.getvalue()
+
+
+def _select_html(component: str, options: list[tuple[str, str]], selected: str | None, change_update: str = "") -> str:
+    opts = "".join(
+        f'<option value="{escape(v)}"{SELECTED if v == selected else ""}>{escape(label)}</option>'
+        for v, label in options
+    )
+    items = "".join(
+        f'<li id="{component}_{i}" class="ui-selectonemenu-item">{escape(label)}</li>'
+        for i, (_, label) in enumerate(options)
+    )
+    script = ""
+    if change_update:
+        script = (
+            f'<script>PrimeFaces.cw("SelectOneMenu","widget_{component.replace(":", "_")}",'
+            f'{{id:"{component}",behaviors:{{change:function(ext,event){{PrimeFaces.ab({{s:"{component}",'
+            f'e:"change",f:"{FORM}",p:"{component}",u:"{change_update}"}},ext);}}}}}});</script>'
+        )
+    return (
+        f'<div id="{component}" class="ui-selectonemenu"><select id="{component}_input" name="{component}_input">'
+        f"{opts}</select><ul id=\"{component}_items\">{items}</ul></div>{script}"
+    )
+
+
+class _View:
+    def __init__(self):
+        self.state = "-1"
+        self.viewstate = ""
+        self.rotate()
+
+    def rotate(self) -> str:
+        self.viewstate = f"{uuid.uuid4().int % 10**18}:{uuid.uuid4().int % 10**18}"
+        return self.viewstate
+
+    def rto_options(self):
+        rtos = STANDIN_RTOS.get(self.state, [])
+        return [("-1", "All Vahan4 Running Office")] + [(str(i), label) for i, label in enumerate(rtos, start=1)]
+
+    def rto_fragment(self) -> str:
+        return _select_html("selectedRto", self.rto_options(), None, change_update="selectedRto")
+
+    def page(self) -> str:
+        states = [("-1", "All Vahan4 Running States (36/36)")] + [
+            (name, f"{name}({len(rtos)})") for name, rtos in STANDIN_RTOS.items()
+        ]
+        checkboxes = "".join(
+            f'<tr><td><input type="checkbox" id="VhClass:{i}" name="VhClass" value="{i}"/>'
+            f'<label for="VhClass:{i}">{escape(label)}</label></td></tr>'
+            for i, label in enumerate(VEHICLE_CLASSES)
+        )
+        return f"""<!DOCTYPE html><html><head><title>Vahan Dashboard (stand-in)</title></head><body>
+<form id="{FORM}" name="{FORM}" method="post" action="{PATH}">
+<div><a href="#"><img src="/images/logo.png"/></a></div>
+{_select_html(STATE_SELECT, states, self.state, change_update="selectedRto")}
+{self.rto_fragment()}
+{_select_html("yaxisVar", [(str(i), v) for i, v in enumerate(Y_AXIS)], "0", change_update="yaxisVar")}
+{_select_html("xaxisVar", [(str(i), v) for i, v in enumerate(X_AXIS)], "0", change_update="xaxisVar")}
+{_select_html("selectedYear", [(v, v) for v in YEARS], YEARS[0], change_update="selectedYear")}
+<button id="{MAIN_REFRESH}" type="submit" onclick="PrimeFaces.ab({{s:&quot;{MAIN_REFRESH}&quot;,f:&quot;{FORM}&quot;,p:&quot;@form&quot;,u:&quot;groupingTable&quot;}});return false;">Refresh</button>
+<div id="groupingTable">
+{_select_html("groupingTable:selectMonth", [(str(i), m) for i, m in enumerate(MONTHS)], "0", change_update="groupingTable")}
+<table id="VhClass"><tbody>{checkboxes}</tbody></table>
+<span><button id="{TABLE_REFRESH}" type="submit" onclick="PrimeFaces.ab({{s:&quot;{TABLE_REFRESH}&quot;,f:&quot;{FORM}&quot;,p:&quot;VhClass groupingTable&quot;,u:&quot;groupingTable&quot;}});return false;">Refresh</button></span>
+<a id="{EXPORT_LINK}" href="#" onclick="PrimeFaces.addSubmitParam('{FORM}',{{'{EXPORT_LINK}':'{EXPORT_LINK}'}}).submit('{FORM}');return false;"><img src="/images/xls.png" title="Download EXCEL file"/></a>
+</div>
+<input type="hidden" name="javax.faces.ViewState" id="j_id1:javax.faces.ViewState:0" value="{self.viewstate}" autocomplete="off"/>
+</form></body></html>"""
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    views: dict[str, _View] = {}
+    lock = threading.Lock()
+    stats = {"gets": 0, "partials": 0, "exports": 0, "expired": 0}
+
+    def log_message(self, format, *args):
+        pass
+
+    def _session(self) -> tuple[str, _View, bool]:
+        cookie = self.headers.get("Cookie", "")
+        sid = next((c.split("=", 1)[1] for c in cookie.split("; ") if c.startswith("JSESSIONID=")), None)
+        with self.lock:
+            if sid and sid in self.views:
+                return sid, self.views[sid], False
+            sid = uuid.uuid4().hex
+            self.views[sid] = _View()
+            return sid, self.views[sid], True
+
+    def _send(self, status: int, body: bytes, content_type: str, sid: str, extra: dict | None = None):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Set-Cookie", f"JSESSIONID={sid}; Path=/")
+        for k, v in (extra or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path.split("?")[0] != PATH:
+            self.send_error(404)
+            return
+        sid, view, _ = self._session()
+        self.stats["gets"] += 1
+        view.rotate()
+        self._send(200, view.page().encode(), "text/html;charset=UTF-8", sid)
+
+    def do_POST(self):
+        sid, view, fresh = self._session()
+        length = int(self.headers.get("Content-Length", 0))
+        form = parse_qs(self.rfile.read(length).decode(), keep_blank_values=True)
+        one = lambda name, default="": form.get(name, [default])[0]
+
+        if fresh or one("javax.faces.ViewState") != view.viewstate:
+            self.stats["expired"] += 1
+            body = ('<?xml version="1.0" encoding="UTF-8"?><partial-response><error>'
+                    "<error-name>javax.faces.application.ViewExpiredException</error-name>"
+                    "<error-message>View could not be restored.</error-message></error></partial-response>")
+            self._send(200, body.encode(), "text/xml;charset=UTF-8", sid)
+            return
+
+        if EXPORT_LINK in form:
+            self.stats["exports"] += 1
+            rtos = STANDIN_RTOS.get(view.state, [])
+            rto_value = int(one("selectedRto_input", "-1"))
+            y_axis = Y_AXIS[int(one("yaxisVar_input", "0"))]
+            x_axis = X_AXIS[int(one("xaxisVar_input", "0"))]
+            problem = None
+            if not rtos:
+                problem = "Select a state first"
+            elif y_axis not in EXPORT_Y_AXES or x_axis != "Fuel":
+                problem = (f"The stand-in exports {', '.join(EXPORT_Y_AXES)} on the y-axis with Fuel on the x-axis, "
+                           f"not {y_axis} x {x_axis}")
+            elif not 1 <= rto_value <= len(rtos) and y_axis != "State":
+                problem = f"Select an RTO first: the {y_axis} export is for a single RTO"
+            if problem:
+                self._send(200, f"<html><body>{escape(problem)}</body></html>".encode(), "text/html", sid)
+                return
+            classes = tuple(VEHICLE_CLASSES[int(v)] for v in form.get("VhClass", []))
+            rto = rtos[rto_value - 1] if 1 <= rto_value <= len(rtos) else None
+            body = build_export(view.state, rto, classes, int(one("groupingTable:selectMonth_input", "0")), y_axis,
+                                one("selectedYear_input", YEARS[0]))
+            self._send(200, body, "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", sid,
+                       {"Content-Disposition": 'attachment; filename="reportTable.xlsx"'})
+            return
+
+        self.stats["partials"] += 1
+        updates = []
+        if one("javax.faces.source") == STATE_SELECT:
+            view.state = one(f"{STATE_SELECT}_input", "-1")
+            updates.append(("selectedRto", view.rto_fragment()))
+        viewstate = view.rotate()
+        body = '<?xml version="1.0" encoding="UTF-8"?><partial-response id="j_id1"><changes>'
+        for update_id, html in updates:
+            body += f'<update id="{update_id}"><![CDATA[{html}]]></update>'
+        body += f'<update id="j_id1:javax.faces.ViewState:0"><![CDATA[{viewstate}]]></update></changes></partial-response>'
+        self._send(200, body.encode(), "text/xml;charset=UTF-8", sid)
+
+
+def serve(port: int = 0) -> ThreadingHTTPServer:
+    """Start the stand-in on a background thread and return the server."""
+    server = ThreadingHTTPServer(("127.0.0.1", port), StandinHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def standin_url(server: ThreadingHTTPServer) -> str:
+    return f"http://127.0.0.1:{server.server_address[1]}{PATH}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a local stand-in of the Vahan reportview.xhtml form.")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), StandinHandler)
+    print(f"Stand-in listening on http://127.0.0.1:{args.port}{PATH}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+import argparse
+import os
+import posixpath
+import statistics
+import time
+import zipfile
+import xml.etree.ElementTree as ET
+
+from openpyxl import load_workbook
+
+NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+REL_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+PKG_REL_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+# renameCheck.extract_header_text looks at row 1, then at A1:E5
+SCAN_ROWS = 5
+SCAN_COLS = 5
+
+
+class HeaderLayoutError(ValueError):
+    """The workbook is not laid out the way the fast reader expects; use openpyxl instead."""
+
+
+def _column_index(ref: str) -> int:
+    col = 0
+    for ch in ref:
+        if not ch.isalpha():
+            break
+        col = col * 26 + ord(ch.upper()) - 64
+    return col
+
+
+def _active_sheet_path(archive: zipfile.ZipFile) -> str:
+    """Zip path of the sheet openpyxl's wb.active returns (workbookView activeTab)."""
+    workbook = ET.fromstring(archive.read("xl/workbook.xml"))
+    sheets = workbook.findall(f"{NS}sheets/{NS}sheet")
+    view = workbook.find(f"{NS}bookViews/{NS}workbookView")
+    active = int(view.get("activeTab", 0)) if view is not None else 0
+    if not sheets or active >= len(sheets):
+        raise HeaderLayoutError("no sheets in workbook.xml")
+    rel_id = sheets[active].get(f"{REL_NS}id")
+    rels = ET.fromstring(archive.read("xl/_rels/workbook.xml.rels"))
+    for rel in rels.iter(f"{PKG_REL_NS}Relationship"):
+        if rel.get("Id") == rel_id:
+            target = rel.get("Target")
+            return target.lstrip("/") if target.startswith("/") else posixpath.normpath(posixpath.join("xl", target))
+    raise HeaderLayoutError(f"relationship {rel_id} not found")
+
+
+def _string_item_text(si) -> str:
+    # Plain <t>, or rich-text runs <r><t>; phonetic hints (<rPh>) are not part of the value
+    parts = [si.findtext(f"{NS}t") or ""]
+    parts.extend(r.findtext(f"{NS}t") or "" for r in si.findall(f"{NS}r"))
+    return "".join(parts)
+
+
+def _shared_string(archive: zipfile.ZipFile, index: int) -> str:
+    """Entry index of sharedStrings.xml, streaming only as far as that entry."""
+    with archive.open("xl/sharedStrings.xml") as f:
+        position = 0
+        for _, elem in ET.iterparse(f, events=("end",)):
+            if elem.tag != f"{NS}si":
+                continue
+            if position == index:
+                return _string_item_text(elem)
+            position += 1
+            elem.clear()
+    raise HeaderLayoutError(f"shared string {index} out of range")
+
+
+def _number(text: str):
+    try:
+        return int(text)
+    except ValueError:
+        return float(text)
+
+
+def _cell_value(archive: zipfile.ZipFile, cell):
+    """The value openpyxl (data_only) would give the cell."""
+    kind = cell.get("t", "n")
+    if kind == "inlineStr":
+        is_ = cell.find(f"{NS}is")
+        return _string_item_text(is_) if is_ is not None else None
+    raw = cell.findtext(f"{NS}v")
+    if raw is None:
+        return None
+    if kind == "s":
+        return _shared_string(archive, int(raw))
+    if kind == "b":
+        return raw == "1"
+    if kind == "n":
+        return _number(raw)
+    return raw
+
+
+def _cell_text(archive: zipfile.ZipFile, cell) -> str:
+    # Same test as extract_header_text: falsy values (0, False, "") count as empty
+    value = _cell_value(archive, cell)
+    return str(value).strip() if value else ""
+
+
+def read_header_fast(source) -> str:
+    """
+    renameCheck.extract_header_text for an xlsx path or file object, reading
+    only the first rows of the active sheet's XML with a streaming parser
+    (plus sharedStrings.xml up to the title's entry). Stops at the first
+    non-empty cell of row 1, or failing that of A1:E5. Raises
+    HeaderLayoutError (or zipfile/XML errors) when the package is unusual.
+    """
+    with zipfile.ZipFile(source) as archive:
+        with archive.open(_active_sheet_path(archive)) as sheet:
+            fallback = ""
+            for _, elem in ET.iterparse(sheet, events=("end",)):
+                if elem.tag == f"{NS}row":
+                    if int(elem.get("r", 0)) >= SCAN_ROWS:
+                        break
+                    elem.clear()
+                    continue
+                if elem.tag != f"{NS}c":
+                    continue
+                ref = elem.get("r", "")
+                row = int("".join(ch for ch in ref if ch.isdigit()) or 0)
+                if row > SCAN_ROWS:
+                    break
+                col = _column_index(ref)
+                text = _cell_text(archive, elem)
+                if text and row == 1:
+                    return text
+                if text and not fallback and col <= SCAN_COLS:
+                    fallback = text
+            return fallback
+
+
+def read_header_openpyxl(source) -> str:
+    """The reference reader: a read-only openpyxl workbook and renameCheck.extract_header_text."""
+    from renameCheck import extract_header_text
+
+    wb = load_workbook(source, read_only=True, data_only=True)
+    try:
+        return extract_header_text(wb.active)
+    finally:
+        wb.close()
+
+
+def read_header_text(source) -> str:
+    """Title text of an exported sheet: the fast reader, falling back to openpyxl."""
+    try:
+        return read_header_fast(source)
+    except (HeaderLayoutError, KeyError, ValueError, zipfile.BadZipFile, ET.ParseError):
+        if hasattr(source, "seek"):
+            source.seek(0)
+        return read_header_openpyxl(source)
+
+
+def benchmark(folder: str, repeat: int = 3) -> list[str]:
+    """Time both readers over every xlsx in folder and check they agree."""
+    files = sorted(os.path.join(folder, f) for f in os.listdir(folder) if f.lower().endswith(".xlsx"))
+    if not files:
+        return [f"No .xlsx files in {folder}"]
+    lines = []
+    results = {}
+    for name, reader in (("openpyxl", read_header_openpyxl), ("fast", read_header_text)):
+        runs = []
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            results[name] = [reader(path) for path in files]
+            runs.append(time.perf_counter() - t0)
+        best = min(runs)
+        lines.append(f"{name:>8}: {1000 * best / len(files):.2f} ms/file, {best:.2f}s for {len(files)} files "
+                     f"(median of {repeat} runs {statistics.median(runs):.2f}s)")
+        results[f"{name}_s"] = best
+    mismatches = [path for path, a, b in zip(files, results["openpyxl"], results["fast"]) if a != b]
+    lines.append(f"Speedup {results['openpyxl_s'] / results['fast_s']:.1f}x; "
+                 f"{len(mismatches)} mismatch(es)" + (f", e.g. {mismatches[0]}" if mismatches else ""))
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the fast xlsx header reader with openpyxl on a folder.")
+    parser.add_argument("--folder", required=True, help="Folder of exported RTO .xlsx files")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per reader")
+    args = parser.parse_args()
+    for line in benchmark(args.folder, max(1, args.repeat)):
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
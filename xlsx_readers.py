@@ -0,0 +1,303 @@
+import argparse
+import importlib.util
+import os
+import statistics
+import time
+import zipfile
+import xml.etree.ElementTree as ET
+from datetime import date
+
+import numpy as np
+import pandas as pd
+from openpyxl.styles.numbers import BUILTIN_FORMATS, is_date_format
+
+from xlsx_header import NS, HeaderLayoutError, _active_sheet_path, _column_index, _string_item_text
+
+# The Vahan export: title on row 1, blank row 2, "S No | Maker | Fuel ... | TOTAL" on row 3,
+# fuel names on row 4 (pd.read_excel's header=3), one row per maker from row 5
+HEADER_ROW = 4
+
+# pd.read_excel's default na_values (pandas 2.2), kept here rather than imported from pandas internals
+NA_VALUES = frozenset({
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+    "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+})
+
+
+class SheetLayoutError(HeaderLayoutError):
+    """The sheet is not the fixed export layout the xml reader handles; use openpyxl instead."""
+
+
+def read_sheet_openpyxl(source) -> pd.DataFrame:
+    """The reference backend: pd.read_excel through openpyxl, as process_rto_file has always read exports."""
+    return pd.read_excel(source, header=HEADER_ROW - 1, engine="openpyxl")
+
+
+def read_sheet_calamine(source) -> pd.DataFrame:
+    """pd.read_excel through python-calamine (Rust); optional, see available_readers()."""
+    return pd.read_excel(source, header=HEADER_ROW - 1, engine="calamine")
+
+
+def _shared_strings(archive: zipfile.ZipFile) -> list[str]:
+    if "xl/sharedStrings.xml" not in archive.namelist():
+        return []
+    strings = []
+    with archive.open("xl/sharedStrings.xml") as f:
+        for _, elem in ET.iterparse(f, events=("end",)):
+            if elem.tag == f"{NS}si":
+                strings.append(_string_item_text(elem))
+                elem.clear()
+    return strings
+
+
+def _date_styles(archive: zipfile.ZipFile) -> set[int]:
+    """Indexes of the cell styles whose number format openpyxl reads as a date."""
+    if "xl/styles.xml" not in archive.namelist():
+        return set()
+    styles = ET.fromstring(archive.read("xl/styles.xml"))
+    formats = dict(BUILTIN_FORMATS)
+    for fmt in styles.iter(f"{NS}numFmt"):
+        formats[int(fmt.get("numFmtId"))] = fmt.get("formatCode", "")
+    xfs = styles.find(f"{NS}cellXfs")
+    if xfs is None:
+        return set()
+    return {
+        i for i, xf in enumerate(xfs.findall(f"{NS}xf"))
+        if is_date_format(formats.get(int(xf.get("numFmtId", 0)), ""))
+    }
+
+
+def _cell(elem, strings: list[str], date_styles: set[int]):
+    """The value pd.read_excel(engine="openpyxl") sees: whole numbers as int, an empty cell or "" as None."""
+    kind = elem.get("t", "n")
+    if kind == "inlineStr":
+        is_ = elem.find(f"{NS}is")
+        value = _string_item_text(is_) if is_ is not None else None
+    else:
+        raw = elem.findtext(f"{NS}v")
+        if raw is None:
+            return None
+        if kind == "n":
+            if int(elem.get("s", 0)) in date_styles:
+                raise SheetLayoutError(f"cell {elem.get('r')} holds a date")
+            number = float(raw)
+            return int(number) if number.is_integer() else number
+        if kind == "s":
+            value = strings[int(raw)]
+        elif kind in ("str", "e"):
+            value = raw
+        else:
+            # Booleans and ISO dates do not occur in the export
+            raise SheetLayoutError(f"cell {elem.get('r')} has type {kind!r}")
+    return value or None
+
+
+def _column(values: list) -> np.ndarray:
+    """One column as NumPy: int64 when every cell is a whole number, float64 with NaN gaps, else object."""
+    # "NA", "n/a", "null" ... are missing values in the data rows, as pd.read_excel's default na_values
+    values = [None if isinstance(v, str) and v in NA_VALUES else v for v in values]
+    if not values:
+        # A header with no data rows: pd.read_excel gives empty object columns
+        return np.array([], dtype=object)
+    if all(isinstance(v, int) for v in values):
+        return np.array(values, dtype=np.int64)
+    if all(v is None or isinstance(v, (int, float)) for v in values):
+        return np.array([np.nan if v is None else v for v in values], dtype=np.float64)
+    if any(isinstance(v, str) and _numeric_text(v) for v in values):
+        # pandas would try to turn such a column into numbers; leave that to the reference reader
+        raise SheetLayoutError("numeric text in a text column")
+    return np.array([np.nan if v is None else v for v in values], dtype=object)
+
+
+def _numeric_text(text: str) -> bool:
+    try:
+        float(text)
+    except ValueError:
+        return False
+    return True
+
+
+def _header_names(header: list) -> list:
+    # pd.read_excel's names: "Unnamed: <i>" for blanks, ".1", ".2" on repeats
+    names, seen = [], {}
+    for i, value in enumerate(header):
+        name = f"Unnamed: {i}" if value is None else value
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        names.append(name)
+    return names
+
+
+def read_sheet_xml(source) -> pd.DataFrame:
+    """
+    The export read straight from the active sheet's XML with a streaming
+    parser, building each column as a NumPy array (int64 for the count
+    columns) with no cell or style objects. Gives the frame
+    pd.read_excel(header=3) gives for the fixed export layout; raises
+    SheetLayoutError (or zipfile/XML errors) for anything else.
+    """
+    with zipfile.ZipFile(source) as archive:
+        strings = _shared_strings(archive)
+        date_styles = _date_styles(archive)
+        rows: dict[int, dict[int, object]] = {}
+        with archive.open(_active_sheet_path(archive)) as sheet:
+            for _, elem in ET.iterparse(sheet, events=("end",)):
+                if elem.tag == f"{NS}row":
+                    elem.clear()
+                    continue
+                if elem.tag != f"{NS}c":
+                    continue
+                ref = elem.get("r")
+                if not ref:
+                    raise SheetLayoutError("cell without a reference")
+                value = _cell(elem, strings, date_styles)
+                if value is not None:
+                    row = int("".join(ch for ch in ref if ch.isdigit()))
+                    rows.setdefault(row, {})[_column_index(ref) - 1] = value
+
+    if HEADER_ROW not in rows:
+        raise SheetLayoutError(f"no header on row {HEADER_ROW}")
+    width = max(max(cells) for cells in rows.values()) + 1
+    header = [rows[HEADER_ROW].get(i) for i in range(width)]
+    # Blank rows between data rows stay, as all-NaN rows; blank rows at the end do not
+    data = [rows.get(r, {}) for r in range(HEADER_ROW + 1, max(rows) + 1)]
+    columns = {}
+    for i, name in enumerate(_header_names(header)):
+        columns[name] = _column([cells.get(i) for cells in data])
+    return pd.DataFrame(columns)
+
+
+def read_sheet_auto(source) -> pd.DataFrame:
+    """The xml reader, falling back to openpyxl when the sheet is laid out differently."""
+    try:
+        return read_sheet_xml(source)
+    except (HeaderLayoutError, KeyError, ValueError, zipfile.BadZipFile, ET.ParseError):
+        if hasattr(source, "seek"):
+            source.seek(0)
+        return read_sheet_openpyxl(source)
+
+
+READERS = {
+    "auto": read_sheet_auto,
+    "xml": read_sheet_xml,
+    "openpyxl": read_sheet_openpyxl,
+    "calamine": read_sheet_calamine,
+}
+# Backend for read_sheet when none is named: openpyxl until `python xlsx_readers.py check` has
+# passed on real day folders; RTO_EXCEL_READER=auto switches a run to the xml reader
+DEFAULT_READER = "openpyxl"
+READER_ENV = "RTO_EXCEL_READER"
+
+
+def default_reader() -> str:
+    """The backend named by RTO_EXCEL_READER, else DEFAULT_READER."""
+    return os.environ.get(READER_ENV) or DEFAULT_READER
+
+
+def available_readers() -> list[str]:
+    """Backends usable here; calamine needs the optional python-calamine package."""
+    return [name for name in READERS if name != "calamine" or importlib.util.find_spec("python_calamine")]
+
+
+def read_sheet(source, reader: str | None = None) -> pd.DataFrame:
+    """An exported sheet as pd.read_excel(source, header=3) returns it, through the named backend
+    (default: default_reader())."""
+    reader = reader or default_reader()
+    if reader not in READERS:
+        raise ValueError(f"Unknown Excel reader {reader!r}; choose from {', '.join(READERS)}")
+    return READERS[reader](source)
+
+
+def _files(folder: str) -> list[str]:
+    return sorted(os.path.join(folder, f) for f in os.listdir(folder) if f.lower().endswith(".xlsx"))
+
+
+def check_equivalence(folder: str, readers: list[str]) -> list[str]:
+    """
+    Compare every reader with openpyxl on each xlsx in folder, on what ends
+    up in the cumulative CSV: read_rto_file's frame, dtypes included.
+    """
+    from preprocessing_services import read_rto_file
+
+    files = _files(folder)
+    if not files:
+        return [f"No .xlsx files in {folder}"]
+    as_of = date.today()
+    lines = []
+    reference = {}
+    for path in files:
+        try:
+            reference[path] = read_rto_file(path, as_of=as_of, reader="openpyxl")
+        except Exception as e:
+            reference[path] = e
+    for reader in readers:
+        if reader == "openpyxl":
+            continue
+        mismatches = []
+        for path in files:
+            try:
+                frame = read_rto_file(path, as_of=as_of, reader=reader)
+            except Exception as e:
+                frame = e
+            expected = reference[path]
+            if isinstance(expected, Exception) or isinstance(frame, Exception):
+                same = type(expected) is type(frame)
+            else:
+                same = frame.equals(expected) and list(frame.dtypes) == list(expected.dtypes)
+            if not same:
+                mismatches.append(os.path.basename(path))
+        lines.append(f"{reader:>8}: {len(files) - len(mismatches)}/{len(files)} files match openpyxl"
+                     + (f"; differ: {', '.join(mismatches[:5])}" if mismatches else ""))
+    return lines
+
+
+def benchmark(folder: str, readers: list[str], repeat: int = 3) -> list[str]:
+    """Files per second for each reader over every xlsx in folder (best of repeat runs)."""
+    files = _files(folder)
+    if not files:
+        return [f"No .xlsx files in {folder}"]
+    lines = []
+    baseline = None
+    for reader in readers:
+        runs = []
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            for path in files:
+                read_sheet(path, reader)
+            runs.append(time.perf_counter() - t0)
+        best = min(runs)
+        baseline = baseline or (best if reader == "openpyxl" else None)
+        speedup = f", {baseline / best:.1f}x openpyxl" if baseline and reader != "openpyxl" else ""
+        lines.append(f"{reader:>8}: {len(files) / best:.0f} files/s ({1000 * best / len(files):.2f} ms/file, "
+                     f"median of {repeat} runs {statistics.median(runs):.2f}s{speedup})")
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check and time the Excel reader backends on a folder of exports.")
+    parser.add_argument("mode", choices=["check", "bench"], help="check: compare with openpyxl; bench: files/s")
+    parser.add_argument("--folder", required=True, help="Folder of exported RTO .xlsx files")
+    parser.add_argument("--readers", nargs="+", default=None, help="Backends (default: all available)")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per reader")
+    args = parser.parse_args()
+
+    available = available_readers()
+    readers = args.readers or available
+    for name in readers:
+        if name not in available:
+            parser.error(f"reader {name!r} is not available here (available: {', '.join(available)})")
+    if args.mode == "bench":
+        # openpyxl first, as the baseline for the speedups
+        readers = sorted(readers, key=lambda name: name != "openpyxl")
+        lines = benchmark(args.folder, readers, max(1, args.repeat))
+    else:
+        lines = check_equivalence(args.folder, readers)
+    for line in lines:
+        print(line)
+
+
+if __name__ == "__main__":
+    main()